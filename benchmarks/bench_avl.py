@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+"""
+Heights recomputed per AVLTree insert and delete, and their time, for
+random keys at growing sizes. Retracing stops once a subtree keeps its
+height, so the count per update stays constant as the tree grows.
+
+    python benchmarks/bench_avl.py [size ...]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),os.pardir))
+
+from pybst import avltree
+
+class CountingAVLTree(avltree.AVLTree):
+    """An AVLTree counting how many heights its updates recompute."""
+
+    def __init__(self,*args):
+        self.recomputed = 0
+        avltree.AVLTree.__init__(self,*args)
+
+    def _child_height(self,node):
+        self.recomputed = self.recomputed + 1
+        return avltree.AVLTree._child_height(self,node)
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10000,100000,1000000]
+    for size in sizes:
+        random.seed(size)
+        keys = random.sample(xrange(10 * size),size)
+        tree = CountingAVLTree()
+
+        start = time.time()
+        for key in keys:
+            tree.insert(key,key)
+        insert_time = time.time() - start
+        inserts = tree.recomputed
+
+        random.shuffle(keys)
+        tree.recomputed = 0
+        start = time.time()
+        for key in keys[:size // 2]:
+            tree.delete(key)
+        delete_time = time.time() - start
+
+        print 'N=%-8d insert %.2f heights, %.1fk/s   delete %.2f heights, %.1fk/s   height %d' % (
+            size,inserts / float(size),size / insert_time / 1000,
+            tree.recomputed / float(size // 2),size // 2 / delete_time / 1000,tree.Root.height)
+
+if __name__ == '__main__':
+    main()
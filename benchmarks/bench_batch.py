@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""
+Time to insert and delete a batch of keys in a tree with a loop of
+insert or delete calls and with one insert_from or delete_from call.
+Batches at least as large as the tree are merged with it and rebuilt
+with from_sorted, so only those gain much; smaller batches are applied
+one key at a time either way.
+
+    python benchmarks/bench_batch.py [size] [batch ...]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),os.pardir))
+
+from pybst import avltree, rbtree, splaytree
+
+def timed(apply):
+    start = time.time()
+    apply()
+    return time.time() - start
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    batches = [int(arg) for arg in sys.argv[2:]] or [size // 20,size // 2,2 * size]
+    random.seed(size)
+
+    print 'N=%d, seconds for loop / batch call' % size
+    for cls in (avltree.AVLTree,rbtree.RBTree,splaytree.SplayTree):
+        line = '%-10s' % cls.__name__
+        for batch in batches:
+            keys = random.sample(xrange(4 * (size + batch)),size + batch)
+            base = [(key,key) for key in keys[:size]]
+            new = [(key,key) for key in keys[size:]]
+            old = random.sample(keys[:size],min(size,batch))
+
+            times = []
+            tree = cls.from_sorted(base)
+            times.append(timed(lambda: [tree.insert(key,value) for key, value in new]))
+            tree = cls.from_sorted(base)
+            times.append(timed(lambda: tree.insert_from(new)))
+            tree = cls.from_sorted(base)
+            times.append(timed(lambda: [tree.delete(key) for key in old]))
+            tree = cls.from_sorted(base)
+            times.append(timed(lambda: tree.delete_from(old)))
+            line = line + '   %dk: insert %.2f/%.2f delete %.2f/%.2f' % tuple([batch // 1000] + times)
+        print line
+
+if __name__ == '__main__':
+    main()
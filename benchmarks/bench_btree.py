@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+BTree against AVLTree and RBTree: time to look up and to insert random
+keys in a tree of N keys built with from_sorted, and the growth of the
+resident set per entry while building it, read from /proc/self/statm
+(Linux only). Each tree is built in its own process.
+
+    python benchmarks/bench_btree.py [size ...]
+"""
+
+import gc
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),os.pardir))
+
+from pybst import avltree, btree, rbtree
+
+LOOKUPS = 200000
+INSERTS = 100000
+
+def resident():
+    """Produces the resident set size of this process in bytes."""
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+def measure(cls,size,results):
+    random.seed(size)
+    # Even keys go in the tree and odd keys are inserted later.
+    pairs = [(2 * key,key) for key in sorted(random.sample(xrange(5 * size),size))]
+    probes = [random.choice(pairs)[0] for i in xrange(LOOKUPS)]
+    new = [2 * key + 1 for key in random.sample(xrange(5 * size),INSERTS)]
+
+    gc.collect()
+    before = resident()
+    tree = cls.from_sorted(pairs)
+    gc.collect()
+    memory = (resident() - before) / float(size)
+
+    start = time.time()
+    for key in probes:
+        tree.get_node(key)
+    lookup = LOOKUPS / (time.time() - start)
+
+    start = time.time()
+    for key in new:
+        tree.insert(key,key)
+    insert = INSERTS / (time.time() - start)
+
+    results.put((lookup,insert,memory))
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000000]
+    print 'thousand lookups/s, thousand inserts/s, bytes per entry'
+    for size in sizes:
+        for cls in (avltree.AVLTree,rbtree.RBTree,btree.BTree):
+            results = multiprocessing.Queue()
+            process = multiprocessing.Process(target=measure,args=(cls,size,results))
+            process.start()
+            lookup, insert, memory = results.get()
+            process.join()
+            print 'N=%-9d %-8s lookup %7.1f   insert %7.1f   memory %6.1f' % (
+                size,cls.__name__,lookup / 1000,insert / 1000,memory)
+
+if __name__ == '__main__':
+    main()
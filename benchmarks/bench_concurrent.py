@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+Throughput of a ConcurrentTree shared by 1, 2, 4 and 8 threads, each
+doing the same mix of lookups and inserts, for each tree class. PyBST
+runs on Python 2, whose global interpreter lock lets only one thread
+run Python code at a time, so readers holding the lock together still
+take turns and extra threads mostly add lock traffic.
+
+    python benchmarks/bench_concurrent.py [size] [operations] [write fraction]
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),os.pardir))
+
+from pybst import avltree, bstree, concurrenttree, rbtree, splaytree
+
+def run(tree,threads,operations,writes,size):
+    """Produces the operations per second of threads threads sharing tree."""
+    def worker(seed):
+        rng = random.Random(seed)
+        for i in xrange(operations // threads):
+            key = rng.randrange(2 * size)
+            if rng.random() < writes:
+                tree.insert(key,key)
+            else:
+                tree.get(key)
+
+    workers = [threading.Thread(target=worker,args=(i,)) for i in xrange(threads)]
+    start = time.time()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return operations // threads * threads / (time.time() - start)
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    operations = int(sys.argv[2]) if len(sys.argv) > 2 else 200000
+    writes = float(sys.argv[3]) if len(sys.argv) > 3 else 0.1
+    print 'Python %s, N=%d, %d operations, %d%% inserts' % (
+        sys.version.split()[0],size,operations,int(writes * 100))
+    print 'thousand operations per second at 1/2/4/8 threads'
+
+    random.seed(size)
+    pairs = [(key,key) for key in random.sample(xrange(2 * size),size)]
+    for cls in (bstree.BSTree,avltree.AVLTree,rbtree.RBTree,splaytree.SplayTree):
+        line = '%-10s' % cls.__name__
+        for threads in (1,2,4,8):
+            tree = concurrenttree.ConcurrentTree(cls.from_sorted(pairs))
+            line = line + '%9.1f' % (run(tree,threads,operations,writes,size) / 1000)
+        print line
+
+if __name__ == '__main__':
+    main()
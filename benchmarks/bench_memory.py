@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""
+Resident memory per entry of a tree built with from_sorted, for each
+tree class. Each tree is built in its own process, and its size is
+the growth of the resident set of that process, read from
+/proc/self/statm, so this runs on Linux only. Keys and values are
+built before the tree and are not counted.
+
+    python benchmarks/bench_memory.py [size ...]
+"""
+
+import gc
+import multiprocessing
+import os
+import random
+import sys
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),os.pardir))
+
+from pybst import arraytree, avltree, bstree, btree, rbtree, splaytree
+
+CLASSES = (bstree.BSTree,avltree.AVLTree,rbtree.RBTree,splaytree.SplayTree,
+           arraytree.ArrayAVLTree,arraytree.ArrayRBTree,btree.BTree)
+
+def resident():
+    """Produces the resident set size of this process in bytes."""
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+def measure(cls,size,results):
+    random.seed(size)
+    pairs = [(key,key) for key in sorted(random.sample(xrange(10 * size),size))]
+    gc.collect()
+    before = resident()
+    tree = cls.from_sorted(pairs)
+    gc.collect()
+    results.put(resident() - before)
+    del tree
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100000,1000000]
+    print 'bytes per entry'
+    print '%-13s' % 'N' + ''.join('%13d' % size for size in sizes)
+    for cls in CLASSES:
+        line = '%-13s' % cls.__name__
+        for size in sizes:
+            results = multiprocessing.Queue()
+            process = multiprocessing.Process(target=measure,args=(cls,size,results))
+            process.start()
+            used = results.get()
+            process.join()
+            line = line + '%13.1f' % (used / float(size))
+        print line
+
+if __name__ == '__main__':
+    main()
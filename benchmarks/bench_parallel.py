@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+"""
+Time to build an AVLTree from shuffled pairs with from_sorted and with
+parallel_build on growing numbers of processes. parallel_build only
+pays off when the sort it spreads over the processes outweighs starting
+them and sending them the keys, so compare before relying on it.
+
+    python benchmarks/bench_parallel.py [size ...]
+"""
+
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),os.pardir))
+
+from pybst import avltree, parallel
+
+def timed(build):
+    start = time.time()
+    build()
+    return time.time() - start
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100000,1000000]
+    counts = [count for count in (2,4,8) if count <= max(2,multiprocessing.cpu_count())]
+    print 'cpu_count %d' % multiprocessing.cpu_count()
+    for size in sizes:
+        random.seed(size)
+        pairs = [(key,key) for key in random.sample(xrange(10 * size),size)]
+
+        line = 'N=%-8d from_sorted %.2fs' % (size,timed(lambda: avltree.AVLTree.from_sorted(pairs)))
+        for count in counts:
+            line = line + '   %d processes %.2fs' % (count,timed(lambda: parallel.parallel_build(avltree.AVLTree,pairs,count)))
+        print line
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""
+Lookups per second of each SplayTree splay policy, and of peek, on
+uniform, Zipf-skewed and sequential probes, starting from a perfectly
+balanced tree.
+
+    python benchmarks/bench_splay.py [size] [probes]
+"""
+
+import bisect
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),os.pardir))
+
+from pybst import splaytree
+
+def zipf_probes(size,count,s=1.0):
+    """Produces count keys below size, key k drawn with weight 1/(rank+1)**s."""
+    ranks = range(size)
+    random.shuffle(ranks)
+    total = 0.0
+    cumulative = []
+    for i in xrange(size):
+        total = total + 1.0 / (i + 1) ** s
+        cumulative.append(total)
+    return [ranks[bisect.bisect_left(cumulative,random.random() * total)] for i in xrange(count)]
+
+def lookups_per_second(tree,lookup,probes):
+    start = time.time()
+    for key in probes:
+        lookup(key)
+    return len(probes) / (time.time() - start)
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 300000
+    random.seed(0)
+    workloads = [('uniform',[random.randrange(size) for i in xrange(count)]),
+                 ('Zipf s=1',zipf_probes(size,count)),
+                 ('sequential',[i % size for i in xrange(count)])]
+    pairs = [(i,i) for i in xrange(size)]
+
+    for name, probes in workloads:
+        results = []
+        for policy in splaytree.SPLAY_POLICIES:
+            tree = splaytree.SplayTree.from_sorted(pairs,policy=policy)
+            results.append((policy,lookups_per_second(tree,tree.get_node,probes)))
+        tree = splaytree.SplayTree.from_sorted(pairs)
+        results.append(('peek',lookups_per_second(tree,tree.peek,probes)))
+        print 'N=%d  %-10s  %s' % (size,name,'  '.join('%s %.1fk' % (policy,rate / 1000) for policy, rate in results))
+
+if __name__ == '__main__':
+    main()
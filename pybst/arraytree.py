@@ -0,0 +1,397 @@
+#!/usr/bin/env python
+# Author: Tyler Sanderson <tylerbtbam@gmail.com>
+#
+# This file is part of PyBST.
+#
+# PyBST is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyBST is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyBST.  If not, see <http://www.gnu.org/licenses/>.
+
+import array
+import itertools
+import avltree
+import rbtree
+
+AVLTree = avltree.AVLTree
+RBTree = rbtree.RBTree
+
+class NodeArrays(object):
+    """
+    Stores the nodes of a tree as parallel typed arrays indexed
+    by integer node ids. Links are ids, with -1 standing for None.
+    The meta array holds the height of an AVL node or the color of
+    a Red Black node (1 for red). Deleted slots are chained through
+    the left array into a free list and reused by later inserts.
+    """
+    def __init__(self,typecode='d'):
+        self.typecode = typecode
+        self._scratch = array.array(typecode,[0])
+        self.clear()
+
+    def clear(self):
+        """A.clear(). Drops every node held in A."""
+        self.left = array.array('i')
+        self.right = array.array('i')
+        self.parent = array.array('i')
+        self.size = array.array('i')
+        self.meta = array.array('b')
+        self.keys = array.array(self.typecode)
+        self.values = []
+        self.free = -1
+
+    def alloc(self,key,value,meta):
+        """
+        A.alloc(key,value,meta) -> Nat. Stores a new unlinked node
+        in a free slot of A, or at the end of A if there is none,
+        and produces its id. Raises ValueError, leaving A unchanged,
+        if key cannot be stored exactly in the key array of A.
+        """
+        if key is None:
+            key = 0
+        else:
+            self.check_key(key)
+
+        id = self.free
+        if id >= 0:
+            self.free = self.left[id]
+            self.left[id] = -1
+            self.right[id] = -1
+            self.parent[id] = -1
+            self.size[id] = 1
+            self.meta[id] = meta
+            self.keys[id] = key
+            self.values[id] = value
+        else:
+            id = len(self.values)
+            self.left.append(-1)
+            self.right.append(-1)
+            self.parent.append(-1)
+            self.size.append(1)
+            self.meta.append(meta)
+            self.keys.append(key)
+            self.values.append(value)
+        return id
+
+    def check_key(self,key):
+        """
+        A.check_key(key). Raises ValueError if key does not come back
+        unchanged from the key array of A, such as a float key in an
+        integer array or an integer too large for a float to hold.
+        """
+        try:
+            self._scratch[0] = key
+            exact = self._scratch[0] == key
+        except (TypeError,OverflowError):
+            exact = False
+        if not exact:
+            raise ValueError("Key " + str(key) + " cannot be stored exactly in an array of typecode " + repr(self.typecode))
+
+    def release(self,id):
+        """A.release(id). Returns the slot of node id to the free list."""
+        self.left[id] = self.free
+        self.values[id] = None
+        self.free = id
+
+def _find(arrays,id,key):
+    """
+    _find(arrays,id,key) -> (Nat,Boolean). Searches for key below
+    node id directly on arrays, without creating a view of every node
+    on the way. Produces the id of the node with key and True if there
+    is one, otherwise the id of the node it would be attached to and False.
+    """
+    keys = arrays.keys
+    left = arrays.left
+    right = arrays.right
+    while True:
+        node_key = keys[id]
+        if key == node_key:
+            return id, True
+        elif key > node_key:
+            child = right[id]
+        else:
+            child = left[id]
+        if child < 0:
+            return id, False
+        id = child
+
+class ArrayNode(object):
+    """
+    Represents a node of a tree stored in a NodeArrays. ArrayNodes
+    are created on demand as views of a slot, so two ArrayNodes are
+    equal whenever they view the same slot. They have the same
+    attributes as a Node.
+    """
+    __slots__ = ('arrays','id')
+
+    def __init__(self,arrays,id):
+        self.arrays = arrays
+        self.id = id
+
+    def __eq__(self,other):
+        return (isinstance(other,ArrayNode) and self.id == other.id and
+                self.arrays is other.arrays)
+
+    def __ne__(self,other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return self.id
+
+    def _view(self,id):
+        """N._view(id) -> ArrayNode. Produces a view of node id, or None if id is -1."""
+        if id < 0:
+            return None
+        return self.__class__(self.arrays,id)
+
+    @property
+    def left(self):
+        return self._view(self.arrays.left[self.id])
+
+    @left.setter
+    def left(self,node):
+        self.arrays.left[self.id] = node.id if node else -1
+
+    @property
+    def right(self):
+        return self._view(self.arrays.right[self.id])
+
+    @right.setter
+    def right(self,node):
+        self.arrays.right[self.id] = node.id if node else -1
+
+    @property
+    def parent(self):
+        return self._view(self.arrays.parent[self.id])
+
+    @parent.setter
+    def parent(self,node):
+        self.arrays.parent[self.id] = node.id if node else -1
+
+    @property
+    def key(self):
+        return self.arrays.keys[self.id]
+
+    @key.setter
+    def key(self,key):
+        self.arrays.keys[self.id] = key
+
+    @property
+    def value(self):
+        return self.arrays.values[self.id]
+
+    @value.setter
+    def value(self,value):
+        self.arrays.values[self.id] = value
+
+    @property
+    def size(self):
+        return self.arrays.size[self.id]
+
+    @size.setter
+    def size(self,size):
+        self.arrays.size[self.id] = size
+
+class ArrayAVLNode(ArrayNode):
+    """Represents a node of an ArrayAVLTree"""
+    __slots__ = ()
+
+    @property
+    def height(self):
+        return self.arrays.meta[self.id]
+
+    @height.setter
+    def height(self,height):
+        self.arrays.meta[self.id] = height
+
+    @property
+    def balance(self):
+        """
+        The height of the right subtree taken away from the height
+        of the left subtree.
+        """
+        arrays = self.arrays
+        left = arrays.left[self.id]
+        right = arrays.right[self.id]
+        return ((arrays.meta[left] if left >= 0 else -1) -
+                (arrays.meta[right] if right >= 0 else -1))
+
+class ArrayRBNode(ArrayNode):
+    """Represents a node of an ArrayRBTree"""
+    __slots__ = ()
+
+    @property
+    def color(self):
+        return 'r' if self.arrays.meta[self.id] else 'k'
+
+    @color.setter
+    def color(self,color):
+        self.arrays.meta[self.id] = 1 if color == 'r' else 0
+
+class ArrayTree(object):
+    """
+    ArrayTree holds what the array trees have in common. It comes
+    before AVLTree or RBTree among the bases of an array tree, and
+    node_class names the class of the views of its Nodes, whose meta
+    attribute starts out as new_meta.
+    """
+    def __init__(self,*args,**kwargs):
+        """Initializes the node arrays, then the tree the same as its other base"""
+        self.arrays = NodeArrays(kwargs.pop('typecode','d'))
+        if kwargs:
+            raise TypeError("Unexpected keyword arguments " + str(sorted(kwargs)))
+        super(ArrayTree,self).__init__(*args)
+
+    def _new_node(self,key,value):
+        """
+        T._new_node(key,value) -> ArrayNode. Stores a new, unlinked
+        Node in the arrays of T.
+        """
+        return self.node_class(self.arrays,self.arrays.alloc(key,value,self.new_meta))
+
+    def get_node(self,key,*args):
+        """
+        T.get_node(key,...) -> ArrayNode. Produces the Node in T with key
+        attribute key. If there is no such Node, produces None.
+        """
+        if len(args) == 0:
+            node = self.Root
+        else:
+            node = args[0]
+
+        if not node:
+            return None
+        id, found = _find(self.arrays,node.id,key)
+        return self.node_class(self.arrays,id) if found else None
+
+    def _find_parent(self,key,start):
+        """
+        T._find_parent(key,start) -> (ArrayNode,Boolean). The same as
+        BSTree._find_parent, searching the arrays of T directly.
+        """
+        id, found = _find(self.arrays,start.id,key)
+        return self.node_class(self.arrays,id), found
+
+    def _load_sorted(self,count,items):
+        """
+        T._load_sorted(count,items). The same as BSTree._load_sorted,
+        building the tree in new arrays, since the old ones may be
+        shared with other trees.
+        """
+        self.Root = None
+        self.arrays = NodeArrays(self.arrays.typecode)
+        super(ArrayTree,self)._load_sorted(count,items)
+
+    def _spawn(self):
+        """
+        T._spawn() -> Tree. Produces a new empty tree of the same class
+        as T that shares the arrays of T, so it can take over its Nodes.
+        """
+        tree = self.__class__(typecode=self.arrays.typecode)
+        tree.arrays = self.arrays
+        return tree
+
+    @classmethod
+    def join(cls,left,right):
+        """
+        Tree.join(left,right) -> Tree. The same as AVLTree.join or
+        RBTree.join when left and right share their arrays, as the trees
+        produced by split do. Otherwise the Nodes of both are copied into
+        new arrays, in time linear in their sizes.
+        """
+        if not (isinstance(left,cls) and isinstance(right,cls)):
+            raise TypeError("Can only join two " + cls.__name__ + "s")
+        if left.arrays is right.arrays:
+            return super(ArrayTree,cls).join(left,right)
+
+        if left.Root and right.Root and not left.get_max().key < right.get_min().key:
+            raise ValueError("Keys of the left tree must be smaller than those of the right tree")
+        tree = left._spawn()
+        tree._bulk_load(itertools.chain(left.items(),right.items()))
+        left.Root = None
+        right.Root = None
+        return tree
+
+    def _use_join(self,other):
+        """
+        T._use_join(other) -> Boolean. The same as for the other base of T
+        for trees that share their arrays. Other trees are always merged.
+        """
+        return self.arrays is other.arrays and super(ArrayTree,self)._use_join(other)
+
+    def _adopt(self,tree):
+        """
+        T._adopt(tree). The same as BSTree._adopt, also taking over
+        the arrays holding the Nodes of tree.
+        """
+        if tree is not self:
+            self.arrays = tree.arrays
+        super(ArrayTree,self)._adopt(tree)
+
+    def _delete_leaf(self,node):
+        """
+        T._delete_leaf(node). Deletes node from T, treating it
+        as a leaf, and frees its slot.
+        """
+        super(ArrayTree,self)._delete_leaf(node)
+        self.arrays.release(node.id)
+
+    def _delete_leaf_parent(self,node):
+        """
+        T._delete_leaf_parent(node). Deletes node from T, treating it
+        as a Node with only one child, and frees its slot.
+        """
+        super(ArrayTree,self)._delete_leaf_parent(node)
+        self.arrays.release(node.id)
+
+class ArrayAVLTree(ArrayTree,AVLTree):
+    """
+    ArrayAVLTree implements an AVL Tree whose nodes are stored in
+    parallel typed arrays (see NodeArrays) instead of one object
+    per node. It has the same methods as AVLTree.
+
+    Keys are stored in an array of the given typecode, 'd' (float)
+    by default, so they come back as that type. Use typecode='l'
+    for integer keys. Inserting a key the array cannot hold exactly
+    raises ValueError.
+
+    Constructors:
+
+    ArrayAVLTree() -> Creates a new empty AVL Tree
+    ArrayAVLTree(seq) -> Creates a new AVL Tree from the elements in sequence [(k1,v1),(k2,v2),...,(kn,vn)]
+    ArrayAVLTree(...,typecode=c) -> Stores keys in an array of typecode c
+
+    For further explanation of some functions or their source code, see avltree.py.
+    """
+    node_class = ArrayAVLNode
+    new_meta = 0
+
+class ArrayRBTree(ArrayTree,RBTree):
+    """
+    ArrayRBTree implements a Red Black Tree whose nodes are stored in
+    parallel typed arrays (see NodeArrays) instead of one object
+    per node. It has the same methods as RBTree.
+
+    Keys are stored in an array of the given typecode, 'd' (float)
+    by default, so they come back as that type. Use typecode='l'
+    for integer keys. Inserting a key the array cannot hold exactly
+    raises ValueError.
+
+    Constructors:
+
+    ArrayRBTree() -> Creates a new empty Red Black Tree
+    ArrayRBTree(seq) -> Creates a new Red Black Tree from the elements in sequence [(k1,v1),(k2,v2),...,(kn,vn)]
+    ArrayRBTree(...,typecode=c) -> Stores keys in an array of typecode c
+
+    For further explanation of some functions or their source code, see rbtree.py.
+    """
+    node_class = ArrayRBNode
+    new_meta = 1
\ No newline at end of file
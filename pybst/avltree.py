@@ -16,19 +16,31 @@
 # You should have received a copy of the GNU General Public License
 # along with PyBST.  If not, see <http://www.gnu.org/licenses/>.
 
-import collections
 import bstree
 
 Node = bstree.Node
 BSTree = bstree.BSTree
 
 class AVLNode(Node):
-    """Represents a node of a balanced AVL Tree"""
+    """
+    Represents a node of a balanced AVL Tree. Only the height is
+    stored; the balance is derived from the heights of the children.
+    """
+    __slots__ = ('height',)
+
     def __init__(self,key,value):
-        """Initializes a BST node, then add height and balance attributes"""
+        """Initializes a BST node, then add height attribute"""
         Node.__init__(self,key,value)
         self.height = 0
-        self.balance = 0
+
+    @property
+    def balance(self):
+        """
+        The height of the right subtree taken away from the height
+        of the left subtree.
+        """
+        return ((self.left.height if self.left else -1) -
+                (self.right.height if self.right else -1))
 
 class AVLTree(BSTree):
     """
@@ -52,48 +64,41 @@ class AVLTree(BSTree):
         """Initializes tree the same as a BST"""
         BSTree.__init__(self,*args)
 
-    def is_valid(self, *args):
+    def _new_node(self,key,value):
         """
-        T.is_valid(...) -> Boolean. Produces True if and only if
-        T is a valid AVL Tree. Raises an exception otherwise.
+        T._new_node(key,value) -> AVLNode. Produces a new, unlinked AVL Node.
         """
-        if len(args) == 0:
-            node = self.Root
-        else:
-            node = args[0]
+        return AVLNode(key,value)
 
-        if not node:
-            return True
+    def _label_built_node(self,node,size,depth,max_depth):
+        """
+        T._label_built_node(node,size,depth,max_depth). Sets the height
+        of node, which roots a perfectly balanced subtree of size elements.
+        """
+        node.height = size.bit_length() - 1
 
-        expected_height = self.get_height(node)
-        expected_balance = self.get_balance(node)
+    def is_valid(self, *args):
+        """
+        T.is_valid(...) -> Boolean. Produces True if and only if
+        T is a valid AVL Tree. Raises an exception listing every
+        violation otherwise.
+        """
+        return BSTree.is_valid(self,*args)
 
+    def _check_node(self,node,state,violations):
+        """
+        T._check_node(node,state,violations) -> Object. Checks the height
+        of node against the heights of its children, and its balance.
+        Since every Node is checked, every height is then correct.
+        """
+        expected_height = self._child_height(node)
         if not (node.height == expected_height):
-            raise Exception("Height of node " + str(node.key) + " is " + str(node.height) + " and should be " + str(expected_height))
-
-        if not (node.balance == expected_balance):
-            raise Exception("Balance of node " + str(node.key) + " is " + str(node.balance) + " and should be " + str(expected_balance))
+            violations.append("Height of node " + str(node.key) + " is " + str(node.height) + " and should be " + str(expected_height))
 
-        if abs(expected_balance) > 1:
-            raise Exception("Tree is unbalanced at node " + str(node.key))
+        if abs(node.balance) > 1:
+            violations.append("Tree is unbalanced at node " + str(node.key))
 
-        if node.left:
-            if not node.left.parent == node:
-                raise Exception("Left child of node " + str(node.key) + " is adopted by another node!")
-
-        if node.right:
-            if not node.right.parent == node:
-                raise Exception("Right child of node " + str(node.key) + " is adopted by another node!")
-
-        if node.parent and node.parent.left == node:
-            if node.key > node.parent.key:
-                raise Exception("Node " + str(node.key) + " is to the left of " + str(node.parent.key) + " but is larger")
-
-        if node.parent and node.parent.right == node:
-            if node.key < node.parent.key:
-                raise Exception("Node " + str(node.key) + " is to the right of " + str(node.parent.key) + " but is smaller")
-
-        return (self.is_valid(node.left) and self.is_valid(node.right))
+        return state
 
     def preorder(self,*args):
         """
@@ -116,7 +121,7 @@ class AVLTree(BSTree):
         """
         return BSTree.postorder(self,*args)
 
-    def levelorder(self):
+    def levelorder(self,*args):
         """
         T.levelorder(...) -> Sequence. Produces a sequence of the Nodes
         in T, obtained in levelorder.
@@ -140,41 +145,12 @@ class AVLTree(BSTree):
             raise TypeError(str(key) + " is not a number")
         else:
             if not self.Root:
-                self.Root = AVLNode(key,value)
-            elif len(args) == 0:
-                if not self.get_node(key,self.Root):
-                        self.insert(key,value,self.Root)
+                self.Root = self._new_node(key,value)
             else:
-                child = AVLNode(key,value)
-                parent = args[0]
-                if child.key > parent.key:
-                    if not parent.right:
-                        parent.right = child
-                        child.parent = parent
-                        self._update_height(parent)
-                        self._update_balance(parent)
-                        node = child
-                        while node and abs(node.balance) <=1:
-                            node = node.parent
-                        if node:
-                            self._balance(node)
-                    else:
-                        self.insert(key,value,parent.right)
-                else:
-                    if not parent.left:
-                        parent.left = child
-                        child.parent = parent
-                        self._update_height(parent)
-                        self._update_balance(parent)
-                        node = child
-                        while abs(node.balance) <=1:
-                            node = node.parent
-                            if not node:
-                                break
-                        if node:
-                            self._balance(node)
-                    else:
-                        self.insert(key,value,parent.left)
+                parent, found = self._find_parent(key,args[0] if args else self.Root)
+                if not found:
+                    self._attach(parent,self._new_node(key,value))
+                    self._retrace(parent)
 
     def insert_from(self,seq):
         """
@@ -226,35 +202,30 @@ class AVLTree(BSTree):
         return ((node.left.height if node.left else -1) -
                 (node.right.height if node.right else -1))
 
-    def _update_height(self,node):
+    def _child_height(self,node):
         """
-        T._update_height(node). Updates the height attribute
-        of Nodes in T starting from node backtracking up to the root.
+        T._child_height(node) -> Nat. Produces the height node should
+        have according to the height attributes of its children.
         """
-        if not node:
-            pass
-        else:
-            new_height = self.get_height(node)
-            if node.height == new_height:
-                pass
-            else:
-                node.height = new_height
-                self._update_height(node.parent)
+        return 1 + max(node.left.height if node.left else -1,
+                       node.right.height if node.right else -1)
 
-    def _update_balance(self,node):
+    def _retrace(self,node):
         """
-        T._update_balance(node). Updates the balance attribute
-        of Nodes in T starting from node backtracking up to the root.
+        T._retrace(node). Updates heights and balances Nodes on the
+        path from node up to the root of T, stopping as soon as a
+        subtree is left with the height it had before.
         """
-        if not node:
-            pass
-        else:
-            new_balance = self.get_balance(node)
-            if node.balance == new_balance:
-                pass
+        while node:
+            old_height = node.height
+            if abs(node.balance) > 1:
+                self._balance(node)
+                node = node.parent
             else:
-                node.balance = new_balance
-                self._update_balance(node.parent)
+                node.height = self._child_height(node)
+            if node.height == old_height:
+                return
+            node = node.parent
 
     def _rotate_left(self,pivot):
         """
@@ -265,7 +236,6 @@ class AVLTree(BSTree):
         par_node = old_root.parent
 
         new_root = old_root.right
-        temp = new_root.right
         old_root.right = new_root.left
 
         if (old_root.right):
@@ -284,10 +254,9 @@ class AVLTree(BSTree):
                 par_node.left = new_root
                 new_root.parent = par_node
 
-        self._update_height(new_root.left)
-        self._update_height(par_node)
-        self._update_balance(new_root.left)
-        self._update_balance(par_node)
+        new_root.size = old_root.size
+        self._resize(old_root)
+        self._update_rotated(old_root,new_root)
 
     def _rotate_right(self,pivot):
         """
@@ -298,7 +267,6 @@ class AVLTree(BSTree):
         par_node = old_root.parent
 
         new_root = old_root.left
-        temp = new_root.left
         old_root.left = new_root.right
 
         if (old_root.left):
@@ -318,10 +286,147 @@ class AVLTree(BSTree):
                 par_node.left = new_root
                 new_root.parent = par_node
 
-        self._update_height(new_root.right)
-        self._update_height(par_node)
-        self._update_balance(new_root.right)
-        self._update_balance(par_node)
+        new_root.size = old_root.size
+        self._resize(old_root)
+        self._update_rotated(old_root,new_root)
+
+    def _update_rotated(self,old_root,new_root):
+        """
+        T._update_rotated(old_root,new_root). Updates the height
+        attributes after a rotation that moved new_root above
+        old_root. Nodes above new_root are left to the caller.
+        """
+        old_root.height = self._child_height(old_root)
+        new_root.height = self._child_height(new_root)
+
+    def _join(self,left,node,right):
+        """
+        T._join(left,node,right). Makes T the AVL Tree holding the
+        subtrees rooted at left and right joined by node, where every
+        key under left is smaller than node's key and every key under
+        right is larger. Takes time proportional to the difference
+        in height of left and right.
+        """
+        left_height = left.height if left else -1
+        right_height = right.height if right else -1
+
+        if abs(left_height - right_height) <= 1:
+            node.left = left
+            node.right = right
+            node.parent = None
+            if left:
+                left.parent = node
+            if right:
+                right.parent = node
+            node.height = self._child_height(node)
+            self._resize(node)
+            self.Root = node
+            return
+
+        # Walk down the spine of the taller subtree facing the other
+        # one to the first subtree no more than one level taller.
+        if left_height > right_height:
+            self.Root = left
+            left.parent = None
+            par_node = left
+            child = left.right
+            while child and child.height > right_height + 1:
+                par_node = child
+                child = child.right
+            par_node.right = node
+            node.left = child
+            node.right = right
+        else:
+            self.Root = right
+            right.parent = None
+            par_node = right
+            child = right.left
+            while child and child.height > left_height + 1:
+                par_node = child
+                child = child.left
+            par_node.left = node
+            node.left = left
+            node.right = child
+
+        node.parent = par_node
+        if node.left:
+            node.left.parent = node
+        if node.right:
+            node.right.parent = node
+        node.height = self._child_height(node)
+        self._resize(node)
+        self._update_sizes(par_node,node.size - (child.size if child else 0))
+        self._retrace(par_node)
+
+    def split(self,key):
+        """
+        T.split(key) -> (AVLTree,AVLTree). Produces a tree of the Nodes
+        in T with keys smaller than key and a tree of the rest, in time
+        proportional to the height of T. T is left empty.
+        """
+        path = []
+        node = self.Root
+        while node:
+            path.append(node)
+            if node.key >= key:
+                node = node.left
+            else:
+                node = node.right
+
+        smaller = self._spawn()
+        larger = self._spawn()
+        for node in reversed(path):
+            if node.key >= key:
+                larger._join(larger.Root,node,node.right)
+            else:
+                smaller._join(node.left,node,smaller.Root)
+
+        self.Root = None
+        return smaller, larger
+
+    @classmethod
+    def join(cls,left,right):
+        """
+        Tree.join(left,right) -> Tree. Produces a tree of the Nodes of
+        left and right, whose keys must all be smaller in left than in
+        right, in time proportional to the height of the taller tree.
+        left and right are left empty.
+        """
+        if not (isinstance(left,cls) and isinstance(right,cls)):
+            raise TypeError("Can only join two " + cls.__name__ + "s")
+
+        tree = left._spawn()
+        if not (left.Root and right.Root):
+            tree.Root = left.Root or right.Root
+        else:
+            middle = right.get_min()
+            if not left.get_max().key < middle.key:
+                raise ValueError("Keys of the left tree must be smaller than those of the right tree")
+            key, value = middle.key, middle.value
+            right.delete(key)
+            tree._join(left.Root,tree._new_node(key,value),right.Root)
+
+        left.Root = None
+        right.Root = None
+        return tree
+
+    def _join_trees(self,left,node,right):
+        """
+        T._join_trees(left,node,right) -> AVLTree. Produces the tree made of
+        the AVLTrees left and right joined by node. right is left empty.
+        """
+        left._join(left.Root,node,right.Root)
+        right.Root = None
+        return left
+
+    def _use_join(self,other):
+        """
+        T._use_join(other) -> Boolean. Produces True if one of T and
+        other is so much smaller than the other that splitting and
+        joining beats merging their keys. See BSTree._set_operation.
+        """
+        sizes = sorted((self.get_element_count(),other.get_element_count()))
+        return sizes[0] * 8 < sizes[1]
 
     def _balance(self,pivot):
         """
@@ -348,10 +453,11 @@ class AVLTree(BSTree):
 
     def _delete_leaf(self,node):
         """
-        T._delete_leaf_parent(node). Deletes node from T, treating it
-        as a Node with only one child.
+        T._delete_leaf(node). Deletes node from T, treating it
+        as a leaf.
         """
         par_node = node.parent
+        self._update_sizes(par_node,-1)
 
         if par_node:
             if par_node.left == node:
@@ -361,14 +467,7 @@ class AVLTree(BSTree):
 
             del node
 
-            self._update_height(par_node)
-            self._update_balance(par_node)
-            to_balance = par_node
-
-            while to_balance and abs(to_balance.balance) <=1:
-                    to_balance = to_balance.parent
-            if to_balance:
-                self._balance(to_balance)
+            self._retrace(par_node)
 
         else:
             self.Root = None
@@ -379,14 +478,16 @@ class AVLTree(BSTree):
         as a Node with only one child.
         """
         par_node = node.parent
+        self._update_sizes(par_node,-1)
 
-        if node.key == self.Root.key:
+        if node == self.Root:
             if node.right:
                 self.Root = node.right
                 node.right = None
             else:
                 self.Root = node.left
                 node.left = None
+            self.Root.parent = None
 
         else:
             if par_node.right == node:
@@ -411,14 +512,7 @@ class AVLTree(BSTree):
 
         del node
 
-        self._update_height(par_node)
-        self._update_balance(par_node)
-        to_balance = par_node
-
-        while to_balance and abs(to_balance.balance) <=1:
-            to_balance = to_balance.parent
-        if to_balance:
-            self._balance(to_balance)
+        self._retrace(par_node)
 
     def _switch_nodes(self,node1,node2):
         """
@@ -430,34 +524,25 @@ class AVLTree(BSTree):
     def _delete_node(self,node):
         """
         T._delete_node(node). Deletes node from T, treating it as
-        a Node with two children.
+        a Node with two children. Its place is taken by the nearest
+        key on the side of the taller subtree.
         """
-        if self.get_height(node.left) > self.get_height(node.right):
-            to_switch = self.get_max(node.left)
-            self._switch_nodes(node,to_switch)
-
-            if not (to_switch.right or to_switch.left):
-                to_delete = self.get_max(node.left)
-                self._delete_leaf(to_delete)
-            else:
-                to_delete = self.get_max(node.left)
-                self._delete_leaf_parent(to_delete)
+        if node.left.height > node.right.height:
+            to_delete = self.get_max(node.left)
         else:
-            to_switch = self.get_min(node.right)
-            self._switch_nodes(node,to_switch)
+            to_delete = self.get_min(node.right)
+        self._switch_nodes(node,to_delete)
 
-            if not (to_switch.right or to_switch.left):
-                to_delete = self.get_min(node.right)
-                self._delete_leaf(to_delete)
-            else:
-                to_delete = self.get_min(node.right)
-                self._delete_leaf_parent(to_delete)
+        if not (to_delete.right or to_delete.left):
+            self._delete_leaf(to_delete)
+        else:
+            self._delete_leaf_parent(to_delete)
 
-    def delete(self,key):
-        """T.delete(key) <==> del T[key]. Deletes the Node
+    def delete(self,key,*args):
+        """T.delete(key...) <==> del T[key]. Deletes the Node
         with key attribute key from T.
         """
-        node = self.get_node(key,self.Root)
+        node = self.get_node(key,args[0] if args else self.Root)
 
         if node:
             if not (node.left or node.right):
@@ -471,11 +556,7 @@ class AVLTree(BSTree):
 
     def delete_from(self,seq):
         """
-        T.delete_from(seq). For every keyin seq, deletes
+        T.delete_from(seq). For every key in seq, deletes
         the Node with that key attribute from T.
         """
-        if isinstance(seq,collections.Iterable):
-            for x in seq:
-                self.delete(x)
-        else:
-            raise TypeError(str(iter) + " is not iterable")
\ No newline at end of file
+        BSTree.delete_from(self,seq)
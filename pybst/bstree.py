@@ -17,17 +17,282 @@
 # along with PyBST.  If not, see <http://www.gnu.org/licenses/>.
 
 import collections
+import itertools
+import frozen
+
+class Node(object):
+    """
+    Represents a node of a binary tree. Nodes use __slots__ rather
+    than a per-instance __dict__, since a tree holds one per entry.
+    """
+    __slots__ = ('left','right','parent','key','value','size')
 
-class Node:
-    """Represents a node of a binary tree"""
     def __init__(self,key,value):
         self.left = None
         self.right = None
         self.parent = None
         self.key = key
         self.value = value
+        self.size = 1
+
+class TreeQueries(object):
+    """
+    TreeQueries holds the queries that only read a tree through its
+    Root and the left, right, key, value and size attributes of its
+    Nodes, and produce the Nodes in inorder with its iter_inorder.
+    BSTree and the persistent trees share them.
+    """
+    __slots__ = ()
+
+    def keys(self):
+        """
+        T.keys() -> Iterator. Produces the keys in T one at a time
+        in increasing order.
+        """
+        for node in self.iter_inorder():
+            yield node.key
+
+    def values(self):
+        """
+        T.values() -> Iterator. Produces the values in T one at a time
+        in increasing order of their keys.
+        """
+        for node in self.iter_inorder():
+            yield node.value
+
+    def items(self):
+        """
+        T.items() -> Iterator. Produces the (key,value) pairs in T one
+        at a time in increasing order of key.
+        """
+        for node in self.iter_inorder():
+            yield (node.key,node.value)
+
+    def freeze(self,typecode=None):
+        """
+        T.freeze(typecode=None) -> FrozenTree. Produces an immutable
+        snapshot of the keys and values in T laid out for fast lookups,
+        in time linear in the size of T. See frozen.py.
+        """
+        return frozen.FrozenTree(self.items(),typecode)
+
+    def get_node(self,key,*args):
+        """
+        T.get_node(key,...) -> Node. Produces the Node in T with key
+        attribute key. If there is no such node, produces None.
+        """
+        if len(args) == 0:
+            node = self.Root
+        else:
+            node = args[0]
+
+        while node:
+            if key == node.key:
+                return node
+            elif key > node.key:
+                node = node.right
+            else:
+                node = node.left
+
+        return None
+
+    def floor(self,key):
+        """
+        T.floor(key) -> Node. Produces the Node in T with the largest
+        key attribute less than or equal to key. If there is no such
+        Node, produces None.
+        """
+        node = self.Root
+        best = None
+        while node:
+            if key == node.key:
+                return node
+            elif key > node.key:
+                best = node
+                node = node.right
+            else:
+                node = node.left
+        return best
+
+    def ceiling(self,key):
+        """
+        T.ceiling(key) -> Node. Produces the Node in T with the smallest
+        key attribute greater than or equal to key. If there is no such
+        Node, produces None.
+        """
+        node = self.Root
+        best = None
+        while node:
+            if key == node.key:
+                return node
+            elif key < node.key:
+                best = node
+                node = node.left
+            else:
+                node = node.right
+        return best
+
+    def get_max(self,*args):
+        """
+        T.get_max(...) -> Node. Produces the Node that has the maximum
+        key attribute in T.
+        """
+        if len(args) == 0:
+            node = self.Root
+        else:
+            node = args[0]
+
+        while node.right:
+            node = node.right
+        return node
+
+    def get_min(self,*args):
+        """
+        T.get_min(...) -> Node. Produces the Node that has the minimum
+        key attribute in T.
+        """
+        if len(args) == 0:
+            node = self.Root
+        else:
+            node = args[0]
+
+        while node.left:
+            node = node.left
+        return node
+
+    def get_element_count(self,*args):
+        """
+        T.get_element_count(...) -> Nat. Produces the number of elements
+        in T.
+        """
+        if len(args) == 0:
+            node = self.Root
+        else:
+            node = args[0]
+
+        return node.size if node else 0
+
+    def __len__(self):
+        """T.__len__() <==> len(T). Produces the number of elements in T."""
+        return self.get_element_count()
+
+    def rank(self,key):
+        """
+        T.rank(key) -> Nat. Produces the number of keys in T that are
+        smaller than key, i.e. the position key has or would have in
+        T.keys().
+        """
+        node = self.Root
+        rank = 0
+        while node:
+            if key > node.key:
+                rank = rank + 1 + (node.left.size if node.left else 0)
+                node = node.right
+            elif key == node.key:
+                return rank + (node.left.size if node.left else 0)
+            else:
+                node = node.left
+        return rank
+
+    def select(self,index):
+        """
+        T.select(index) -> Node. Produces the Node with the index-th
+        smallest key in T, counting from 0, so that T.select(0) is
+        T.get_min(). Raises IndexError if there is no such Node.
+        """
+        if index < 0 or index >= self.get_element_count():
+            raise IndexError("Tree index " + str(index) + " out of range")
+
+        node = self.Root
+        while True:
+            left_size = node.left.size if node.left else 0
+            if index < left_size:
+                node = node.left
+            elif index == left_size:
+                return node
+            else:
+                index = index - left_size - 1
+                node = node.right
+
+    def range(self,lo,hi,reverse=False):
+        """
+        T.range(lo,hi,reverse=False) -> Iterator. Produces the Nodes in T
+        with lo <= key < hi one at a time in increasing order of key,
+        or in decreasing order if reverse is True. Only the Nodes
+        produced and the paths leading to them are visited.
+        """
+        stack = []
+        node = self.Root
+
+        if not reverse:
+            while node:
+                if node.key >= lo:
+                    stack.append(node)
+                    node = node.left
+                else:
+                    node = node.right
+
+            while stack:
+                node = stack.pop()
+                if node.key >= hi:
+                    return
+                yield node
+                node = node.right
+                while node:
+                    stack.append(node)
+                    node = node.left
+
+        else:
+            while node:
+                if node.key < hi:
+                    stack.append(node)
+                    node = node.right
+                else:
+                    node = node.left
+
+            while stack:
+                node = stack.pop()
+                if node.key < lo:
+                    return
+                yield node
+                node = node.left
+                while node:
+                    stack.append(node)
+                    node = node.right
+
+    def count_range(self,lo,hi):
+        """
+        T.count_range(lo,hi) -> Nat. Produces the number of keys in T
+        with lo <= key < hi.
+        """
+        if not lo < hi:
+            return 0
+        return self.rank(hi) - self.rank(lo)
+
+    def get_height(self,*args):
+        """
+        T.get_height(...) -> Nat. Produces the height of T, defined
+        as one added to the height of the tallest subtree.
+        """
+        if len(args) == 0:
+            node = self.Root
+        else:
+            node = args[0]
+
+        height = 0
+        stack = [(node,0)] if node else []
+        while stack:
+            node, depth = stack.pop()
+            if depth > height:
+                height = depth
+            if node.left:
+                stack.append((node.left,depth+1))
+            if node.right:
+                stack.append((node.right,depth+1))
+
+        return height
 
-class BSTree:
+class BSTree(TreeQueries):
     """
     BSTree implements an unbalanced Binary Search Tree.
 
@@ -53,56 +318,238 @@ class BSTree:
             else:
                 raise TypeError(str(args[0]) + " is not iterable")
 
+    @classmethod
+    def from_sorted(cls,seq):
+        """
+        Tree.from_sorted(seq) -> Tree. Creates a new perfectly
+        balanced tree of the class it is called on from the elements
+        in sequence [(k1,v1),(k2,v2),...,(kn,vn)] in linear time.
+        If seq is not sorted by key it is sorted first.
+        """
+        tree = cls()
+        tree._bulk_load(seq)
+        return tree
+
+    def _new_node(self,key,value):
+        """
+        T._new_node(key,value) -> Node. Produces a new, unlinked Node
+        of the type T is made of.
+        """
+        return Node(key,value)
+
+    def _spawn(self):
+        """
+        T._spawn() -> Tree. Produces a new empty tree of the same
+        class as T that can take over Nodes of T.
+        """
+        return self.__class__()
+
+    def copy(self):
+        """
+        T.copy() -> Tree. Produces a new, perfectly balanced tree of the
+        same class as T with the same keys and values, in time linear in
+        the size of T. Changing either tree leaves the other unchanged.
+        """
+        tree = self._spawn()
+        tree._bulk_load(self.items())
+        return tree
+
+    def _bulk_load(self,seq):
+        """
+        T._bulk_load(seq). Replaces the contents of T with a perfectly
+        balanced tree built from the key, value pairs in seq.
+        """
+        pairs = self._sorted_pairs(seq)
+        self._load_sorted(len(pairs),iter(pairs))
+
+    def _load_sorted(self,count,items):
+        """
+        T._load_sorted(count,items). Replaces the contents of T with a
+        perfectly balanced tree built from the first count key, value
+        pairs produced by the iterator items, which must be in strictly
+        increasing key order. Only one pair at a time is taken from items.
+        """
+        self.Root = self._build_balanced(count,items)
+
+    def _sorted_pairs(self,seq):
+        """
+        T._sorted_pairs(seq) -> Sequence. Produces the key, value pairs
+        of seq ordered by key. As with insert, only the first pair with
+        any given key is kept.
+        """
+        if not isinstance(seq,collections.Iterable):
+            raise TypeError(str(seq) + " is not iterable")
+
+        pairs = []
+        ordered = True
+        last = None
+        for x in seq:
+            key = x[0]
+            if not isinstance(key,(int,long,float)):
+                raise TypeError(str(key) + " is not a number")
+            if pairs and key <= last:
+                ordered = False
+            pairs.append((key,x[1]))
+            last = key
+
+        if ordered:
+            return pairs
+
+        pairs.sort(key=lambda pair: pair[0])
+        unique = []
+        for pair in pairs:
+            if not unique or pair[0] != unique[-1][0]:
+                unique.append(pair)
+        return unique
+
+    def _build_balanced(self,count,items):
+        """
+        T._build_balanced(count,items) -> Node. Builds a perfectly
+        balanced tree from the first count key, value pairs produced by
+        the iterator items, which must be in increasing key order, and
+        produces its root.
+
+        The shape of the subtree holding a run of m elements depends only
+        on m (the left subtree always holds m/2 of them), so nodes are
+        allocated on the way down and filled with keys in inorder. The
+        height of such a subtree is m.bit_length() - 1.
+        """
+        root = None
+        stack = []
+        max_depth = count.bit_length() - 1
+        size = count
+        depth = 0
+        parent = None
+        is_left = True
+
+        while True:
+            while size > 0:
+                node = self._new_node(None,None)
+                if not parent:
+                    root = node
+                elif is_left:
+                    parent.left = node
+                else:
+                    parent.right = node
+                node.parent = parent
+                node.size = size
+                self._label_built_node(node,size,depth,max_depth)
+                stack.append((node,size,depth))
+                parent = node
+                size = size // 2
+                depth = depth + 1
+                is_left = True
+
+            if not stack:
+                return root
+
+            node, size, depth = stack.pop()
+            node.key, node.value = next(items)
+            parent = node
+            size = size - 1 - size // 2
+            depth = depth + 1
+            is_left = False
+
+    def _label_built_node(self,node,size,depth,max_depth):
+        """
+        T._label_built_node(node,size,depth,max_depth). Hook used by
+        _build_balanced to set any balancing metadata on node, which
+        roots a subtree of size elements at the given depth.
+        """
+        pass
+
     def is_valid(self, *args):
         """
         T.is_valid(...) -> Boolean. Produces True if and only if
-        T is a valid Binary Search Tree. Raises an exception otherwise.
+        T is a valid Binary Search Tree. Raises an exception listing
+        every violation otherwise.
+        """
+        violations = self.get_violations(*args)
+        if violations:
+            raise Exception("\n".join(violations))
+        return True
+
+    def get_violations(self,*args):
+        """
+        T.get_violations(...) -> Sequence. Produces a description of
+        every way in which T fails to be a valid tree of its type,
+        visiting each Node once. Keys are checked against the bounds
+        set by all of their ancestors, not only their parents.
         """
         if len(args) == 0:
             node = self.Root
         else:
             node = args[0]
 
+        violations = []
         if not node:
-            return True
+            return violations
 
-        if node.left:
-            if not node.left.parent == node:
-                raise Exception("Left child of node " + str(node.key) + " is adopted by another node!")
+        if node == self.Root and node.parent:
+            violations.append("Root " + str(node.key) + " has a parent!")
 
-        if node.right:
-            if not node.right.parent == node:
-                raise Exception("Right child of node " + str(node.key) + " is adopted by another node!")
+        # Each entry is a Node, the bounds its key must lie strictly
+        # between and the state _check_node passed down to it.
+        stack = [(node,None,None,self._check_root(node,violations))]
+        while stack:
+            node, lo, hi, state = stack.pop()
+
+            # A Node out of its bounds is not descended into, so a
+            # child link back to an ancestor cannot loop forever.
+            if lo is not None and not node.key > lo:
+                violations.append("Node " + str(node.key) + " is to the right of " + str(lo) + " but is not larger")
+                continue
+            if hi is not None and not node.key < hi:
+                violations.append("Node " + str(node.key) + " is to the left of " + str(hi) + " but is not smaller")
+                continue
+
+            if node.left and not node.left.parent == node:
+                violations.append("Left child of node " + str(node.key) + " is adopted by another node!")
 
-        if node.parent and node.parent.left == node:
-            if node.key > node.parent.key:
-                raise Exception("Node " + str(node.key) + " is to the left of " + str(node.parent.key) + " but is larger")
+            if node.right and not node.right.parent == node:
+                violations.append("Right child of node " + str(node.key) + " is adopted by another node!")
 
-        if node.parent and node.parent.right == node:
-            if node.key < node.parent.key:
-                raise Exception("Node " + str(node.key) + " is to the right of " + str(node.parent.key) + " but is smaller")
+            expected_size = self._child_size(node)
+            if not (node.size == expected_size):
+                violations.append("Size of node " + str(node.key) + " is " + str(node.size) + " and should be " + str(expected_size))
 
-        return (self.is_valid(node.left) and self.is_valid(node.right))
+            state = self._check_node(node,state,violations)
+
+            if node.right:
+                stack.append((node.right,node.key,hi,state))
+            if node.left:
+                stack.append((node.left,lo,node.key,state))
+
+        return violations
+
+    def _check_root(self,node,violations):
+        """
+        T._check_root(node,violations) -> Object. Hook used by
+        get_violations to check node, the top of the subtree being
+        validated, adding any violations found. Produces the state
+        passed to _check_node for node.
+        """
+        return None
+
+    def _check_node(self,node,state,violations):
+        """
+        T._check_node(node,state,violations) -> Object. Hook used by
+        get_violations to check any balancing metadata of node using
+        only node and its children, adding any violations found.
+        Produces the state passed down to the children of node.
+        """
+        return state
 
     def preorder(self,*args):
         """
         T.preorder(...) -> Sequence. Produces a sequence of the Nodes
         in T, obtained in preorder.
         """
-        if len(args) == 0:
-            elements = []
-            node = self.Root
-        else:
-            node = args[0]
-            elements = args[1]
-
-        elements.append(node)
-
-        if node.left:
-            self.preorder(node.left,elements)
-        if node.right:
-            self.preorder(node.right,elements)
+        if len(args) < 2:
+            return list(self.iter_preorder(*args))
 
+        elements = args[1]
+        elements.extend(self.iter_preorder(args[0]))
         return elements
 
     def inorder(self,*args):
@@ -110,82 +557,207 @@ class BSTree:
         T.inorder(...) -> Sequence. Produces a sequence of the Nodes
         in T, obtained in inorder.
         """
+        if len(args) < 2:
+            return list(self.iter_inorder(*args))
+
+        elements = args[1]
+        elements.extend(self.iter_inorder(args[0]))
+        return elements
+
+    def postorder(self,*args):
+        """
+        T.postorder(...) -> Sequence. Produces a sequence of the Nodes
+        in T, obtained in postorder.
+        """
+        if len(args) < 2:
+            return list(self.iter_postorder(*args))
+
+        elements = args[1]
+        elements.extend(self.iter_postorder(args[0]))
+        return elements
+
+    def levelorder(self,*args):
+        """
+        T.levelorder(...) -> Sequence. Produces a sequence of the Nodes
+        in T, obtained in levelorder.
+        """
+        return list(self.iter_levelorder(*args))
+
+    def iter_preorder(self,*args):
+        """
+        T.iter_preorder(...) -> Iterator. Produces the Nodes in T
+        one at a time in preorder, using memory proportional to
+        the height of T.
+        """
         if len(args) == 0:
-            elements = []
             node = self.Root
         else:
             node = args[0]
-            elements = args[1]
 
-        if node.left:
-            self.inorder(node.left,elements)
+        stack = [node] if node else []
+        while stack:
+            node = stack.pop()
+            yield node
+            if node.right:
+                stack.append(node.right)
+            if node.left:
+                stack.append(node.left)
 
-        elements.append(node)
+    def iter_inorder(self,*args):
+        """
+        T.iter_inorder(...) -> Iterator. Produces the Nodes in T
+        one at a time in inorder. Walks the parent attributes
+        of the Nodes, so it uses constant memory.
+        """
+        if len(args) == 0:
+            top = self.Root
+        else:
+            top = args[0]
 
-        if node.right:
-            self.inorder(node.right,elements)
+        if not top:
+            return
 
-        return elements
+        node = top
+        while node.left:
+            node = node.left
 
-    def postorder(self,*args):
+        while True:
+            yield node
+            if node.right:
+                node = node.right
+                while node.left:
+                    node = node.left
+            else:
+                while node != top and node.parent.right == node:
+                    node = node.parent
+                if node == top:
+                    return
+                node = node.parent
+
+    def iter_postorder(self,*args):
         """
-        T.postorder(...) -> Sequence. Produces a sequence of the Nodes
-        in T, obtained in postorder.
+        T.iter_postorder(...) -> Iterator. Produces the Nodes in T
+        one at a time in postorder, using memory proportional to
+        the height of T.
         """
         if len(args) == 0:
-            elements = []
             node = self.Root
         else:
             node = args[0]
-            elements = args[1]
 
-        if node.left:
-            self.postorder(node.left,elements)
+        stack = []
+        last = None
+        while stack or node:
+            if node:
+                stack.append(node)
+                node = node.left
+            else:
+                peek = stack[-1]
+                if peek.right and last != peek.right:
+                    node = peek.right
+                else:
+                    last = stack.pop()
+                    yield last
 
-        if node.right:
-            self.postorder(node.right,elements)
+    def iter_levelorder(self,*args):
+        """
+        T.iter_levelorder(...) -> Iterator. Produces the Nodes in T
+        one at a time in levelorder.
+        """
+        if len(args) == 0:
+            node = self.Root
+        else:
+            node = args[0]
 
-        elements.append(node)
+        q = collections.deque()
+        if node:
+            q.append(node)
+        while q:
+            node = q.popleft()
+            yield node
+            if node.left:
+                q.append(node.left)
+            if node.right:
+                q.append(node.right)
 
-        return elements
+    def successor(self,node):
+        """
+        T.successor(node) -> Node. Produces the Node that follows node
+        in inorder, or None if node has the maximum key in T.
+        """
+        if node.right:
+            return self.get_min(node.right)
+        while node.parent and node.parent.right == node:
+            node = node.parent
+        return node.parent
 
-    def levelorder(self):
+    def predecessor(self,node):
         """
-        T.levelorder(...) -> Sequence. Produces a sequence of the Nodes
-        in T, obtained in levelorder.
+        T.predecessor(node) -> Node. Produces the Node that precedes node
+        in inorder, or None if node has the minimum key in T.
         """
-        q = collections.deque()
-        q.appendleft(self.Root)
-        lst = []
-        while len(q) != 0:
-            removed = q.pop()
-            lst.append(removed)
-            visit = self.get_node(removed,self.Root)
-            if visit.left:
-                q.appendleft(visit.left)
-            if visit.right:
-                q.appendleft(visit.right)
-
-        return lst
+        if node.left:
+            return self.get_max(node.left)
+        while node.parent and node.parent.left == node:
+            node = node.parent
+        return node.parent
 
-    def get_node(self,key,*args):
+    def _find_parent(self,key,start):
         """
-        T.get_node(key,...) -> Node. Produces the Node in T with key
-        attribute key. If there is no such node, produces None.
+        T._find_parent(key,start) -> (Node,Boolean). Searches for key
+        from the Node start. Produces the Node with key attribute key
+        and True if there is one, otherwise the Node a new Node with
+        that key would be attached to and False.
         """
-        if len(args) == 0:
-            start = self.Root
-        else:
-            start = args[0]
-
-        if not start:
-            return None
-        if key == start.key:
-            return start
-        elif key > start.key:
-            return self.get_node(key,start.right)
+        node = start
+        while True:
+            if key == node.key:
+                return node, True
+            elif key > node.key:
+                if not node.right:
+                    return node, False
+                node = node.right
+            else:
+                if not node.left:
+                    return node, False
+                node = node.left
+
+    def _attach(self,parent,child):
+        """
+        T._attach(parent,child). Links the new Node child below
+        parent, on the side given by its key, and counts it in the
+        sizes of its ancestors.
+        """
+        if child.key > parent.key:
+            parent.right = child
         else:
-            return self.get_node(key,start.left)
+            parent.left = child
+        child.parent = parent
+        self._update_sizes(parent,1)
+
+    def _child_size(self,node):
+        """
+        T._child_size(node) -> Nat. Produces the size node should have
+        according to the size attributes of its children.
+        """
+        return (1 + (node.left.size if node.left else 0) +
+                (node.right.size if node.right else 0))
+
+    def _resize(self,node):
+        """
+        T._resize(node). Recomputes the size attribute of node from
+        those of its children, e.g. after a tree rotation.
+        """
+        node.size = self._child_size(node)
+
+    def _update_sizes(self,node,delta):
+        """
+        T._update_sizes(node,delta). Adds delta to the size attribute
+        of node and of every Node above it up to the root of T.
+        """
+        while node:
+            node.size = node.size + delta
+            node = node.parent
 
     def insert(self,key,value,*args):
         """
@@ -197,111 +769,246 @@ class BSTree:
             raise TypeError(str(key) + " is not a number")
         else:
             if not self.Root:
-                self.Root = Node(key,value)
-            elif len(args) == 0:
-                if not self.get_node(key,self.Root):
-                    self.insert(key,value,self.Root)
+                self.Root = self._new_node(key,value)
             else:
-                child = Node(key,value)
-                parent = args[0]
-                if child.key > parent.key:
-                    if not parent.right:
-                        parent.right = child
-                        child.parent = parent
-                    else:
-                        self.insert(key,value,parent.right)
-                else:
-                    if not parent.left:
-                        parent.left = child
-                        child.parent = parent
-                    else:
-                        self.insert(key,value,parent.left)
+                parent, found = self._find_parent(key,args[0] if args else self.Root)
+                if not found:
+                    self._attach(parent,self._new_node(key,value))
 
     def insert_from(self,seq):
         """
         T.insert_from(seq). For every key, value pair in seq,
         inserts a new Node into T with key and value attributes
-        as given.
+        as given. When seq has more pairs than T has Nodes, T is
+        rebuilt from both with from_sorted instead.
         """
-        if isinstance(seq,collections.Iterable):
-            for x in seq:
-                self.insert(x[0],x[1])
-        else:
-            raise TypeError(str(iter) + " is not iterable")
+        if not isinstance(seq,collections.Iterable):
+            raise TypeError(str(seq) + " is not iterable")
 
-    def get_max(self,*args):
+        pairs = list(seq)
+        if len(pairs) > self.get_element_count():
+            # Pairs already in T come first, so as with insert they win.
+            self._bulk_load(itertools.chain(self.items(),pairs))
+            return
+
+        for x in pairs:
+            self.insert(x[0],x[1])
+
+    def delete_range(self,lo,hi):
         """
-        T.get_max(...) -> Node. Produces the Node that has the maximum
-        key attribute in T.
+        T.delete_range(lo,hi) -> Nat. Deletes every Node in T with
+        lo <= key < hi and produces the number of Nodes deleted.
+        When most of T is deleted, the remainder is rebuilt with
+        from_sorted instead of deleting the Nodes one by one.
         """
-        if len(args) == 0:
-            node = self.Root
-        else:
-            node = args[0]
+        keys = [node.key for node in self.range(lo,hi)]
 
-        if not node.right:
-            return node
+        if 2 * len(keys) > self.get_element_count():
+            rest = [(node.key,node.value) for node in self.iter_inorder()
+                    if not lo <= node.key < hi]
+            self._bulk_load(rest)
         else:
-            return self.get_max(node.right)
+            for key in keys:
+                self.delete(key)
 
-    def get_min(self,*args):
+        return len(keys)
+
+    def union(self,other,merge=None):
         """
-        T.get_min(...) -> Node. Produces the Node that has the minimum
-        key attribute in T.
+        T.union(other,merge=None) -> Tree. Produces a tree of the keys
+        in T or in other, which must be a tree of the same class. For
+        keys in both, the value is merge(key,value_in_T,value_in_other),
+        or the value in T if merge is None. T and other are unchanged.
         """
-        if len(args) == 0:
-            node = self.Root
-        else:
-            node = args[0]
+        return self._set_operation(other,True,True,True,merge,False)
 
-        if not node.left:
-            return node
-        else:
-            return self.get_min(node.left)
+    def intersection(self,other,merge=None):
+        """
+        T.intersection(other,merge=None) -> Tree. Produces a tree of the
+        keys in both T and other, which must be a tree of the same class,
+        with values given by merge as for union. T and other are unchanged.
+        """
+        return self._set_operation(other,False,False,True,merge,False)
 
-    def get_element_count(self,*args):
+    def difference(self,other):
         """
-        T.get_element_count(...) -> Nat. Produces the number of elements
-        in T.
+        T.difference(other) -> Tree. Produces a tree of the keys in T
+        that are not in other, which must be a tree of the same class.
+        T and other are unchanged.
         """
-        if len(args) == 0:
-            node = self.Root
-        else:
-            node = args[0]
+        return self._set_operation(other,True,False,False,None,False)
 
-        left = 0
-        right = 0
+    def symmetric_difference(self,other):
+        """
+        T.symmetric_difference(other) -> Tree. Produces a tree of the keys
+        in exactly one of T and other, which must be a tree of the same
+        class. T and other are unchanged.
+        """
+        return self._set_operation(other,True,True,False,None,False)
 
-        if node:
-            if node.left:
-                left = self.get_element_count(node.left)
-            if node.right:
-                right = self.get_element_count(node.right)
+    def union_update(self,other,merge=None):
+        """
+        T.union_update(other,merge=None). Makes T the union of T and
+        other, as for union, taking over the Nodes of other, which is
+        left empty.
+        """
+        self._adopt(self._set_operation(other,True,True,True,merge,True))
 
-            return 1 + left + right
-        else:
-            return 0
+    def intersection_update(self,other,merge=None):
+        """
+        T.intersection_update(other,merge=None). Makes T the intersection
+        of T and other, as for intersection. other is left empty.
+        """
+        self._adopt(self._set_operation(other,False,False,True,merge,True))
 
-    def get_height(self,*args):
+    def difference_update(self,other):
         """
-        T.get_height(...) -> Nat. Produces the height of T, defined
-        as one added to the height of the tallest subtree.
+        T.difference_update(other). Removes the keys of other from T.
+        other is left empty.
         """
-        if len(args) == 0:
-            node = self.Root
-        else:
-            node = args[0]
+        self._adopt(self._set_operation(other,True,False,False,None,True))
 
-        if not node or (not node.left and not node.right):
-            return 0
+    def symmetric_difference_update(self,other):
+        """
+        T.symmetric_difference_update(other). Makes T the symmetric
+        difference of T and other, as for symmetric_difference. other
+        is left empty.
+        """
+        self._adopt(self._set_operation(other,True,True,False,None,True))
+
+    def _set_operation(self,other,keep_self,keep_other,keep_both,merge,consume):
+        """
+        T._set_operation(other,keep_self,keep_other,keep_both,merge,consume) -> Tree.
+        Produces a tree keeping the keys only in T, only in other and in
+        both as the flags say, by merging the keys of both in order and
+        building the result with from_sorted. If consume is True, T and
+        other are left empty, and when one is much smaller than the other
+        and they support it, the larger tree is instead split around the
+        keys of the smaller one and the pieces joined back together.
+        """
+        if not other.__class__ is self.__class__:
+            raise TypeError(str(other) + " is not a " + self.__class__.__name__)
+        if other is self:
+            raise ValueError("Cannot combine a tree with itself")
+        if merge is None:
+            merge = lambda key, value, other_value: value
+
+        if consume and self._use_join(other):
+            if self.get_element_count() <= other.get_element_count():
+                tree = self._join_operation(other,self,keep_other,keep_self,keep_both,merge)
+            else:
+                swapped = lambda key, value, other_value: merge(key,other_value,value)
+                tree = self._join_operation(self,other,keep_self,keep_other,keep_both,swapped)
         else:
-            return 1 + max(self.get_height(node.left), self.get_height(node.right))
+            tree = self._spawn()
+            tree._bulk_load(self._merge_items(other,keep_self,keep_other,keep_both,merge))
+
+        if consume:
+            # The result may reuse either tree when the other is empty.
+            for operand in (self,other):
+                if operand is not tree:
+                    operand.Root = None
+        return tree
+
+    def _adopt(self,tree):
+        """
+        T._adopt(tree). Makes T hold the Nodes of tree, a tree of the
+        same class, which is left empty.
+        """
+        if tree is not self:
+            self.Root = tree.Root
+            tree.Root = None
+
+    def _merge_items(self,other,keep_self,keep_other,keep_both,merge):
+        """
+        T._merge_items(other,keep_self,keep_other,keep_both,merge) -> Iterator.
+        Produces the (key,value) pairs kept by a set operation on T and
+        other in increasing order of key, in one pass over both.
+        """
+        mine = self.items()
+        theirs = other.items()
+        pair = next(mine,None)
+        other_pair = next(theirs,None)
+
+        while pair and other_pair:
+            if pair[0] < other_pair[0]:
+                if keep_self:
+                    yield pair
+                pair = next(mine,None)
+            elif other_pair[0] < pair[0]:
+                if keep_other:
+                    yield other_pair
+                other_pair = next(theirs,None)
+            else:
+                if keep_both:
+                    yield (pair[0],merge(pair[0],pair[1],other_pair[1]))
+                pair = next(mine,None)
+                other_pair = next(theirs,None)
+
+        if pair and keep_self:
+            yield pair
+            for pair in mine:
+                yield pair
+        if other_pair and keep_other:
+            yield other_pair
+            for other_pair in theirs:
+                yield other_pair
+
+    def _use_join(self,other):
+        """
+        T._use_join(other) -> Boolean. Produces True if a set operation
+        on T and other should split and join trees rather than merge
+        their keys. Only trees with split and join can do so.
+        """
+        return False
+
+    def _join_operation(self,big,small,keep_big,keep_small,keep_both,merge):
+        """
+        T._join_operation(big,small,keep_big,keep_small,keep_both,merge) -> Tree.
+        Produces the result of a set operation on big and small by
+        splitting big around the root of small, recursing on both halves
+        and joining the results, which takes O(m log(n/m)) time for
+        sizes m <= n. merge is called as merge(key,value_in_small,value_in_big).
+        big and small are left empty.
+        """
+        if not small.Root:
+            return big if keep_big else big._spawn()
+        if not big.Root:
+            return small if keep_small else small._spawn()
+
+        node = small.Root
+        small.Root = None
+        small_left = small._spawn()
+        small_left.Root = node.left
+        small_right = small._spawn()
+        small_right.Root = node.right
+        for child in (node.left,node.right):
+            if child:
+                child.parent = None
+        node.left = None
+        node.right = None
+
+        big_left, big_right = big.split(node.key)
+        match = big_right.get_min() if big_right.Root else None
+        found = match is not None and match.key == node.key
+        if found:
+            if keep_both:
+                node.value = merge(node.key,node.value,match.value)
+            big_right.delete(node.key)
+
+        left = self._join_operation(big_left,small_left,keep_big,keep_small,keep_both,merge)
+        right = self._join_operation(big_right,small_right,keep_big,keep_small,keep_both,merge)
+
+        if keep_both if found else keep_small:
+            return left._join_trees(left,node,right)
+        return left.join(left,right)
 
     def _delete_leaf(self,node):
         """
         T._delete_leaf(node). Deletes node from T, treating it as a leaf.
         """
         par_node = node.parent
+        self._update_sizes(par_node,-1)
 
         if par_node:
             if par_node.left == node:
@@ -311,20 +1018,25 @@ class BSTree:
 
             del node
 
+        else:
+            self.Root = None
+
     def _delete_leaf_parent(self,node):
         """
         T._delete_leaf_parent(node). Deletes node from T, treating it
         as a node with only one child.
         """
         par_node = node.parent
+        self._update_sizes(par_node,-1)
 
-        if node.key == self.Root.key:
+        if node == self.Root:
             if node.right:
                 self.Root = node.right
                 node.right = None
             else:
                 self.Root = node.left
                 node.left = None
+            self.Root.parent = None
 
         else:
             if par_node.right == node:
@@ -354,33 +1066,15 @@ class BSTree:
         T._switch_nodes(node1,node2). Switches positions
         of node1 and node2 in T.
         """
-        switch1 = node1
-        switch2 = node2
-        temp_key = switch1.key
-        temp_value = switch1.value
-
-        if switch1.key == self.Root.key:
-            self.Root.key = node2.key
-            self.Root.value = node2.value
-            switch2.key = temp_key
-            switch2.value = temp_value
-
-        elif switch2.key == self.Root.key:
-            switch1.key = self.Root.key
-            self.Root.key = temp_key
-            self.Root.value = temp_value
-        else:
-            switch1.key = node2.key
-            switch1.value = node2.value
-            switch2.key = temp_key
-            switch2.value = temp_value
+        node1.key, node2.key = node2.key, node1.key
+        node1.value, node2.value = node2.value, node1.value
 
     def _delete_node(self,node):
         """
         T._delete_node(node). Deletes node from T, treating it as
         a node with two children.
         """
-        if self.get_height(node.left) > self.get_height(node.right):
+        if self.get_element_count(node.left) > self.get_element_count(node.right):
             to_switch = self.get_max(node.left)
             self._switch_nodes(node,to_switch)
 
@@ -401,11 +1095,11 @@ class BSTree:
                 to_delete = self.get_min(node.right)
                 self._delete_leaf_parent(to_delete)
 
-    def delete(self,key):
-        """T.delete(key) <==> del T[key]. Deletes the node
+    def delete(self,key,*args):
+        """T.delete(key...) <==> del T[key]. Deletes the node
         with key attribute key from T.
         """
-        node = self.get_node(key,self.Root)
+        node = self.get_node(key,args[0] if args else self.Root)
 
         if node:
             if not (node.left or node.right):
@@ -417,13 +1111,39 @@ class BSTree:
             else:
                 self._delete_node(node)
 
+    def _deletes_most(self,keys):
+        """
+        T._deletes_most(keys) -> Boolean. Produces True if more than half
+        of the keys in T are in the sequence keys, without changing T.
+        Keys are only looked up when there are enough distinct ones.
+        """
+        count = self.get_element_count()
+        doomed = set(keys)
+        if not 2 * len(doomed) > count:
+            return False
+
+        present = 0
+        for key in doomed:
+            node = self.floor(key)
+            if node and node.key == key:
+                present = present + 1
+        return 2 * present > count
+
     def delete_from(self,seq):
         """
-        T.delete_from(seq). For every keyin seq, deletes
-        the Node with that key attribute from T.
+        T.delete_from(seq). For every key in seq, deletes
+        the Node with that key attribute from T. When seq would
+        delete most of T, the rest is rebuilt with from_sorted instead.
         """
-        if isinstance(seq,collections.Iterable):
-            for x in seq:
-                self.delete(x)
-        else:
-            raise TypeError(str(iter) + " is not iterable")
\ No newline at end of file
+        if not isinstance(seq,collections.Iterable):
+            raise TypeError(str(seq) + " is not iterable")
+
+        keys = list(seq)
+        if self._deletes_most(keys):
+            doomed = set(keys)
+            self._bulk_load([(node.key,node.value) for node in self.iter_inorder()
+                             if node.key not in doomed])
+            return
+
+        for key in keys:
+            self.delete(key)
\ No newline at end of file
@@ -0,0 +1,773 @@
+#!/usr/bin/env python
+# Author: Tyler Sanderson <tylerbtbam@gmail.com>
+#
+# This file is part of PyBST.
+#
+# PyBST is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyBST is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyBST.  If not, see <http://www.gnu.org/licenses/>.
+
+import bisect
+import collections
+import itertools
+import bstree
+
+BSTree = bstree.BSTree
+
+DEFAULT_ORDER = 64
+
+class BTreeNode(object):
+    """
+    Represents a node of a B-Tree. A node holds its keys in increasing
+    order in the list keys, their values at the same positions in the
+    list values, and, unless it is a leaf, one more child than it has
+    keys in the list children. size is the number of keys in its subtree.
+    """
+    __slots__ = ('keys','values','children','size')
+
+    def __init__(self,keys,values,children,size):
+        self.keys = keys
+        self.values = values
+        self.children = children
+        self.size = size
+
+class BTreeEntry(object):
+    """
+    Represents one key of a B-Tree and its value, as produced by
+    get_node and other BTree methods in place of a Node. It has key
+    and value attributes like a Node, and setting value changes the
+    value in the tree. An entry is only valid until the tree is next
+    changed.
+    """
+    __slots__ = ('node','index')
+
+    def __init__(self,node,index):
+        self.node = node
+        self.index = index
+
+    @property
+    def key(self):
+        """E.key -> Number. The key of E."""
+        return self.node.keys[self.index]
+
+    @property
+    def value(self):
+        """E.value -> Object. The value of E, which can be set."""
+        return self.node.values[self.index]
+
+    @value.setter
+    def value(self,value):
+        self.node.values[self.index] = value
+
+    def __eq__(self,other):
+        """E.__eq__(other) <==> E == other. True if both are the same key of the same node."""
+        return (isinstance(other,BTreeEntry) and self.node is other.node
+                and self.index == other.index)
+
+    def __ne__(self,other):
+        """E.__ne__(other) <==> E != other"""
+        return not self == other
+
+class BTree(BSTree):
+    """
+    BTree implements a B-Tree.
+
+    A B-Tree of order m is a balanced search tree whose nodes each hold
+    up to m - 1 keys in a sorted list and have one more child than keys.
+    Every node but the root holds at least ceil(m/2) - 1 keys, and all
+    leaves are at the same depth, so a tree of n keys is about log_m(n)
+    nodes deep. Searches use bisect within each node, so a lookup
+    follows far fewer references than in a binary tree.
+
+    Methods that produce Nodes in a BSTree produce BTreeEntry objects,
+    with the same key and value attributes, except that preorder,
+    postorder and levelorder produce the BTreeNodes themselves.
+
+    For more information regarding B-Trees, see:
+    http://en.wikipedia.org/wiki/B-tree
+
+    Constructors:
+
+    BTree() -> Creates a new empty B-Tree
+    BTree(seq) -> Creates a new B-Tree from the elements in sequence [(k1,v1),(k2,v2),...,(kn,vn)]
+    BTree(...,order=m) -> Gives every node at most m children, 64 by default
+    """
+    def __init__(self,*args,**kwargs):
+        """Sets the order, then initializes the tree the same as a BSTree"""
+        order = kwargs.pop('order',DEFAULT_ORDER)
+        if kwargs:
+            raise TypeError("Unexpected keyword arguments " + str(sorted(kwargs)))
+        if order < 3:
+            raise ValueError("B-Tree order must be at least 3, not " + str(order))
+
+        self.order = order
+        self._max_keys = order - 1
+        self._min_keys = (order + 1) // 2 - 1
+        BSTree.__init__(self,*args)
+
+    @classmethod
+    def from_sorted(cls,seq,order=DEFAULT_ORDER):
+        """
+        Tree.from_sorted(seq,order=64) -> Tree. Creates a new B-Tree of
+        the given order from the elements in sequence [(k1,v1),(k2,v2),...,(kn,vn)]
+        in linear time, with its nodes as evenly filled as possible.
+        If seq is not sorted by key it is sorted first.
+        """
+        tree = cls(order=order)
+        tree._bulk_load(seq)
+        return tree
+
+    def _spawn(self):
+        """
+        T._spawn() -> Tree. Produces a new empty B-Tree of the same
+        class and order as T.
+        """
+        return self.__class__(order=self.order)
+
+    def _load_sorted(self,count,items):
+        """
+        T._load_sorted(count,items). Replaces the contents of T with a
+        B-Tree built level by level from the first count key, value
+        pairs produced by the iterator items, which must be in strictly
+        increasing key order.
+
+        The leaves are the fewest that can hold the keys, sharing them
+        as evenly as possible, with one key between each two leaves
+        moving up a level. Each level above is built from the one
+        below in the same way.
+        """
+        if count == 0:
+            self.Root = None
+            return
+
+        order = self.order
+        leaves = -(-(count + 1) // order)
+        base, extra = divmod(count - leaves + 1,leaves)
+        nodes = []
+        separators = []
+        for i in xrange(leaves):
+            size = base + 1 if i < extra else base
+            keys = []
+            values = []
+            for key, value in itertools.islice(items,size):
+                keys.append(key)
+                values.append(value)
+            nodes.append(BTreeNode(keys,values,None,size))
+            if i < leaves - 1:
+                separators.append(next(items))
+
+        while len(nodes) > 1:
+            parents = -(-len(nodes) // order)
+            base, extra = divmod(len(nodes),parents)
+            level = []
+            above = []
+            start = 0
+            for i in xrange(parents):
+                stop = start + (base + 1 if i < extra else base)
+                children = nodes[start:stop]
+                pairs = separators[start:stop - 1]
+                size = len(pairs) + sum(child.size for child in children)
+                level.append(BTreeNode([pair[0] for pair in pairs],
+                                       [pair[1] for pair in pairs],children,size))
+                if i < parents - 1:
+                    above.append(separators[stop - 1])
+                start = stop
+            nodes = level
+            separators = above
+
+        self.Root = nodes[0]
+
+    def get_violations(self,*args):
+        """
+        T.get_violations(...) -> Sequence. Produces a description of
+        every way in which T fails to be a valid B-Tree, visiting each
+        node once. Keys are checked against the bounds set by all of
+        their ancestors, not only their parents.
+        """
+        if len(args) == 0:
+            node = self.Root
+        else:
+            node = args[0]
+
+        violations = []
+        if not node:
+            return violations
+
+        leaf_depth = None
+        stack = [(node,None,None,0)]
+        while stack:
+            node, lo, hi, depth = stack.pop()
+            keys = node.keys
+
+            # A node out of its bounds is not descended into, so a
+            # child link back to an ancestor cannot loop forever.
+            if keys and lo is not None and not lo < keys[0]:
+                violations.append("Node with keys " + str(keys) + " is to the right of " + str(lo) + " but is not larger")
+                continue
+            if keys and hi is not None and not keys[-1] < hi:
+                violations.append("Node with keys " + str(keys) + " is to the left of " + str(hi) + " but is not smaller")
+                continue
+
+            if len(node.values) != len(keys):
+                violations.append("Node with keys " + str(keys) + " has " + str(len(node.values)) + " values")
+            if len(keys) > self._max_keys:
+                violations.append("Node with keys " + str(keys) + " holds more than " + str(self._max_keys) + " keys")
+            if len(keys) < (1 if depth == 0 else self._min_keys):
+                violations.append("Node with keys " + str(keys) + " holds too few keys")
+
+            for i in xrange(1,len(keys)):
+                if not keys[i - 1] < keys[i]:
+                    violations.append("Keys " + str(keys) + " of node are not in increasing order")
+                    break
+
+            if node.children is None:
+                if leaf_depth is None:
+                    leaf_depth = depth
+                elif depth != leaf_depth:
+                    violations.append("Leaf with keys " + str(keys) + " is at depth " + str(depth) + " and should be at " + str(leaf_depth))
+                expected_size = len(keys)
+            else:
+                children = node.children
+                if len(children) != len(keys) + 1:
+                    violations.append("Node with keys " + str(keys) + " has " + str(len(children)) + " children")
+                bounds = [lo] + keys + [hi]
+                for i, child in enumerate(children[:len(bounds) - 1]):
+                    stack.append((child,bounds[i],bounds[i + 1],depth + 1))
+                expected_size = len(keys) + sum(child.size for child in children)
+
+            if not (node.size == expected_size):
+                violations.append("Size of node with keys " + str(keys) + " is " + str(node.size) + " and should be " + str(expected_size))
+
+        return violations
+
+    def iter_preorder(self,*args):
+        """
+        T.iter_preorder(...) -> Iterator. Produces the BTreeNodes in T
+        one at a time in preorder.
+        """
+        if len(args) == 0:
+            node = self.Root
+        else:
+            node = args[0]
+
+        stack = [node] if node else []
+        while stack:
+            node = stack.pop()
+            yield node
+            if node.children:
+                stack.extend(reversed(node.children))
+
+    def iter_postorder(self,*args):
+        """
+        T.iter_postorder(...) -> Iterator. Produces the BTreeNodes in T
+        one at a time in postorder.
+        """
+        if len(args) == 0:
+            node = self.Root
+        else:
+            node = args[0]
+
+        stack = [(node,0)] if node else []
+        while stack:
+            node, i = stack.pop()
+            if node.children and i < len(node.children):
+                stack.append((node,i + 1))
+                stack.append((node.children[i],0))
+            else:
+                yield node
+
+    def iter_levelorder(self,*args):
+        """
+        T.iter_levelorder(...) -> Iterator. Produces the BTreeNodes in T
+        one at a time in levelorder.
+        """
+        if len(args) == 0:
+            node = self.Root
+        else:
+            node = args[0]
+
+        q = collections.deque()
+        if node:
+            q.append(node)
+        while q:
+            node = q.popleft()
+            yield node
+            if node.children:
+                q.extend(node.children)
+
+    def _walk(self,lo,hi,reverse):
+        """
+        T._walk(lo,hi,reverse) -> Iterator. Produces the (BTreeNode,index)
+        positions of the keys in T with lo <= key < hi one at a time in
+        increasing order of key, or in decreasing order if reverse is
+        True. None stands for no bound. Only the nodes holding the keys
+        produced and the paths leading to them are visited.
+        """
+        stack = []
+        node = self.Root
+        while node:
+            if not reverse:
+                i = 0 if lo is None else bisect.bisect_left(node.keys,lo)
+            else:
+                i = len(node.keys) if hi is None else bisect.bisect_left(node.keys,hi)
+            stack.append((node,i))
+            node = node.children[i] if node.children else None
+
+        while stack:
+            node, i = stack.pop()
+            keys = node.keys
+            if node.children is None:
+                if not reverse:
+                    for j in xrange(i,len(keys)):
+                        if hi is not None and not keys[j] < hi:
+                            return
+                        yield node, j
+                else:
+                    for j in xrange(i - 1,-1,-1):
+                        if lo is not None and keys[j] < lo:
+                            return
+                        yield node, j
+                continue
+
+            # The child before (or after) key i has been produced
+            if not reverse:
+                if i == len(keys):
+                    continue
+                if hi is not None and not keys[i] < hi:
+                    return
+                yield node, i
+                stack.append((node,i + 1))
+                child = node.children[i + 1]
+                while child:
+                    stack.append((child,0))
+                    child = child.children[0] if child.children else None
+            else:
+                if i == 0:
+                    continue
+                if lo is not None and keys[i - 1] < lo:
+                    return
+                yield node, i - 1
+                stack.append((node,i - 1))
+                child = node.children[i - 1]
+                while child:
+                    stack.append((child,len(child.keys)))
+                    child = child.children[-1] if child.children else None
+
+    def iter_inorder(self,*args):
+        """
+        T.iter_inorder(...) -> Iterator. Produces a BTreeEntry for
+        each key in T one at a time in increasing order of key.
+        """
+        if args:
+            tree = self._spawn()
+            tree.Root = args[0]
+        else:
+            tree = self
+
+        for node, i in tree._walk(None,None,False):
+            yield BTreeEntry(node,i)
+
+    def keys(self):
+        """
+        T.keys() -> Iterator. Produces the keys in T one at a time
+        in increasing order.
+        """
+        for node, i in self._walk(None,None,False):
+            yield node.keys[i]
+
+    def values(self):
+        """
+        T.values() -> Iterator. Produces the values in T one at a time
+        in increasing order of their keys.
+        """
+        for node, i in self._walk(None,None,False):
+            yield node.values[i]
+
+    def items(self):
+        """
+        T.items() -> Iterator. Produces the (key,value) pairs in T one
+        at a time in increasing order of key.
+        """
+        for node, i in self._walk(None,None,False):
+            yield (node.keys[i],node.values[i])
+
+    def get_node(self,key,*args):
+        """
+        T.get_node(key,...) -> BTreeEntry. Produces the entry in T with
+        key attribute key. If there is no such entry, produces None.
+        """
+        if len(args) == 0:
+            node = self.Root
+        else:
+            node = args[0]
+
+        bisect_left = bisect.bisect_left
+        while node:
+            keys = node.keys
+            i = bisect_left(keys,key)
+            if i < len(keys) and keys[i] == key:
+                return BTreeEntry(node,i)
+            children = node.children
+            if children is None:
+                return None
+            node = children[i]
+
+        return None
+
+    def floor(self,key):
+        """
+        T.floor(key) -> BTreeEntry. Produces the entry in T with the
+        largest key attribute less than or equal to key. If there is
+        no such entry, produces None.
+        """
+        node = self.Root
+        best = None
+        while node:
+            i = bisect.bisect_right(node.keys,key)
+            if i:
+                best = BTreeEntry(node,i - 1)
+                if node.keys[i - 1] == key:
+                    return best
+            node = node.children[i] if node.children else None
+        return best
+
+    def ceiling(self,key):
+        """
+        T.ceiling(key) -> BTreeEntry. Produces the entry in T with the
+        smallest key attribute greater than or equal to key. If there
+        is no such entry, produces None.
+        """
+        node = self.Root
+        best = None
+        while node:
+            i = bisect.bisect_left(node.keys,key)
+            if i < len(node.keys):
+                best = BTreeEntry(node,i)
+                if node.keys[i] == key:
+                    return best
+            node = node.children[i] if node.children else None
+        return best
+
+    def successor(self,node):
+        """
+        T.successor(entry) -> BTreeEntry. Produces the entry that follows
+        entry in inorder, or None if entry has the maximum key in T.
+        """
+        for position in self._walk(node.key,None,False):
+            if position[0].keys[position[1]] != node.key:
+                return BTreeEntry(*position)
+        return None
+
+    def predecessor(self,node):
+        """
+        T.predecessor(entry) -> BTreeEntry. Produces the entry that precedes
+        entry in inorder, or None if entry has the minimum key in T.
+        """
+        for position in self._walk(None,node.key,True):
+            return BTreeEntry(*position)
+        return None
+
+    def _path_to(self,key):
+        """
+        T._path_to(key) -> (Sequence,BTreeNode,Nat,Boolean). Searches T
+        for key. Produces the (node,child index) steps taken above the
+        last node reached, that node, the position of key in it, and
+        whether key was found there. The last node is a leaf unless
+        key was found.
+        """
+        path = []
+        node = self.Root
+        while True:
+            keys = node.keys
+            i = bisect.bisect_left(keys,key)
+            if i < len(keys) and keys[i] == key:
+                return path, node, i, True
+            if node.children is None:
+                return path, node, i, False
+            path.append((node,i))
+            node = node.children[i]
+
+    def insert(self,key,value):
+        """
+        T.insert(key,value) <==> T[key] = value. Inserts key and value
+        into a leaf of T, then splits every node on the way up that
+        holds too many keys.
+        """
+        if not isinstance(key,(int,long,float)):
+            raise TypeError(str(key) + " is not a number")
+        if not self.Root:
+            self.Root = BTreeNode([key],[value],None,1)
+            return
+
+        path, node, i, found = self._path_to(key)
+        if found:
+            return
+
+        node.keys.insert(i,key)
+        node.values.insert(i,value)
+        node.size = node.size + 1
+        for parent, _ in path:
+            parent.size = parent.size + 1
+
+        while len(node.keys) > self._max_keys:
+            middle = len(node.keys) // 2
+            key = node.keys[middle]
+            value = node.values[middle]
+            right = BTreeNode(node.keys[middle + 1:],node.values[middle + 1:],None,0)
+            del node.keys[middle:]
+            del node.values[middle:]
+            if node.children is None:
+                right.size = len(right.keys)
+            else:
+                right.children = node.children[middle + 1:]
+                del node.children[middle + 1:]
+                right.size = len(right.keys) + sum(child.size for child in right.children)
+            node.size = node.size - right.size - 1
+
+            if not path:
+                self.Root = BTreeNode([key],[value],[node,right],node.size + right.size + 1)
+                return
+            node, i = path.pop()
+            node.keys.insert(i,key)
+            node.values.insert(i,value)
+            node.children.insert(i + 1,right)
+
+    def insert_from(self,seq):
+        """
+        T.insert_from(seq). For every key, value pair in seq, inserts
+        key and value into T. When seq has more pairs than T has keys,
+        T is rebuilt from both with from_sorted instead.
+        """
+        if not isinstance(seq,collections.Iterable):
+            raise TypeError(str(seq) + " is not iterable")
+
+        pairs = list(seq)
+        if len(pairs) > self.get_element_count():
+            # Pairs already in T come first, so as with insert they win.
+            self._bulk_load(itertools.chain(self.items(),pairs))
+            return
+
+        for x in pairs:
+            self.insert(x[0],x[1])
+
+    def get_max(self,*args):
+        """
+        T.get_max(...) -> BTreeEntry. Produces the entry that has the
+        maximum key attribute in T.
+        """
+        if len(args) == 0:
+            node = self.Root
+        else:
+            node = args[0]
+
+        while node.children:
+            node = node.children[-1]
+        return BTreeEntry(node,len(node.keys) - 1)
+
+    def get_min(self,*args):
+        """
+        T.get_min(...) -> BTreeEntry. Produces the entry that has the
+        minimum key attribute in T.
+        """
+        if len(args) == 0:
+            node = self.Root
+        else:
+            node = args[0]
+
+        while node.children:
+            node = node.children[0]
+        return BTreeEntry(node,0)
+
+    def get_element_count(self,*args):
+        """
+        T.get_element_count(...) -> Nat. Produces the number of elements
+        in T.
+        """
+        if len(args) == 0:
+            node = self.Root
+        else:
+            node = args[0]
+
+        return node.size if node else 0
+
+    def rank(self,key):
+        """
+        T.rank(key) -> Nat. Produces the number of keys in T that are
+        smaller than key, i.e. the position key has or would have in
+        T.inorder().
+        """
+        node = self.Root
+        rank = 0
+        while node:
+            keys = node.keys
+            i = bisect.bisect_left(keys,key)
+            rank = rank + i
+            if node.children is None:
+                return rank
+            for child in itertools.islice(node.children,i):
+                rank = rank + child.size
+            if i < len(keys) and keys[i] == key:
+                return rank + node.children[i].size
+            node = node.children[i]
+        return rank
+
+    def select(self,index):
+        """
+        T.select(index) -> BTreeEntry. Produces the entry with the
+        index-th smallest key in T, counting from 0, so that T.select(0)
+        is T.get_min(). Raises IndexError if there is no such entry.
+        """
+        if index < 0 or index >= self.get_element_count():
+            raise IndexError("Tree index " + str(index) + " out of range")
+
+        node = self.Root
+        while node.children:
+            for i, child in enumerate(node.children):
+                if index < child.size:
+                    node = child
+                    break
+                index = index - child.size
+                if index == 0:
+                    return BTreeEntry(node,i)
+                index = index - 1
+        return BTreeEntry(node,index)
+
+    def range(self,lo,hi,reverse=False):
+        """
+        T.range(lo,hi,reverse=False) -> Iterator. Produces the entries in T
+        with lo <= key < hi one at a time in increasing order of key,
+        or in decreasing order if reverse is True. Only the nodes
+        holding them and the paths leading to them are visited.
+        """
+        for node, i in self._walk(lo,hi,reverse):
+            yield BTreeEntry(node,i)
+
+    def get_height(self,*args):
+        """
+        T.get_height(...) -> Nat. Produces the height of T, the number
+        of levels of nodes below the root.
+        """
+        if len(args) == 0:
+            node = self.Root
+        else:
+            node = args[0]
+
+        height = 0
+        while node and node.children:
+            node = node.children[0]
+            height = height + 1
+        return height
+
+    def delete(self,key):
+        """
+        T.delete(key) <==> del T[key]. Deletes key from T. A key in an
+        inner node is first swapped with its predecessor in a leaf.
+        Then every node on the way up that holds too few keys borrows
+        a key from a sibling or is merged with one.
+        """
+        if not self.Root:
+            return
+        path, node, i, found = self._path_to(key)
+        if not found:
+            return
+
+        if node.children is not None:
+            inner, index = node, i
+            path.append((node,i))
+            node = node.children[i]
+            while node.children is not None:
+                path.append((node,len(node.children) - 1))
+                node = node.children[-1]
+            i = len(node.keys) - 1
+            inner.keys[index] = node.keys[i]
+            inner.values[index] = node.values[i]
+
+        del node.keys[i]
+        del node.values[i]
+        node.size = node.size - 1
+        for parent, _ in path:
+            parent.size = parent.size - 1
+
+        while path and len(node.keys) < self._min_keys:
+            parent, i = path.pop()
+            self._fix_underflow(parent,i)
+            node = parent
+
+        root = self.Root
+        if not root.keys:
+            self.Root = root.children[0] if root.children else None
+
+    def _fix_underflow(self,parent,i):
+        """
+        T._fix_underflow(parent,i). Gives the child i of parent, which
+        holds one key too few, a key from a sibling that can spare one,
+        or else merges it with a sibling and the key between them.
+        """
+        node = parent.children[i]
+        left = parent.children[i - 1] if i > 0 else None
+        right = parent.children[i + 1] if i < len(parent.children) - 1 else None
+
+        if left and len(left.keys) > self._min_keys:
+            node.keys.insert(0,parent.keys[i - 1])
+            node.values.insert(0,parent.values[i - 1])
+            parent.keys[i - 1] = left.keys.pop()
+            parent.values[i - 1] = left.values.pop()
+            moved = 1
+            if left.children is not None:
+                child = left.children.pop()
+                node.children.insert(0,child)
+                moved = moved + child.size
+            left.size = left.size - moved
+            node.size = node.size + moved
+
+        elif right and len(right.keys) > self._min_keys:
+            node.keys.append(parent.keys[i])
+            node.values.append(parent.values[i])
+            parent.keys[i] = right.keys.pop(0)
+            parent.values[i] = right.values.pop(0)
+            moved = 1
+            if right.children is not None:
+                child = right.children.pop(0)
+                node.children.append(child)
+                moved = moved + child.size
+            right.size = right.size - moved
+            node.size = node.size + moved
+
+        else:
+            if left:
+                node, right, i = left, node, i - 1
+            node.keys.append(parent.keys.pop(i))
+            node.values.append(parent.values.pop(i))
+            node.keys.extend(right.keys)
+            node.values.extend(right.values)
+            if node.children is not None:
+                node.children.extend(right.children)
+            node.size = node.size + 1 + right.size
+            del parent.children[i + 1]
+
+    def delete_from(self,seq):
+        """
+        T.delete_from(seq). For every key in seq, deletes that key
+        from T. When seq would delete most of T, the rest is rebuilt
+        with from_sorted instead.
+        """
+        if not isinstance(seq,collections.Iterable):
+            raise TypeError(str(seq) + " is not iterable")
+
+        keys = list(seq)
+        if self._deletes_most(keys):
+            doomed = set(keys)
+            self._bulk_load([pair for pair in self.items() if pair[0] not in doomed])
+            return
+
+        for key in keys:
+            self.delete(key)
\ No newline at end of file
@@ -0,0 +1,390 @@
+#!/usr/bin/env python
+# Author: Tyler Sanderson <tylerbtbam@gmail.com>
+#
+# This file is part of PyBST.
+#
+# PyBST is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyBST is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyBST.  If not, see <http://www.gnu.org/licenses/>.
+
+import threading
+import weakref
+import bstree
+import persistent
+import splaytree
+
+Node = bstree.Node
+PersistentTree = persistent.PersistentTree
+SplayTree = splaytree.SplayTree
+
+class RWLock(object):
+    """
+    RWLock is a readers-writer lock. Any number of threads may hold
+    it for reading at once, while a thread holding it for writing
+    holds it alone. Waiting writers go before new readers, so a
+    steady stream of readers cannot starve them.
+    """
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    def acquire_read(self):
+        """L.acquire_read(). Blocks until L can be held for reading."""
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers = self._readers + 1
+
+    def release_read(self):
+        """L.release_read(). Releases L held for reading."""
+        with self._cond:
+            self._readers = self._readers - 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        """L.acquire_write(). Blocks until L can be held for writing."""
+        with self._cond:
+            self._writers_waiting = self._writers_waiting + 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting = self._writers_waiting - 1
+            self._writer = True
+
+    def release_write(self):
+        """L.release_write(). Releases L held for writing."""
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+class ConcurrentTree(object):
+    """
+    ConcurrentTree wraps a BSTree, AVLTree, RBTree or SplayTree so
+    that it can be shared between threads. Methods that only read
+    the tree run under the read side of an RWLock, so they can run
+    together. Methods that change it run under the write side, one
+    at a time.
+
+    A Splay Tree rotates every Node it finds to the root, so its
+    get_node counts as a write. Use peek to look a key up without
+    splaying, under the read lock.
+
+    Nodes produced (by get_node, floor, select, ...) still belong to
+    the tree, and a later write may change them. Read what you need
+    from them straight away, or use get, which produces the value.
+    Methods that iterate over the tree produce lists, taken while
+    holding the lock.
+
+    Constructors:
+
+    ConcurrentTree(tree) -> Wraps tree, which should no longer be used directly
+    """
+    def __init__(self,tree):
+        self.tree = tree
+        self.lock = RWLock()
+        self._splays = isinstance(tree,SplayTree)
+
+    def _read(self,method,*args):
+        """
+        S._read(method,*args) -> Object. Produces method(*args),
+        called while holding the lock for reading.
+        """
+        self.lock.acquire_read()
+        try:
+            return method(*args)
+        finally:
+            self.lock.release_read()
+
+    def _write(self,method,*args):
+        """
+        S._write(method,*args) -> Object. Produces method(*args),
+        called while holding the lock for writing.
+        """
+        self.lock.acquire_write()
+        try:
+            return method(*args)
+        finally:
+            self.lock.release_write()
+
+    def _peek(self,key):
+        """
+        S._peek(key) -> Node. Produces the Node with key attribute key
+        without changing the tree.
+        """
+        if self._splays:
+            return self.tree.peek(key)
+        return self.tree.get_node(key)
+
+    def _get(self,key,default):
+        """
+        S._get(key,default) -> Object. Produces the value with key,
+        or default, without changing the tree.
+        """
+        node = self._peek(key)
+        return node.value if node else default
+
+    def is_valid(self):
+        """S.is_valid() -> Boolean. See BSTree.is_valid."""
+        return self._read(self.tree.is_valid)
+
+    def preorder(self):
+        """S.preorder() -> Sequence. See BSTree.preorder."""
+        return self._read(self.tree.preorder)
+
+    def inorder(self):
+        """S.inorder() -> Sequence. See BSTree.inorder."""
+        return self._read(self.tree.inorder)
+
+    def postorder(self):
+        """S.postorder() -> Sequence. See BSTree.postorder."""
+        return self._read(self.tree.postorder)
+
+    def levelorder(self):
+        """S.levelorder() -> Sequence. See BSTree.levelorder."""
+        return self._read(self.tree.levelorder)
+
+    def keys(self):
+        """S.keys() -> Sequence. Produces a list of the keys in increasing order."""
+        return self._read(lambda: list(self.tree.keys()))
+
+    def values(self):
+        """S.values() -> Sequence. Produces a list of the values in increasing order of key."""
+        return self._read(lambda: list(self.tree.values()))
+
+    def items(self):
+        """S.items() -> Sequence. Produces a list of the (key,value) pairs in increasing order of key."""
+        return self._read(lambda: list(self.tree.items()))
+
+    def get_node(self,key):
+        """
+        S.get_node(key) -> Node. See BSTree.get_node. Holds the lock
+        for writing if the tree is a Splay Tree.
+        """
+        if self._splays:
+            return self._write(self.tree.get_node,key)
+        return self._read(self.tree.get_node,key)
+
+    def peek(self,key):
+        """
+        S.peek(key) -> Node. Produces the Node with key attribute key,
+        or None, holding the lock for reading. A Splay Tree is not splayed.
+        """
+        return self._read(self._peek,key)
+
+    def get(self,key,default=None):
+        """
+        S.get(key,default=None) -> Object. Produces the value with key,
+        or default if there is no such key, holding the lock for reading.
+        A Splay Tree is not splayed.
+        """
+        return self._read(self._get,key,default)
+
+    def floor(self,key):
+        """S.floor(key) -> Node. See BSTree.floor."""
+        return self._read(self.tree.floor,key)
+
+    def ceiling(self,key):
+        """S.ceiling(key) -> Node. See BSTree.ceiling."""
+        return self._read(self.tree.ceiling,key)
+
+    def get_max(self):
+        """S.get_max() -> Node. See BSTree.get_max."""
+        return self._read(self.tree.get_max)
+
+    def get_min(self):
+        """S.get_min() -> Node. See BSTree.get_min."""
+        return self._read(self.tree.get_min)
+
+    def get_element_count(self):
+        """S.get_element_count() -> Nat. See BSTree.get_element_count."""
+        return self._read(self.tree.get_element_count)
+
+    def __len__(self):
+        """S.__len__() <==> len(S)"""
+        return self.get_element_count()
+
+    def get_height(self):
+        """S.get_height() -> Nat. See BSTree.get_height."""
+        return self._read(self.tree.get_height)
+
+    def rank(self,key):
+        """S.rank(key) -> Nat. See BSTree.rank."""
+        return self._read(self.tree.rank,key)
+
+    def select(self,index):
+        """S.select(index) -> Node. See BSTree.select."""
+        return self._read(self.tree.select,index)
+
+    def range(self,lo,hi,reverse=False):
+        """S.range(lo,hi,reverse=False) -> Sequence. Produces a list of the Nodes BSTree.range would produce."""
+        return self._read(lambda: list(self.tree.range(lo,hi,reverse)))
+
+    def count_range(self,lo,hi):
+        """S.count_range(lo,hi) -> Nat. See BSTree.count_range."""
+        return self._read(self.tree.count_range,lo,hi)
+
+    def freeze(self):
+        """S.freeze() -> FrozenTree. See BSTree.freeze."""
+        return self._read(self.tree.freeze)
+
+    def insert(self,key,value):
+        """S.insert(key,value). See BSTree.insert."""
+        self._write(self.tree.insert,key,value)
+
+    def insert_from(self,seq):
+        """S.insert_from(seq). See BSTree.insert_from."""
+        self._write(self.tree.insert_from,seq)
+
+    def delete(self,key):
+        """S.delete(key). See BSTree.delete."""
+        self._write(self.tree.delete,key)
+
+    def delete_from(self,seq):
+        """S.delete_from(seq). See BSTree.delete_from."""
+        self._write(self.tree.delete_from,seq)
+
+    def delete_range(self,lo,hi):
+        """S.delete_range(lo,hi) -> Nat. See BSTree.delete_range."""
+        return self._write(self.tree.delete_range,lo,hi)
+
+class VersionedTree(object):
+    """
+    VersionedTree publishes successive versions of a BSTree, AVLTree,
+    RBTree or persistent tree to readers that never take a lock. A
+    writer makes a new version from the current one and then publishes
+    it in one step. Readers that fetched an older version with current()
+    keep using it unchanged.
+
+    For a persistent tree, update produces the new version by copying
+    only the path to each changed Node, in O(log n) time per change.
+    For any other tree, update copies the whole current version first,
+    in O(n) time, so persistent trees suit frequent small updates.
+
+    Published trees must not be changed. Writers go through update
+    or publish, one at a time. A Splay Tree changes on every lookup,
+    so it cannot be published.
+
+    A version is reclaimed once no reader references it. Its Nodes
+    link to each other through their parent attributes, so the next
+    writer unlinks them for the reference counter to free them,
+    instead of leaving them to the cycle collector. Readers should
+    therefore hold on to the tree from current(), not to its Nodes.
+
+    Constructors:
+
+    VersionedTree(tree) -> Publishes tree as version 0
+    """
+    def __init__(self,tree):
+        if isinstance(tree,SplayTree):
+            raise TypeError("A Splay Tree changes on lookup and cannot be published")
+
+        self._published = (0,tree)
+        self._lock = threading.Lock()
+        self._retired = {}
+        self._unreferenced = []
+
+    def current(self):
+        """
+        V.current() -> Tree. Produces the current version of V.
+        The tree must not be changed.
+        """
+        return self._published[1]
+
+    def version(self):
+        """V.version() -> Nat. Produces the number of the current version of V."""
+        return self._published[0]
+
+    def update(self,func):
+        """
+        V.update(func) -> Nat. Publishes a new version of V made by func
+        and produces its version number. For a persistent tree, func is
+        called on the current version and produces the new one. For any
+        other tree, func changes a private copy of the current version.
+        Writers calling update run one at a time, so no change is lost.
+        """
+        with self._lock:
+            tree = self._published[1]
+            if isinstance(tree,PersistentTree):
+                tree = func(tree)
+            else:
+                tree = tree.copy()
+                func(tree)
+            return self._publish(tree)
+
+    def publish(self,tree):
+        """
+        V.publish(tree) -> Nat. Publishes tree as the new current
+        version of V and produces its version number. The tree must
+        not be changed afterwards.
+        """
+        if isinstance(tree,SplayTree):
+            raise TypeError("A Splay Tree changes on lookup and cannot be published")
+
+        with self._lock:
+            return self._publish(tree)
+
+    def _publish(self,tree):
+        """
+        V._publish(tree) -> Nat. Publishes tree and retires the previous
+        version. The caller must hold the writer lock.
+        """
+        version, old = self._published
+        self._published = (version + 1,tree)
+
+        if isinstance(old.Root,Node):
+            self._retired[version] = weakref.ref(old,self._make_callback(version,old.Root))
+        del old
+        self._reclaim()
+        return version + 1
+
+    def _make_callback(self,version,root):
+        """
+        V._make_callback(version,root) -> Function. Produces the callback
+        run when the tree of version has no references left. It queues
+        root for the next writer to unlink, keeping readers fast.
+        """
+        retired = self._retired
+        unreferenced = self._unreferenced
+        def callback(ref):
+            retired.pop(version,None)
+            unreferenced.append(root)
+        return callback
+
+    def _reclaim(self):
+        """
+        V._reclaim(). Unlinks the Nodes of every version that has no
+        references left, so the reference counter frees them.
+        """
+        while self._unreferenced:
+            stack = [self._unreferenced.pop()]
+            while stack:
+                node = stack.pop()
+                node.parent = None
+                if node.left:
+                    stack.append(node.left)
+                if node.right:
+                    stack.append(node.right)
+
+    def live_versions(self):
+        """
+        V.live_versions() -> Sequence. Produces the numbers of the
+        versions of V that have not been reclaimed yet, in increasing
+        order, including the current one.
+        """
+        with self._lock:
+            self._reclaim()
+            versions = [version for version, ref in self._retired.items()
+                        if ref() is not None]
+            versions.append(self._published[0])
+            return sorted(versions)
\ No newline at end of file
@@ -0,0 +1,339 @@
+#!/usr/bin/env python
+# Author: Tyler Sanderson <tylerbtbam@gmail.com>
+#
+# This file is part of PyBST.
+#
+# PyBST is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyBST is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyBST.  If not, see <http://www.gnu.org/licenses/>.
+
+# A durable tree keeps its files in one directory:
+#
+#     checkpoint.N  a serialize.dump of the tree holding every change
+#                   logged in wal.1 to wal.N
+#     wal.N         log records of the changes made after checkpoint.N-1
+#
+# A log record is crc32 (I) | payload length (I) | operation (c) | payload,
+# little-endian, where the payload is the pickled arguments of the
+# operation and the checksum covers the operation and payload. Records
+# are only ever appended. A record cut short by a crash fails its
+# checksum, and it and everything after it are dropped on recovery.
+
+import cPickle
+import os
+import re
+import struct
+import zlib
+import rbtree
+import serialize
+
+RBTree = rbtree.RBTree
+
+FSYNC_POLICIES = ('always','batch','never')
+
+_RECORD = struct.Struct('<IIc')
+_FILE = re.compile(r'^(checkpoint|wal)\.(\d+)$')
+
+def _fsync_directory(directory):
+    """
+    _fsync_directory(directory). Forces the entries of directory to
+    disk, so files created or renamed in it survive a crash.
+    """
+    if os.name == 'posix':
+        fd = os.open(directory,os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+def _read_log(path):
+    """
+    _read_log(path) -> (Sequence,Nat). Produces the (operation,arguments)
+    records of the log at path up to the first one that is cut short or
+    corrupt, and the length of the file they take up.
+    """
+    records = []
+    end = 0
+    with open(path,'rb') as file:
+        while True:
+            header = file.read(_RECORD.size)
+            if len(header) < _RECORD.size:
+                break
+            checksum, length, operation = _RECORD.unpack(header)
+            payload = file.read(length)
+            if len(payload) < length or zlib.crc32(operation + payload) & 0xffffffff != checksum:
+                break
+            records.append((operation,cPickle.loads(payload)))
+            end = end + _RECORD.size + length
+    return records, end
+
+class DurableTree(object):
+    """
+    DurableTree keeps a tree in memory and records every change to it
+    in an append-only write-ahead log in a directory, so it survives
+    a crash. Every checkpoint_every changes, the whole tree is written
+    to a checkpoint with serialize.dump and the log starts over. When
+    a DurableTree is opened, it loads the latest checkpoint and
+    replays the log written since.
+
+    Changes go through the methods of D, which append each change to
+    the log before applying it. A change that cannot be pickled is
+    neither logged nor applied, and one that fails to apply is taken
+    back out of the log and the tree is recovered from disk, so the
+    tree always matches the log. Read the tree through the tree
+    attribute, but do not change it directly.
+
+    The fsync policy sets when the log is forced to disk:
+
+    'always': after every change, so no change that returned is lost
+    'batch':  once every batch_size changes (group commit). Until
+              then up to batch_size - 1 changes sit in Python's file
+              buffer and are lost if the process crashes or the
+              machine fails
+    'never':  never; the log is only handed to the operating system
+              every batch_size changes. Until then up to batch_size - 1
+              changes sit in Python's file buffer and are lost if the
+              process crashes, and changes the operating system has not
+              yet written out are lost if the machine fails
+
+    sync() forces the log to disk under any policy. insert_from,
+    delete_from and delete_range log a whole batch as one record.
+
+    Constructors:
+
+    DurableTree(directory) -> Opens the durable tree in directory, creating an empty RBTree if there is none
+    DurableTree(...,tree_class=c) -> Creates an empty tree of class c if there is none. c must be a class serialize.dump can write
+    DurableTree(...,fsync=p,batch_size=n) -> Forces the log to disk by fsync policy p, 'batch' by default, in groups of n, 64 by default
+    DurableTree(...,checkpoint_every=n) -> Writes a checkpoint every n changes, 100000 by default
+    """
+    def __init__(self,directory,tree_class=RBTree,fsync='batch',batch_size=64,checkpoint_every=100000):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError("fsync must be one of " + str(FSYNC_POLICIES) + ", not " + repr(fsync))
+        if batch_size < 1 or checkpoint_every < 1:
+            raise ValueError("batch_size and checkpoint_every must be at least 1")
+        if not serialize.can_dump(tree_class):
+            raise TypeError("Cannot checkpoint a tree of class " + tree_class.__name__)
+
+        self.directory = directory
+        self.tree_class = tree_class
+        self.fsync = fsync
+        self.batch_size = batch_size
+        self.checkpoint_every = checkpoint_every
+        self._log = None
+        self._pending = 0
+        self._changes = 0
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._recover()
+
+    def _path(self,kind,generation):
+        """D._path(kind,generation) -> String. Produces the path of kind.generation in the directory of D."""
+        return os.path.join(self.directory,kind + '.' + str(generation))
+
+    def _generations(self,kind):
+        """
+        D._generations(kind) -> Sequence. Produces the generations of
+        the files of kind ('checkpoint' or 'wal') in increasing order.
+        """
+        generations = []
+        for name in os.listdir(self.directory):
+            match = _FILE.match(name)
+            if match and match.group(1) == kind:
+                generations.append(int(match.group(2)))
+        return sorted(generations)
+
+    def _recover(self):
+        """
+        D._recover(). Loads the latest checkpoint, or creates an empty
+        tree of the tree class of D, then replays the logs written since
+        and opens the last of them for appending.
+        """
+        self._changes = 0
+        self._pending = 0
+        for name in os.listdir(self.directory):
+            if name.endswith('.tmp'):
+                os.remove(os.path.join(self.directory,name))
+
+        checkpoints = self._generations('checkpoint')
+        if checkpoints:
+            generation = checkpoints[-1]
+            with open(self._path('checkpoint',generation),'rb') as file:
+                self.tree = serialize.load(file)
+        else:
+            generation = 0
+            self.tree = self.tree_class()
+
+        logs = [log for log in self._generations('wal') if log > generation]
+        for log in logs:
+            path = self._path('wal',log)
+            records, end = _read_log(path)
+            for operation, args in records:
+                self._apply(operation,args)
+            self._changes = self._changes + len(records)
+
+            if end < os.path.getsize(path):
+                # Drop the torn tail and any log after it, which
+                # cannot hold changes made after the tail was written
+                with open(path,'r+b') as file:
+                    file.truncate(end)
+                    os.fsync(file.fileno())
+                for later in logs[logs.index(log) + 1:]:
+                    os.remove(self._path('wal',later))
+                logs = logs[:logs.index(log) + 1]
+                break
+
+        self._generation = logs[-1] if logs else generation + 1
+        self._log = open(self._path('wal',self._generation),'ab')
+        _fsync_directory(self.directory)
+        self._remove_old(generation)
+
+    def _remove_old(self,generation):
+        """
+        D._remove_old(generation). Removes the checkpoints before
+        checkpoint.generation and the logs it holds the changes of.
+        """
+        for checkpoint in self._generations('checkpoint'):
+            if checkpoint < generation:
+                os.remove(self._path('checkpoint',checkpoint))
+        for log in self._generations('wal'):
+            if log <= generation:
+                os.remove(self._path('wal',log))
+
+    def _apply(self,operation,args):
+        """D._apply(operation,args). Applies a logged change to the tree of D."""
+        if operation == 'i':
+            return self.tree.insert(*args)
+        elif operation == 'd':
+            return self.tree.delete(*args)
+        elif operation == 'I':
+            return self.tree.insert_from(*args)
+        elif operation == 'D':
+            return self.tree.delete_from(*args)
+        elif operation == 'r':
+            return self.tree.delete_range(*args)
+        else:
+            raise ValueError("Unknown log operation " + repr(operation))
+
+    def _change(self,operation,args):
+        """
+        D._change(operation,args) -> Object. Appends a change to the log,
+        then applies it to the tree of D and produces what applying it
+        produced. Forces the log to disk as the fsync policy of D
+        requires, and writes a checkpoint if one is due.
+        """
+        payload = cPickle.dumps(args,cPickle.HIGHEST_PROTOCOL)
+        checksum = zlib.crc32(operation + payload) & 0xffffffff
+        start = self._log.tell()
+        self._log.write(_RECORD.pack(checksum,len(payload),operation) + payload)
+
+        try:
+            result = self._apply(operation,args)
+        except Exception:
+            # The change may have been partly applied, so the record is
+            # taken back out and the tree is rebuilt from what is logged.
+            self._log.truncate(start)
+            self._log.close()
+            self._recover()
+            raise
+
+        self._pending = self._pending + 1
+        self._changes = self._changes + 1
+
+        if self.fsync == 'always' or self._pending >= self.batch_size:
+            self._flush()
+        if self._changes >= self.checkpoint_every:
+            self.checkpoint()
+        return result
+
+    def _flush(self):
+        """D._flush(). Hands the log to the operating system, forcing it to disk unless the fsync policy is 'never'."""
+        self._log.flush()
+        if self.fsync != 'never':
+            os.fsync(self._log.fileno())
+        self._pending = 0
+
+    def sync(self):
+        """D.sync(). Forces every change made so far to disk."""
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        self._pending = 0
+
+    def checkpoint(self):
+        """
+        D.checkpoint(). Writes the tree of D to a new checkpoint, starts
+        a new log, and removes the old checkpoint and logs. If the
+        checkpoint cannot be written, D keeps appending to its log.
+        """
+        self.sync()
+        generation = self._generation
+
+        # The log is only rotated once the checkpoint holding it is in
+        # place, so a failed dump leaves D as it was.
+        path = self._path('checkpoint',generation)
+        try:
+            with open(path + '.tmp','wb') as file:
+                serialize.dump(self.tree,file)
+                file.flush()
+                os.fsync(file.fileno())
+        except Exception:
+            if os.path.exists(path + '.tmp'):
+                os.remove(path + '.tmp')
+            raise
+        os.rename(path + '.tmp',path)
+
+        self._log.close()
+        self._generation = generation + 1
+        self._log = open(self._path('wal',self._generation),'ab')
+        _fsync_directory(self.directory)
+
+        self._changes = 0
+        self._remove_old(generation)
+
+    def close(self):
+        """D.close(). Forces every change to disk and closes the log."""
+        if self._log:
+            self.sync()
+            self._log.close()
+            self._log = None
+
+    def __enter__(self):
+        """D.__enter__() -> DurableTree. Produces D for use in a with statement."""
+        return self
+
+    def __exit__(self,*exc_info):
+        """D.__exit__(...). Closes D at the end of a with statement."""
+        self.close()
+
+    def insert(self,key,value):
+        """D.insert(key,value). Logs inserting key and value, then inserts them into the tree."""
+        self._change('i',(key,value))
+
+    def insert_from(self,seq):
+        """D.insert_from(seq). Logs the key, value pairs of seq as one record, then inserts them into the tree."""
+        self._change('I',(list(seq),))
+
+    def delete(self,key):
+        """D.delete(key). Logs deleting key, then deletes it from the tree."""
+        self._change('d',(key,))
+
+    def delete_from(self,seq):
+        """D.delete_from(seq). Logs the keys of seq as one record, then deletes them from the tree."""
+        self._change('D',(list(seq),))
+
+    def delete_range(self,lo,hi):
+        """
+        D.delete_range(lo,hi) -> Nat. Logs deleting the keys with
+        lo <= key < hi, then deletes them from the tree and produces
+        the number deleted.
+        """
+        return self._change('r',(lo,hi))
\ No newline at end of file
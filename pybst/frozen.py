@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# Author: Tyler Sanderson <tylerbtbam@gmail.com>
+#
+# This file is part of PyBST.
+#
+# PyBST is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyBST is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyBST.  If not, see <http://www.gnu.org/licenses/>.
+
+import array
+import bisect
+import itertools
+
+class FrozenTree(object):
+    """
+    FrozenTree is an immutable snapshot of a tree, made for fast
+    lookups. Keys are stored in one contiguous array in increasing
+    order, with the values in a parallel list, so no Node objects
+    are kept. Searches are binary searches over the key array done
+    by the bisect module.
+
+    Queries produce keys, values or (key,value) pairs, never Nodes.
+
+    Constructors:
+
+    FrozenTree(seq) -> Creates a snapshot from the elements in sequence [(k1,v1),(k2,v2),...,(kn,vn)],
+                       which must be in strictly increasing order of key, as produced by T.items()
+    FrozenTree(...,typecode=c) -> Stores keys in an array of typecode c instead of a list
+
+    Usually created with T.freeze().
+    """
+    __slots__ = ('_keys','_values')
+
+    def __init__(self,seq=(),typecode=None):
+        """Initializes the snapshot from the sorted elements of seq"""
+        keys = []
+        values = []
+        for key, value in seq:
+            if keys and not keys[-1] < key:
+                raise ValueError("Key " + str(key) + " follows " + str(keys[-1]) + ", so keys are not in strictly increasing order")
+            keys.append(key)
+            values.append(value)
+
+        if typecode is not None:
+            keys = array.array(typecode,keys)
+
+        self._keys = keys
+        self._values = values
+
+    def get(self,key,default=None):
+        """
+        F.get(key,default=None) -> Object. Produces the value with
+        key in F, or default if there is no such key.
+        """
+        keys = self._keys
+        index = bisect.bisect_left(keys,key)
+        if index < len(keys) and keys[index] == key:
+            return self._values[index]
+        return default
+
+    def floor(self,key):
+        """
+        F.floor(key) -> (key,value). Produces the pair in F with the
+        largest key less than or equal to key. If there is none, produces None.
+        """
+        index = bisect.bisect_right(self._keys,key) - 1
+        if index < 0:
+            return None
+        return (self._keys[index],self._values[index])
+
+    def ceiling(self,key):
+        """
+        F.ceiling(key) -> (key,value). Produces the pair in F with the
+        smallest key greater than or equal to key. If there is none, produces None.
+        """
+        index = bisect.bisect_left(self._keys,key)
+        if index == len(self._keys):
+            return None
+        return (self._keys[index],self._values[index])
+
+    def rank(self,key):
+        """
+        F.rank(key) -> Nat. Produces the number of keys in F
+        smaller than key.
+        """
+        return bisect.bisect_left(self._keys,key)
+
+    def select(self,index):
+        """
+        F.select(index) -> (key,value). Produces the pair with the
+        index-th smallest key in F, counting from 0. Raises IndexError
+        if there is no such pair.
+        """
+        if index < 0 or index >= len(self._keys):
+            raise IndexError("Tree index " + str(index) + " out of range")
+        return (self._keys[index],self._values[index])
+
+    def range(self,lo,hi,reverse=False):
+        """
+        F.range(lo,hi,reverse=False) -> Iterator. Produces the (key,value)
+        pairs in F with lo <= key < hi one at a time in increasing order
+        of key, or in decreasing order if reverse is True.
+        """
+        keys = self._keys
+        values = self._values
+        start = bisect.bisect_left(keys,lo)
+        stop = max(start,bisect.bisect_left(keys,hi))
+
+        if not reverse:
+            indices = xrange(start,stop)
+        else:
+            indices = xrange(stop - 1,start - 1,-1)
+        for index in indices:
+            yield (keys[index],values[index])
+
+    def count_range(self,lo,hi):
+        """
+        F.count_range(lo,hi) -> Nat. Produces the number of keys in F
+        with lo <= key < hi.
+        """
+        if not lo < hi:
+            return 0
+        return self.rank(hi) - self.rank(lo)
+
+    def keys(self):
+        """
+        F.keys() -> Iterator. Produces the keys in F one at a time
+        in increasing order.
+        """
+        return iter(self._keys)
+
+    def values(self):
+        """
+        F.values() -> Iterator. Produces the values in F one at a time
+        in increasing order of their keys.
+        """
+        return iter(self._values)
+
+    def items(self):
+        """
+        F.items() -> Iterator. Produces the (key,value) pairs in F one
+        at a time in increasing order of key.
+        """
+        return itertools.izip(self._keys,self._values)
+
+    def __len__(self):
+        """F.__len__() <==> len(F)"""
+        return len(self._keys)
+
+    def __contains__(self,key):
+        """F.__contains__(key) <==> key in F"""
+        keys = self._keys
+        index = bisect.bisect_left(keys,key)
+        return index < len(keys) and keys[index] == key
+
+    def __getitem__(self,key):
+        """F.__getitem__(key) <==> F[key]. Raises KeyError if key is not in F."""
+        keys = self._keys
+        index = bisect.bisect_left(keys,key)
+        if index < len(keys) and keys[index] == key:
+            return self._values[index]
+        raise KeyError(key)
+
+    def __iter__(self):
+        """F.__iter__() <==> iter(F). Iterates over the keys of F."""
+        return iter(self._keys)
\ No newline at end of file
@@ -0,0 +1,335 @@
+#!/usr/bin/env python
+# Author: Tyler Sanderson <tylerbtbam@gmail.com>
+#
+# This file is part of PyBST.
+#
+# PyBST is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyBST is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyBST.  If not, see <http://www.gnu.org/licenses/>.
+
+# Mapped index format, version 1. All integers are little-endian.
+#
+#     header:  'PYBSTMAP' | version (B) | key kind (c) | element count (Q)
+#              | value heap offset (Q), padded to HEADER_SIZE bytes
+#     records: element count records of 20 bytes, in increasing order
+#              of key: key (8 bytes) | value offset (Q) | value length (I)
+#     heap:    the pickled values, at the offsets given by the records
+#
+# Keys are 8 byte integers (kind 'q') or 8 byte floats (kind 'd').
+# Record i is the i-th smallest key. Searching the records is the same
+# as walking down a perfectly balanced tree whose Node for the records
+# lo..hi-1 is record (lo + hi) // 2.
+
+import cPickle
+import mmap
+import shutil
+import struct
+import tempfile
+import bstree
+
+Node = bstree.Node
+
+MAGIC = 'PYBSTMAP'
+FORMAT_VERSION = 1
+HEADER_SIZE = 32
+
+_HEADER = struct.Struct('<8sBcQQ')
+
+_INT64_MIN = -2 ** 63
+_INT64_MAX = 2 ** 63 - 1
+
+def _key_kind(tree):
+    """
+    _key_kind(tree) -> String. Produces 'q' if every key of tree fits
+    in an 8 byte integer, or else 'd' if every key is exactly an 8 byte
+    float. Raises ValueError otherwise.
+    """
+    for key in tree.keys():
+        if not (isinstance(key,(int,long)) and _INT64_MIN <= key <= _INT64_MAX):
+            break
+    else:
+        return 'q'
+
+    # Every key is checked again, including the integers seen before
+    # the first key that is not one.
+    for key in tree.keys():
+        try:
+            exact = float(key) == key
+        except OverflowError:
+            exact = False
+        if not exact:
+            raise ValueError("Key " + str(key) + " cannot be stored in a mapped index")
+    return 'd'
+
+def write(tree,file):
+    """
+    write(tree,file). Writes the keys and values of tree to the binary
+    file as a mapped index that MappedTree can open. The records are
+    written straight to file while the values collect in a temporary
+    file, so the tree is never copied into memory.
+    """
+    kind = _key_kind(tree)
+    record = struct.Struct('<' + kind + 'QI')
+    count = tree.get_element_count()
+    heap_offset = HEADER_SIZE + count * record.size
+
+    header = _HEADER.pack(MAGIC,FORMAT_VERSION,kind,count,heap_offset)
+    file.write(header.ljust(HEADER_SIZE,'\0'))
+
+    heap = tempfile.TemporaryFile()
+    try:
+        offset = 0
+        for key, value in tree.items():
+            data = cPickle.dumps(value,cPickle.HIGHEST_PROTOCOL)
+            file.write(record.pack(key,offset,len(data)))
+            heap.write(data)
+            offset = offset + len(data)
+        heap.seek(0)
+        shutil.copyfileobj(heap,file)
+    finally:
+        heap.close()
+
+class MappedTree(object):
+    """
+    MappedTree is a read-only tree index stored in a file written by
+    write(tree,file). The file is mapped into memory with mmap, so
+    opening it reads only its header, and each query reads only the
+    pages of the file it touches. Processes opening the same file
+    share its pages through the operating system's page cache.
+
+    Keys and values are read from the file on demand. Nodes produced
+    are new Nodes holding a key and its value, not linked to any other
+    Node. Values are unpickled every time they are read.
+
+    Constructors:
+
+    MappedTree(path) -> Opens the mapped index stored in the file at path
+    """
+    def __init__(self,path):
+        self._file = open(path,'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(),0,access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+        if len(self._map) < HEADER_SIZE:
+            self.close()
+            raise ValueError(path + " does not hold a mapped index")
+        magic, version, kind, count, heap_offset = _HEADER.unpack_from(self._map,0)
+        if magic != MAGIC or kind not in ('q','d'):
+            self.close()
+            raise ValueError(path + " does not hold a mapped index")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError("Unsupported mapped index format version " + str(version))
+
+        self._record = struct.Struct('<' + kind + 'QI')
+        self._key = struct.Struct('<' + kind)
+        self._count = count
+        self._heap = heap_offset
+        if heap_offset != HEADER_SIZE + count * self._record.size or heap_offset > len(self._map):
+            self.close()
+            raise ValueError(path + " holds a truncated mapped index")
+
+    def close(self):
+        """M.close(). Unmaps and closes the file of M."""
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        """M.__enter__() -> MappedTree. Produces M for use in a with statement."""
+        return self
+
+    def __exit__(self,*exc_info):
+        """M.__exit__(...). Closes M at the end of a with statement."""
+        self.close()
+
+    def _key_at(self,index):
+        """M._key_at(index) -> Number. Produces the key of record index."""
+        return self._key.unpack_from(self._map,HEADER_SIZE + index * self._record.size)[0]
+
+    def _node_at(self,index):
+        """
+        M._node_at(index) -> Node. Produces a new Node holding the key
+        and value of record index.
+        """
+        key, offset, length = self._record.unpack_from(self._map,HEADER_SIZE + index * self._record.size)
+        start = self._heap + offset
+        return Node(key,cPickle.loads(self._map[start:start + length]))
+
+    def _bisect_left(self,key):
+        """
+        M._bisect_left(key) -> Nat. Produces the index of the first
+        record whose key is greater than or equal to key.
+        """
+        unpack = self._key.unpack_from
+        data = self._map
+        base = HEADER_SIZE
+        size = self._record.size
+        lo = 0
+        hi = self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if unpack(data,base + mid * size)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _bisect_right(self,key):
+        """
+        M._bisect_right(key) -> Nat. Produces the index of the first
+        record whose key is greater than key.
+        """
+        unpack = self._key.unpack_from
+        data = self._map
+        base = HEADER_SIZE
+        size = self._record.size
+        lo = 0
+        hi = self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if key < unpack(data,base + mid * size)[0]:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def get_node(self,key):
+        """
+        M.get_node(key) -> Node. Produces a Node holding key and its
+        value. If key is not in M, produces None.
+        """
+        index = self._bisect_left(key)
+        if index < self._count and self._key_at(index) == key:
+            return self._node_at(index)
+        return None
+
+    def get(self,key,default=None):
+        """
+        M.get(key,default=None) -> Object. Produces the value with
+        key in M, or default if there is no such key.
+        """
+        node = self.get_node(key)
+        return node.value if node else default
+
+    def floor(self,key):
+        """
+        M.floor(key) -> Node. Produces a Node holding the largest key
+        in M less than or equal to key and its value. If there is no
+        such key, produces None.
+        """
+        index = self._bisect_right(key) - 1
+        if index < 0:
+            return None
+        return self._node_at(index)
+
+    def ceiling(self,key):
+        """
+        M.ceiling(key) -> Node. Produces a Node holding the smallest key
+        in M greater than or equal to key and its value. If there is no
+        such key, produces None.
+        """
+        index = self._bisect_left(key)
+        if index == self._count:
+            return None
+        return self._node_at(index)
+
+    def get_min(self):
+        """M.get_min() -> Node. Produces a Node holding the smallest key in M, or None if M is empty."""
+        return self._node_at(0) if self._count else None
+
+    def get_max(self):
+        """M.get_max() -> Node. Produces a Node holding the largest key in M, or None if M is empty."""
+        return self._node_at(self._count - 1) if self._count else None
+
+    def rank(self,key):
+        """
+        M.rank(key) -> Nat. Produces the number of keys in M
+        smaller than key.
+        """
+        return self._bisect_left(key)
+
+    def select(self,index):
+        """
+        M.select(index) -> Node. Produces a Node holding the index-th
+        smallest key in M, counting from 0. Raises IndexError if there
+        is no such key.
+        """
+        if index < 0 or index >= self._count:
+            raise IndexError("Tree index " + str(index) + " out of range")
+        return self._node_at(index)
+
+    def range(self,lo,hi,reverse=False):
+        """
+        M.range(lo,hi,reverse=False) -> Iterator. Produces Nodes holding
+        the keys in M with lo <= key < hi one at a time in increasing
+        order of key, or in decreasing order if reverse is True. The
+        records are read in file order, one after the other.
+        """
+        start = self._bisect_left(lo)
+        stop = max(start,self._bisect_left(hi))
+
+        if not reverse:
+            indices = xrange(start,stop)
+        else:
+            indices = xrange(stop - 1,start - 1,-1)
+        for index in indices:
+            yield self._node_at(index)
+
+    def count_range(self,lo,hi):
+        """
+        M.count_range(lo,hi) -> Nat. Produces the number of keys in M
+        with lo <= key < hi.
+        """
+        if not lo < hi:
+            return 0
+        return self._bisect_left(hi) - self._bisect_left(lo)
+
+    def keys(self):
+        """
+        M.keys() -> Iterator. Produces the keys in M one at a time
+        in increasing order, without reading any values.
+        """
+        for index in xrange(self._count):
+            yield self._key_at(index)
+
+    def values(self):
+        """
+        M.values() -> Iterator. Produces the values in M one at a time
+        in increasing order of their keys.
+        """
+        for index in xrange(self._count):
+            yield self._node_at(index).value
+
+    def items(self):
+        """
+        M.items() -> Iterator. Produces the (key,value) pairs in M one
+        at a time in increasing order of key.
+        """
+        for index in xrange(self._count):
+            node = self._node_at(index)
+            yield (node.key,node.value)
+
+    def get_element_count(self):
+        """M.get_element_count() -> Nat. Produces the number of keys in M."""
+        return self._count
+
+    def __len__(self):
+        """M.__len__() <==> len(M)"""
+        return self._count
+
+    def __contains__(self,key):
+        """M.__contains__(key) <==> key in M"""
+        index = self._bisect_left(key)
+        return index < self._count and self._key_at(index) == key
\ No newline at end of file
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# Author: Tyler Sanderson <tylerbtbam@gmail.com>
+#
+# This file is part of PyBST.
+#
+# PyBST is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyBST is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyBST.  If not, see <http://www.gnu.org/licenses/>.
+
+import collections
+import numpy as np
+
+class Lookup(collections.namedtuple('Lookup',['found','index','floor','ceiling'])):
+    """
+    The result of NumPySnapshot.get_many(probes). Each attribute is an
+    array with one entry per probe:
+
+    found: True where the probe is a key of the snapshot
+    index: the position of the probe in the snapshot, or -1 if not found
+    floor: the position of the largest key <= the probe, or -1 if there is none
+    ceiling: the position of the smallest key >= the probe, or -1 if there is none
+
+    Positions index the keys and values attributes of the snapshot.
+    """
+    __slots__ = ()
+
+def _key_dtype(keys):
+    """
+    _key_dtype(keys) -> dtype. Produces int64 if every key is an integer
+    that fits in it and float64 if any key is not an integer. Integer
+    keys too large for int64 produce object, compared exactly, since
+    float64 would round them and take one for its neighbours.
+    """
+    if not all(isinstance(key,(int,long)) for key in keys):
+        return np.float64
+    if keys and not (-2**63 <= min(keys) and max(keys) < 2**63):
+        return object
+    return np.int64
+
+class NumPySnapshot(object):
+    """
+    NumPySnapshot is an immutable snapshot of a tree for looking up
+    many keys at once. Keys are stored sorted in a NumPy array and
+    values in a NumPy object array at the same positions, so a batch
+    of probes is answered with one call to numpy.searchsorted.
+
+    Constructors:
+
+    NumPySnapshot(seq) -> Creates a snapshot from the elements in sequence [(k1,v1),(k2,v2),...,(kn,vn)],
+                          which must be in strictly increasing order of key, as produced by T.items()
+    NumPySnapshot(...,dtype=d) -> Stores keys in an array of NumPy dtype d. By default int64 if
+                                  every key is an integer that fits, object for other integers
+                                  and float64 otherwise
+
+    Usually created with snapshot(T).
+    """
+    def __init__(self,seq=(),dtype=None):
+        """Initializes the snapshot from the sorted elements of seq"""
+        keys = []
+        values = []
+        for key, value in seq:
+            keys.append(key)
+            values.append(value)
+
+        if dtype is None:
+            dtype = _key_dtype(keys)
+        self.keys = np.array(keys,dtype=dtype)
+        # Filled one at a time, since assigning a list of equal length
+        # tuples to a slice would spread them over a second dimension.
+        self.values = np.empty(len(values),dtype=object)
+        for i, value in enumerate(values):
+            self.values[i] = value
+        unordered = np.flatnonzero(self.keys[1:] <= self.keys[:-1])
+        if len(unordered):
+            i = unordered[0]
+            raise ValueError("Key " + str(keys[i + 1]) + " follows " + str(keys[i]) + ", so keys are not in strictly increasing order")
+
+    def get_many(self,probes):
+        """
+        S.get_many(probes) -> Lookup. Looks up every key in the array
+        probes at once and produces the found mask, positions, floor
+        positions and ceiling positions of the probes. See Lookup.
+        Probes keep their own dtype and are compared with the keys in
+        a type common to both, so 2.5 is not taken for an integer key 2.
+        """
+        keys = self.keys
+        probes = np.asarray(probes)
+        count = len(keys)
+
+        # Searching for the probes in sorted order keeps consecutive
+        # searches in the same part of keys, which is much faster
+        # for large batches than searching in the order given.
+        order = np.argsort(probes)
+        ceiling = np.empty(len(probes),dtype=np.intp)
+        ceiling[order] = np.searchsorted(keys,probes[order],side='left')
+
+        if count:
+            found = keys[np.minimum(ceiling,count - 1)] == probes
+        else:
+            found = np.zeros(len(probes),dtype=bool)
+        floor = ceiling - 1 + found
+        index = np.where(found,ceiling,-1)
+        ceiling[ceiling == count] = -1
+        return Lookup(found,index,floor,ceiling)
+
+    def get_values(self,probes,default=None):
+        """
+        S.get_values(probes,default=None) -> Array. Produces an object
+        array of the values with the keys in probes, with default
+        wherever a probe is not a key of S.
+        """
+        lookup = self.get_many(probes)
+        values = np.empty(len(lookup.index),dtype=object)
+        values.fill(default)
+        values[lookup.found] = self.values[lookup.index[lookup.found]]
+        return values
+
+    def __len__(self):
+        """S.__len__() <==> len(S)"""
+        return len(self.keys)
+
+def snapshot(tree,dtype=None):
+    """
+    snapshot(tree,dtype=None) -> NumPySnapshot. Produces a NumPy
+    snapshot of the keys and values in tree for batch lookups.
+    See NumPySnapshot for the dtype of its keys.
+    """
+    return NumPySnapshot(tree.items(),dtype)
\ No newline at end of file
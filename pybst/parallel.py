@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+# Author: Tyler Sanderson <tylerbtbam@gmail.com>
+#
+# This file is part of PyBST.
+#
+# PyBST is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyBST is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyBST.  If not, see <http://www.gnu.org/licenses/>.
+
+import array
+import bisect
+import multiprocessing
+import random
+
+# The keys being sorted and the splitters between the key ranges,
+# set in each worker process by _init_worker.
+_keys = None
+_splitters = None
+
+# Number of sampled keys per partition used to choose the splitters.
+SAMPLES_PER_PARTITION = 64
+
+def _init_worker(keys,splitters):
+    """
+    _init_worker(keys,splitters). Stores keys and splitters for
+    _sort_range in a worker process. Where processes are forked, they
+    are inherited instead of pickled.
+    """
+    global _keys, _splitters
+    _keys = keys
+    _splitters = splitters
+
+def _positions_in_range(keys,lo,hi):
+    """
+    _positions_in_range(keys,lo,hi) -> Array. Produces the positions in
+    keys of the keys with lo <= key < hi in increasing order, where a
+    bound of None is unbounded. Raises TypeError if a key is not a number.
+    """
+    positions = array.array('l')
+    for i, key in enumerate(keys):
+        if not isinstance(key,(int,long,float)):
+            raise TypeError(str(key) + " is not a number")
+        if (lo is None or lo <= key) and (hi is None or key < hi):
+            positions.append(i)
+    return positions
+
+def _sort_range(bucket):
+    """
+    _sort_range(bucket) -> Array. Produces the positions of the keys in
+    _keys between splitters bucket - 1 and bucket, ordered by key. Of
+    equal keys only the first is kept.
+    """
+    keys = _keys
+    lo = _splitters[bucket - 1] if bucket > 0 else None
+    hi = _splitters[bucket] if bucket < len(_splitters) else None
+    positions = _positions_in_range(keys,lo,hi).tolist()
+
+    # The sort is stable, so the first of equal keys stays first
+    positions.sort(key=keys.__getitem__)
+    kept = array.array('l')
+    last = None
+    for i in positions:
+        key = keys[i]
+        if not kept or key != last:
+            kept.append(i)
+            last = key
+    return kept
+
+def _choose_splitters(keys,count,rng):
+    """
+    _choose_splitters(keys,count,rng) -> Sequence. Produces up to
+    count - 1 keys that split keys into count ranges of about the same
+    size, chosen from a sample drawn with the random.Random rng.
+    """
+    sample = rng.sample(keys,min(len(keys),count * SAMPLES_PER_PARTITION))
+    sample.sort()
+    splitters = []
+    for i in xrange(1,count):
+        key = sample[i * len(sample) // count]
+        if not splitters or splitters[-1] < key:
+            splitters.append(key)
+    return splitters
+
+def parallel_build(cls,seq,processes=None):
+    """
+    parallel_build(cls,seq,processes=None) -> Tree. The same as
+    cls.from_sorted(seq), with the sorting spread over a pool of
+    processes, cpu_count() of them by default.
+
+    The keys of seq are split into one key range per process at
+    splitters chosen from a random sample, and each process picks out
+    and sorts the keys in its own range. The sorted ranges are then
+    built in order into a perfectly balanced tree of class cls in
+    linear time, without sorting or checking them again. The Nodes
+    themselves are built in the calling process, since a tree cannot
+    be shared between processes. With one process this is just
+    cls.from_sorted(seq).
+
+    Starting the processes and sending them the keys costs more than
+    the sort saves unless seq is large; see benchmarks/bench_parallel.py.
+    """
+    if processes is None:
+        processes = multiprocessing.cpu_count()
+    if processes < 1:
+        raise ValueError("processes must be at least 1, not " + str(processes))
+    if processes == 1:
+        return cls.from_sorted(seq)
+
+    pairs = seq if isinstance(seq,list) else list(seq)
+    keys = [x[0] for x in pairs]
+    splitters = _choose_splitters(keys,processes,random.Random()) if keys else []
+
+    pool = multiprocessing.Pool(processes,_init_worker,(keys,splitters))
+    try:
+        ranges = pool.map(_sort_range,range(len(splitters) + 1),chunksize=1)
+    finally:
+        pool.terminate()
+        pool.join()
+
+    tree = cls()
+    tree._load_sorted(sum(len(positions) for positions in ranges),
+                      ((keys[i],pairs[i][1]) for positions in ranges for i in positions))
+    return tree
\ No newline at end of file
@@ -0,0 +1,572 @@
+#!/usr/bin/env python
+# Author: Tyler Sanderson <tylerbtbam@gmail.com>
+#
+# This file is part of PyBST.
+#
+# PyBST is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyBST is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyBST.  If not, see <http://www.gnu.org/licenses/>.
+
+import collections
+import bstree
+
+BSTree = bstree.BSTree
+
+class PersistentNode(object):
+    """
+    Represents a node of a persistent tree. A PersistentNode has no
+    parent attribute and is never changed once created, so any number
+    of tree versions can share it.
+    """
+    __slots__ = ('left','right','key','value','size')
+
+    def __init__(self,key,value,left,right):
+        self.key = key
+        self.value = value
+        self.left = left
+        self.right = right
+        self.size = (1 + (left.size if left else 0) +
+                     (right.size if right else 0))
+
+class PersistentAVLNode(PersistentNode):
+    """Represents a node of a PersistentAVLTree"""
+    __slots__ = ('height',)
+
+    def __init__(self,key,value,left,right):
+        PersistentNode.__init__(self,key,value,left,right)
+        self.height = 1 + max(left.height if left else -1,
+                              right.height if right else -1)
+
+    @property
+    def balance(self):
+        """
+        The height of the right subtree taken away from the height
+        of the left subtree.
+        """
+        return ((self.left.height if self.left else -1) -
+                (self.right.height if self.right else -1))
+
+class PersistentRBNode(PersistentNode):
+    """Represents a node of a PersistentRBTree"""
+    __slots__ = ('color',)
+
+    def __init__(self,key,value,left,right,color):
+        PersistentNode.__init__(self,key,value,left,right)
+        self.color = color
+
+class PersistentTree(bstree.TreeQueries):
+    """
+    PersistentTree holds what the persistent trees have in common.
+    A persistent tree is one version of a tree: insert and delete
+    leave it unchanged and produce a new version instead, which
+    shares every Node off the updated path with the old one. Keeping
+    a version around is therefore a consistent snapshot that costs
+    nothing, and an update creates O(log n) Nodes.
+
+    Constructors:
+
+    Tree() -> Creates a new empty tree
+    Tree(seq) -> Creates a new tree from the elements in sequence [(k1,v1),(k2,v2),...,(kn,vn)]
+
+    For the queries, such as get_node, rank and range, see TreeQueries
+    in bstree.py.
+    """
+    __slots__ = ('Root',)
+
+    def __init__(self,*args):
+        self.Root = None
+
+        if len(args) == 1:
+            if isinstance(args[0],collections.Iterable):
+                pairs = BSTree()._sorted_pairs(args[0])
+                self.Root = self._build(pairs,0,len(pairs),0,len(pairs).bit_length() - 1)
+            else:
+                raise TypeError(str(args[0]) + " is not iterable")
+
+    def _version(self,root):
+        """
+        T._version(root) -> Tree. Produces a new version of T with
+        the given root.
+        """
+        tree = self.__class__()
+        tree.Root = root
+        return tree
+
+    def _build(self,pairs,lo,hi,depth,max_depth):
+        """
+        T._build(pairs,lo,hi,depth,max_depth) -> Node. Produces the root
+        of a perfectly balanced subtree at the given depth holding the
+        sorted pairs[lo:hi], shaped as BSTree.from_sorted would shape it.
+        """
+        if lo >= hi:
+            return None
+        mid = lo + (hi - lo) // 2
+        left = self._build(pairs,lo,mid,depth + 1,max_depth)
+        right = self._build(pairs,mid + 1,hi,depth + 1,max_depth)
+        return self._built_node(pairs[mid][0],pairs[mid][1],left,right,depth,max_depth)
+
+    def iter_inorder(self):
+        """
+        T.iter_inorder() -> Iterator. Produces the Nodes in T one at
+        a time in inorder, using memory proportional to the height of T.
+        """
+        stack = []
+        node = self.Root
+        while stack or node:
+            if node:
+                stack.append(node)
+                node = node.left
+            else:
+                node = stack.pop()
+                yield node
+                node = node.right
+
+    def insert(self,key,value):
+        """
+        T.insert(key,value) -> Tree. Produces a version of T that also
+        holds a Node with key attribute key and value attribute value.
+        If T already has a Node with that key, produces T.
+        """
+        if not isinstance(key,(int,long,float)):
+            raise TypeError(str(key) + " is not a number")
+
+        root = self._insert(self.Root,key,value)
+        if root is self.Root:
+            return self
+        return self._version(self._finish(root))
+
+    def insert_from(self,seq):
+        """
+        T.insert_from(seq) -> Tree. Produces a version of T that also
+        holds every key, value pair in seq.
+        """
+        if not isinstance(seq,collections.Iterable):
+            raise TypeError(str(seq) + " is not iterable")
+
+        tree = self
+        for x in seq:
+            tree = tree.insert(x[0],x[1])
+        return tree
+
+    def delete(self,key):
+        """
+        T.delete(key) -> Tree. Produces a version of T without the Node
+        with key attribute key. If T has no such Node, produces T.
+        """
+        if not self.get_node(key):
+            return self
+        return self._version(self._finish(self._delete(self.Root,key)))
+
+    def delete_from(self,seq):
+        """
+        T.delete_from(seq) -> Tree. Produces a version of T without
+        the Nodes with keys in seq.
+        """
+        if not isinstance(seq,collections.Iterable):
+            raise TypeError(str(seq) + " is not iterable")
+
+        tree = self
+        for key in seq:
+            tree = tree.delete(key)
+        return tree
+
+    def _finish(self,root):
+        """
+        T._finish(root) -> Node. Produces the root a new version should
+        have, given the root an update produced.
+        """
+        return root
+
+class PersistentAVLTree(PersistentTree):
+    """
+    PersistentAVLTree implements a persistent AVL Tree. Updates copy
+    the Nodes on the path from the root to the updated Node, balancing
+    the copies on the way back up.
+
+    Constructors:
+
+    PersistentAVLTree() -> Creates a new empty AVL Tree
+    PersistentAVLTree(seq) -> Creates a new AVL Tree from the elements in sequence [(k1,v1),(k2,v2),...,(kn,vn)]
+
+    For the methods every persistent tree has, see PersistentTree.
+    """
+    __slots__ = ()
+
+    def _built_node(self,key,value,left,right,depth,max_depth):
+        """
+        T._built_node(key,value,left,right,depth,max_depth) -> PersistentAVLNode.
+        Produces a Node of a tree being built by _build.
+        """
+        return PersistentAVLNode(key,value,left,right)
+
+    def is_valid(self):
+        """
+        T.is_valid() -> Boolean. Produces True if and only if
+        T is a valid AVL Tree. Raises an exception otherwise.
+        """
+        # Each entry is a Node with the bounds its key must lie between.
+        stack = [(self.Root,None,None)] if self.Root else []
+        while stack:
+            node, lo, hi = stack.pop()
+
+            if (lo is not None and not node.key > lo) or (hi is not None and not node.key < hi):
+                raise Exception("Node " + str(node.key) + " is out of order")
+
+            expected_height = 1 + max(node.left.height if node.left else -1,
+                                      node.right.height if node.right else -1)
+            if not node.height == expected_height:
+                raise Exception("Height of node " + str(node.key) + " is " + str(node.height) + " and should be " + str(expected_height))
+
+            if abs(node.balance) > 1:
+                raise Exception("Tree is unbalanced at node " + str(node.key))
+
+            expected_size = (1 + (node.left.size if node.left else 0) +
+                             (node.right.size if node.right else 0))
+            if not node.size == expected_size:
+                raise Exception("Size of node " + str(node.key) + " is " + str(node.size) + " and should be " + str(expected_size))
+
+            if node.left:
+                stack.append((node.left,lo,node.key))
+            if node.right:
+                stack.append((node.right,node.key,hi))
+
+        return True
+
+    def _balance(self,key,value,left,right):
+        """
+        T._balance(key,value,left,right) -> PersistentAVLNode. Produces
+        a balanced subtree holding key, value and the subtrees left and
+        right, whose heights differ by at most two. Rotations are done
+        by building new Nodes.
+        """
+        left_height = left.height if left else -1
+        right_height = right.height if right else -1
+
+        if left_height > right_height + 1:
+            if left.balance >= 0:
+                return PersistentAVLNode(left.key,left.value,left.left,
+                                         PersistentAVLNode(key,value,left.right,right))
+            pivot = left.right
+            return PersistentAVLNode(pivot.key,pivot.value,
+                                     PersistentAVLNode(left.key,left.value,left.left,pivot.left),
+                                     PersistentAVLNode(key,value,pivot.right,right))
+
+        if right_height > left_height + 1:
+            if right.balance <= 0:
+                return PersistentAVLNode(right.key,right.value,
+                                         PersistentAVLNode(key,value,left,right.left),
+                                         right.right)
+            pivot = right.left
+            return PersistentAVLNode(pivot.key,pivot.value,
+                                     PersistentAVLNode(key,value,left,pivot.left),
+                                     PersistentAVLNode(right.key,right.value,pivot.right,right.right))
+
+        return PersistentAVLNode(key,value,left,right)
+
+    def _insert(self,node,key,value):
+        """
+        T._insert(node,key,value) -> PersistentAVLNode. Produces the root
+        of a copy of the subtree at node that also holds key. Produces
+        node itself if it already holds key.
+        """
+        if not node:
+            return PersistentAVLNode(key,value,None,None)
+
+        if key == node.key:
+            return node
+        elif key < node.key:
+            left = self._insert(node.left,key,value)
+            if left is node.left:
+                return node
+            return self._balance(node.key,node.value,left,node.right)
+        else:
+            right = self._insert(node.right,key,value)
+            if right is node.right:
+                return node
+            return self._balance(node.key,node.value,node.left,right)
+
+    def _delete(self,node,key):
+        """
+        T._delete(node,key) -> PersistentAVLNode. Produces the root of
+        a copy of the subtree at node without key, which it must hold.
+        """
+        if key < node.key:
+            return self._balance(node.key,node.value,self._delete(node.left,key),node.right)
+        elif key > node.key:
+            return self._balance(node.key,node.value,node.left,self._delete(node.right,key))
+
+        if not node.left:
+            return node.right
+        if not node.right:
+            return node.left
+
+        successor = node.right
+        while successor.left:
+            successor = successor.left
+        return self._balance(successor.key,successor.value,node.left,
+                             self._delete_min(node.right))
+
+    def _delete_min(self,node):
+        """
+        T._delete_min(node) -> PersistentAVLNode. Produces the root of
+        a copy of the subtree at node without its minimum key.
+        """
+        if not node.left:
+            return node.right
+        return self._balance(node.key,node.value,self._delete_min(node.left),node.right)
+
+def _is_red(node):
+    """_is_red(node) -> Boolean. Produces True if node is a red Node."""
+    return node is not None and node.color == 'r'
+
+def _is_black(node):
+    """_is_black(node) -> Boolean. Produces True if node is a black Node, not None."""
+    return node is not None and node.color == 'k'
+
+def _red(left,key,value,right):
+    """_red(left,key,value,right) -> PersistentRBNode. Produces a new red Node."""
+    return PersistentRBNode(key,value,left,right,'r')
+
+def _black(left,key,value,right):
+    """_black(left,key,value,right) -> PersistentRBNode. Produces a new black Node."""
+    return PersistentRBNode(key,value,left,right,'k')
+
+class PersistentRBTree(PersistentTree):
+    """
+    PersistentRBTree implements a persistent Red Black Tree. Updates
+    copy the Nodes on the path from the root to the updated Node,
+    following the insertion of Okasaki and the deletion of Kahrs,
+    which suit trees without parent pointers.
+
+    For more information, see:
+    Chris Okasaki, Red-Black Trees in a Functional Setting (1999)
+    Stefan Kahrs, Red-black trees with types (2001)
+
+    Constructors:
+
+    PersistentRBTree() -> Creates a new empty Red Black Tree
+    PersistentRBTree(seq) -> Creates a new Red Black Tree from the elements in sequence [(k1,v1),(k2,v2),...,(kn,vn)]
+
+    For the methods every persistent tree has, see PersistentTree.
+    """
+    __slots__ = ()
+
+    def _built_node(self,key,value,left,right,depth,max_depth):
+        """
+        T._built_node(key,value,left,right,depth,max_depth) -> PersistentRBNode.
+        Produces a Node of a tree being built by _build, colored as
+        RBTree._label_built_node colors it.
+        """
+        if depth == max_depth and depth > 0:
+            return _red(left,key,value,right)
+        return _black(left,key,value,right)
+
+    def is_valid(self):
+        """
+        T.is_valid() -> Boolean. Produces True if and only if
+        T is a valid Red Black Tree. Raises an exception otherwise.
+        """
+        if _is_red(self.Root):
+            raise Exception("Root of " + str(self) + " is red!")
+
+        # Each entry is a Node, the bounds its key must lie between and
+        # the number of black Nodes above it.
+        black_height = None
+        stack = [(self.Root,None,None,0)]
+        while stack:
+            node, lo, hi, blacks = stack.pop()
+
+            if not node:
+                if black_height is None:
+                    black_height = blacks
+                elif not blacks == black_height:
+                    raise Exception("Not all simple paths in  " + str(self) + " have same amount of black nodes!")
+                continue
+
+            if (lo is not None and not node.key > lo) or (hi is not None and not node.key < hi):
+                raise Exception("Node " + str(node.key) + " is out of order")
+
+            if node.color == 'r' and (_is_red(node.left) or _is_red(node.right)):
+                raise Exception("Node " + str(node.key) + " is red and has a red child!")
+
+            expected_size = (1 + (node.left.size if node.left else 0) +
+                             (node.right.size if node.right else 0))
+            if not node.size == expected_size:
+                raise Exception("Size of node " + str(node.key) + " is " + str(node.size) + " and should be " + str(expected_size))
+
+            blacks = blacks + (1 if node.color == 'k' else 0)
+            stack.append((node.left,lo,node.key,blacks))
+            stack.append((node.right,node.key,hi,blacks))
+
+        return True
+
+    def _finish(self,root):
+        """
+        T._finish(root) -> PersistentRBNode. Produces root colored black.
+        """
+        if _is_red(root):
+            return _black(root.left,root.key,root.value,root.right)
+        return root
+
+    def _balance(self,left,key,value,right):
+        """
+        T._balance(left,key,value,right) -> PersistentRBNode. Produces
+        a subtree holding key, value and the subtrees left and right
+        under a black Node, rotating away a red Node with a red child
+        directly below it.
+        """
+        if _is_red(left) and _is_red(right):
+            return _red(_black(left.left,left.key,left.value,left.right),key,value,
+                        _black(right.left,right.key,right.value,right.right))
+
+        if _is_red(left):
+            if _is_red(left.left):
+                child = left.left
+                return _red(_black(child.left,child.key,child.value,child.right),left.key,left.value,
+                            _black(left.right,key,value,right))
+            if _is_red(left.right):
+                child = left.right
+                return _red(_black(left.left,left.key,left.value,child.left),child.key,child.value,
+                            _black(child.right,key,value,right))
+
+        if _is_red(right):
+            if _is_red(right.right):
+                child = right.right
+                return _red(_black(left,key,value,right.left),right.key,right.value,
+                            _black(child.left,child.key,child.value,child.right))
+            if _is_red(right.left):
+                child = right.left
+                return _red(_black(left,key,value,child.left),child.key,child.value,
+                            _black(child.right,right.key,right.value,right.right))
+
+        return _black(left,key,value,right)
+
+    def _insert(self,node,key,value):
+        """
+        T._insert(node,key,value) -> PersistentRBNode. Produces the root
+        of a copy of the subtree at node that also holds key, possibly
+        red with a red child. Produces node itself if it already holds key.
+        """
+        if not node:
+            return _red(None,key,value,None)
+
+        if key == node.key:
+            return node
+        elif key < node.key:
+            left = self._insert(node.left,key,value)
+            if left is node.left:
+                return node
+            if node.color == 'k':
+                return self._balance(left,node.key,node.value,node.right)
+            return _red(left,node.key,node.value,node.right)
+        else:
+            right = self._insert(node.right,key,value)
+            if right is node.right:
+                return node
+            if node.color == 'k':
+                return self._balance(node.left,node.key,node.value,right)
+            return _red(node.left,node.key,node.value,right)
+
+    def _delete(self,node,key):
+        """
+        T._delete(node,key) -> PersistentRBNode. Produces the root of a
+        copy of the subtree at node without key. If node was black, the
+        copy has one black Node fewer on every path.
+        """
+        if not node:
+            return None
+
+        if key < node.key:
+            left = self._delete(node.left,key)
+            if _is_black(node.left):
+                return self._balance_left(left,node.key,node.value,node.right)
+            return _red(left,node.key,node.value,node.right)
+        elif key > node.key:
+            right = self._delete(node.right,key)
+            if _is_black(node.right):
+                return self._balance_right(node.left,node.key,node.value,right)
+            return _red(node.left,node.key,node.value,right)
+
+        return self._append(node.left,node.right)
+
+    def _balance_left(self,left,key,value,right):
+        """
+        T._balance_left(left,key,value,right) -> PersistentRBNode. Produces
+        a subtree holding key, value, left and right, where left has one
+        black Node fewer on every path than right.
+        """
+        if _is_red(left):
+            return _red(_black(left.left,left.key,left.value,left.right),key,value,right)
+        if _is_black(right):
+            return self._balance(left,key,value,_red(right.left,right.key,right.value,right.right))
+        if _is_red(right) and _is_black(right.left):
+            child = right.left
+            return _red(_black(left,key,value,child.left),child.key,child.value,
+                        self._balance(child.right,right.key,right.value,self._redden(right.right)))
+        raise Exception("Subtrees of " + str(key) + " have unexpected black heights")
+
+    def _balance_right(self,left,key,value,right):
+        """
+        T._balance_right(left,key,value,right) -> PersistentRBNode. Produces
+        a subtree holding key, value, left and right, where right has one
+        black Node fewer on every path than left.
+        """
+        if _is_red(right):
+            return _red(left,key,value,_black(right.left,right.key,right.value,right.right))
+        if _is_black(left):
+            return self._balance(_red(left.left,left.key,left.value,left.right),key,value,right)
+        if _is_red(left) and _is_black(left.right):
+            child = left.right
+            return _red(self._balance(self._redden(left.left),left.key,left.value,child.left),
+                        child.key,child.value,_black(child.right,key,value,right))
+        raise Exception("Subtrees of " + str(key) + " have unexpected black heights")
+
+    def _redden(self,node):
+        """
+        T._redden(node) -> PersistentRBNode. Produces a red copy of
+        the black Node node.
+        """
+        if not _is_black(node):
+            raise Exception("Expected a black node")
+        return _red(node.left,node.key,node.value,node.right)
+
+    def _append(self,left,right):
+        """
+        T._append(left,right) -> PersistentRBNode. Produces a subtree
+        holding the subtrees left and right, the children of a deleted
+        Node, with one black Node fewer on every path if they were the
+        children of a black Node.
+        """
+        if not left:
+            return right
+        if not right:
+            return left
+
+        if _is_red(left) and _is_red(right):
+            middle = self._append(left.right,right.left)
+            if _is_red(middle):
+                return _red(_red(left.left,left.key,left.value,middle.left),middle.key,middle.value,
+                            _red(middle.right,right.key,right.value,right.right))
+            return _red(left.left,left.key,left.value,
+                        _red(middle,right.key,right.value,right.right))
+
+        if _is_black(left) and _is_black(right):
+            middle = self._append(left.right,right.left)
+            if _is_red(middle):
+                return _red(_black(left.left,left.key,left.value,middle.left),middle.key,middle.value,
+                            _black(middle.right,right.key,right.value,right.right))
+            return self._balance_left(left.left,left.key,left.value,
+                                      _black(middle,right.key,right.value,right.right))
+
+        if _is_red(right):
+            return _red(self._append(left,right.left),right.key,right.value,right.right)
+        return _red(left.left,left.key,left.value,self._append(left.right,right))
\ No newline at end of file
@@ -16,14 +16,19 @@
 # You should have received a copy of the GNU General Public License
 # along with PyBST.  If not, see <http://www.gnu.org/licenses/>.
 
-import collections
 import bstree
 
 Node = bstree.Node
 BSTree = bstree.BSTree
 
 class RBNode(Node):
-    """Represents a node of a balanced Red Black Tree"""
+    """
+    Represents a node of a balanced Red Black Tree. The color
+    attribute is 'r' or 'k', which every Node shares rather than
+    holding its own copy.
+    """
+    __slots__ = ('color',)
+
     def __init__(self,key,value):
         """Initializes a BST node, then add color attribute"""
         Node.__init__(self,key,value)
@@ -56,85 +61,70 @@ class RBTree(BSTree):
         """Initializes tree the same as a BST"""
         BSTree.__init__(self,*args)
 
-    def _get_all_leaf_paths(self):
+    def _new_node(self,key,value):
         """
-        T._get_all_leaf_paths() -> Sequence. Produces a sequence
-        of all simple paths from all nodes to leaves in T.
+        T._new_node(key,value) -> RBNode. Produces a new, unlinked Red Black Node.
         """
-        all_leafpaths = []
-        nodelist = self.preorder()
-        for node in nodelist:
-            all_leafpaths.append(self._get_all_leaf_paths_from(node))
-        return all_leafpaths
+        return RBNode(key,value)
 
-    def _get_all_leaf_paths_from(self,node, acc=[]):
+    def _label_built_node(self,node,size,depth,max_depth):
         """
-        T._get_all_leaf_paths_from(node,acc) -> Sequence. Produes
-        a sequence of all simple paths from all nodes to leaves
-        in T starting from the Node node.
+        T._label_built_node(node,size,depth,max_depth). Colors node.
+        Every path from the root of a perfectly balanced tree to a null
+        child passes through all levels but the deepest, so those are
+        colored black and the deepest (possibly incomplete) level red.
         """
-        leafpaths = []
-
-        if not node.left and not node.right:
-            leafpaths.append([node]+acc)
-
-        if node.left:
-            for leaf_path in self._get_all_leaf_paths_from(node.left, [node]+acc):
-                leafpaths.append(leaf_path)
-        if node.right:
-            for leaf_path in self._get_all_leaf_paths_from(node.right, [node]+acc):
-                leafpaths.append(leaf_path)
-
-        return leafpaths
+        if depth == max_depth and depth > 0:
+            node.color = 'r'
+        else:
+            node.color = 'k'
 
     def is_valid(self,*args):
         """
         T.is_valid(...) -> Boolean. Produces True if and only if
-        T is a valid Red Black Tree. Raises an exception otherwise.
-        """
-        if len(args) == 0:
-            node = self.Root
-            all_leafpaths = self._get_all_leaf_paths()
-            for leafpaths in all_leafpaths:
-                black_count_list = []
-                for path in leafpaths:
-                    black_count = 0
-                    for node in path:
-                        if node.color == 'k':
-                            black_count = black_count + 1
-                    black_count_list.append(black_count)
-
-                if not black_count_list[1:] == black_count_list[:-1]:
-                    raise Exception("Not all simple paths in  " + str(self) + " have same amount of black nodes!")
-
-        else:
-            node = args[0]
-
-        if not node:
-            return True
+        T is a valid Red Black Tree. Raises an exception listing
+        every violation otherwise.
+        """
+        return BSTree.is_valid(self,*args)
 
-        if node.left:
-            if not node.left.parent == node:
-                raise Exception("Left child of node " + str(node.key) + " is adopted by another node!")
+    def _check_root(self,node,violations):
+        """
+        T._check_root(node,violations) -> (Nat,Nat). Checks that the
+        root of T is black. Produces the number of black Nodes above
+        node, none, and the number every path from node down to a null
+        child should pass through, taken from its leftmost path.
+        """
+        if node == self.Root and node.color == 'r':
+            violations.append("Root " + str(node.key) + " is red!")
 
-        if node.right:
-            if not node.right.parent == node:
-                raise Exception("Right child of node " + str(node.key) + " is adopted by another node!")
+        expected = 0
+        while node:
+            if node.color == 'k':
+                expected = expected + 1
+            node = node.left
+        return 0, expected
 
-        if node.parent and node.parent.left == node:
-            if node.key > node.parent.key:
-                raise Exception("Node " + str(node.key) + " is to the left of " + str(node.parent.key) + " but is larger")
+    def _check_node(self,node,state,violations):
+        """
+        T._check_node(node,state,violations) -> (Nat,Nat). Checks the
+        color of node and, if node has a null child, the number of
+        black Nodes on the path down to it. state holds the number of
+        black Nodes above node and the number every path should have.
+        """
+        blacks, expected = state
 
-        if node.parent and node.parent.right == node:
-            if node.key < node.parent.key:
-                raise Exception("Node " + str(node.key) + " is to the right of " + str(node.parent.key) + " but is smaller")
+        if node.color == 'k':
+            blacks = blacks + 1
+        elif not node.color == 'r':
+            violations.append("Node " + str(node.key) + " has unknown color " + str(node.color))
+        elif ((node.left and node.left.color == 'r') or
+              (node.right and node.right.color == 'r')):
+            violations.append("Node " + str(node.key) + " is red and has a red child!")
 
-        if node.color == 'r':
-            if ((node.left and node.left.color == 'r') or
-                (node.right and node.right.color == 'r')):
-                    raise Exception("Node " + str(node.key) + " is red and has a red child!")
+        if not (node.left and node.right) and not blacks == expected:
+            violations.append("Path to a null child of node " + str(node.key) + " has " + str(blacks) + " black nodes and should have " + str(expected))
 
-        return (self.is_valid(node.left) and self.is_valid(node.right))
+        return blacks, expected
 
     def preorder(self,*args):
         """
@@ -157,7 +147,7 @@ class RBTree(BSTree):
         """
         return BSTree.postorder(self,*args)
 
-    def levelorder(self):
+    def levelorder(self,*args):
         """
         T.levelorder(...) -> Sequence. Produces a sequence of the Nodes
         in T, obtained in levelorder.
@@ -199,6 +189,9 @@ class RBTree(BSTree):
                 par_node.left = new_root
                 new_root.parent = par_node
 
+        new_root.size = old_root.size
+        self._resize(old_root)
+
     def _rotate_right(self,pivot):
         """
         T.__rotate_right(pivot). Performs a right tree rotation in T
@@ -233,23 +226,28 @@ class RBTree(BSTree):
                     par_node.left = new_root
                     new_root.parent = par_node
 
+            new_root.size = old_root.size
+            self._resize(old_root)
+
     def _insert_case_one(self,child):
         """
         T._insert_case_one(child). Considers the case in which
         child is at the root of the tree. Recolors black if so,
-        otherwise moves on to case two.
+        otherwise moves on to case two. Repeats for as long as
+        case three hands back a grandparent to start over from.
         """
         node = child
-        par_node = node.parent
 
-        if not par_node:
-            self.Root.color = 'k'
-        else:
-            self._insert_case_two(node)
+        while node:
+            if not node.parent:
+                self.Root.color = 'k'
+                node = None
+            else:
+                node = self._insert_case_two(node)
 
     def _insert_case_two(self,child):
         """
-        T._insert_case_two(child). Considers the case in which
+        T._insert_case_two(child) -> Node. Considers the case in which
         child's parent is black. If so, we are done. If not, moves
         to case three.
         """
@@ -257,16 +255,18 @@ class RBTree(BSTree):
         par_node = node.parent
 
         if par_node.color == 'r':
-            self._insert_case_three(node)
+            return self._insert_case_three(node)
+        return None
 
     def _insert_case_three(self,child):
         """
-        T._insert_case_three(child). Considers the case in which
+        T._insert_case_three(child) -> Node. Considers the case in which
         child's parent and uncle are red. If so, recolors
         the parent and uncle black, and child's grandparent red.
         Note child's grandparent now may have a red parent, which
-        makes T invalid. So now we start over from case one at
-        the grandparent.
+        makes T invalid. So the grandparent is produced for case one
+        to start over from. Otherwise moves on to case four and
+        produces None.
         """
         node = child
         par_node = node.parent
@@ -280,9 +280,10 @@ class RBTree(BSTree):
             grand_node.color = 'r'
             par_node.color = 'k'
             uncle.color = 'k'
-            self._insert_case_one(grand_node)
+            return grand_node
         else:
             self._insert_case_four(node)
+            return None
 
     def _insert_case_four(self,child):
         """
@@ -335,6 +336,182 @@ class RBTree(BSTree):
                 par_node.color = 'k'
                 self._rotate_left(grand_node)
 
+    def _black_height(self,node):
+        """
+        T._black_height(node) -> Nat. Produces the number of black
+        Nodes on any path from node down to a missing child,
+        counting node itself.
+        """
+        height = 0
+        while node:
+            if node.color == 'k':
+                height = height + 1
+            node = node.left
+        return height
+
+    def _join(self,left,left_black,node,right,right_black):
+        """
+        T._join(left,left_black,node,right,right_black) -> Nat. Makes T
+        the Red Black Tree holding the subtrees rooted at left and right,
+        of black heights left_black and right_black, joined by node.
+        Every key under left must be smaller than node's key and every
+        key under right larger. Produces the black height of T. Takes
+        time proportional to the difference in black height of left
+        and right.
+        """
+        # Subtrees cut out of a tree may have a red root.
+        if left and left.color == 'r':
+            left.color = 'k'
+            left_black = left_black + 1
+        if right and right.color == 'r':
+            right.color = 'k'
+            right_black = right_black + 1
+
+        if left_black == right_black:
+            node.left = left
+            node.right = right
+            node.parent = None
+            if left:
+                left.parent = node
+            if right:
+                right.parent = node
+            node.color = 'k'
+            self._resize(node)
+            self.Root = node
+            return left_black + 1
+
+        # Walk down the spine of the taller subtree facing the other
+        # one to the first black subtree of the same black height.
+        if left_black > right_black:
+            black = left_black
+            self.Root = left
+            left.parent = None
+            par_node = None
+            child = left
+            while not (black == right_black and (not child or child.color == 'k')):
+                if child.color == 'k':
+                    black = black - 1
+                par_node = child
+                child = child.right
+            par_node.right = node
+            node.left = child
+            node.right = right
+        else:
+            black = right_black
+            self.Root = right
+            right.parent = None
+            par_node = None
+            child = right
+            while not (black == left_black and (not child or child.color == 'k')):
+                if child.color == 'k':
+                    black = black - 1
+                par_node = child
+                child = child.left
+            par_node.left = node
+            node.left = left
+            node.right = child
+
+        node.parent = par_node
+        if node.left:
+            node.left.parent = node
+        if node.right:
+            node.right.parent = node
+        node.color = 'r'
+        self._resize(node)
+        self._update_sizes(par_node,node.size - (child.size if child else 0))
+
+        # The same as _insert_case_one, except that the black height
+        # grows if the root has to be recolored.
+        black = max(left_black,right_black)
+        while node:
+            if not node.parent:
+                if node.color == 'r':
+                    node.color = 'k'
+                    black = black + 1
+                node = None
+            else:
+                node = self._insert_case_two(node)
+        return black
+
+    def split(self,key):
+        """
+        T.split(key) -> (RBTree,RBTree). Produces a tree of the Nodes
+        in T with keys smaller than key and a tree of the rest, in time
+        proportional to the height of T. T is left empty.
+        """
+        path = []
+        node = self.Root
+        black = self._black_height(node)
+        while node:
+            path.append((node,black))
+            if node.color == 'k':
+                black = black - 1
+            if node.key >= key:
+                node = node.left
+            else:
+                node = node.right
+
+        smaller = self._spawn()
+        larger = self._spawn()
+        smaller_black = 0
+        larger_black = 0
+        for node, black in reversed(path):
+            # Black height of either child of node
+            black = black - (1 if node.color == 'k' else 0)
+            if node.key >= key:
+                larger_black = larger._join(larger.Root,larger_black,node,node.right,black)
+            else:
+                smaller_black = smaller._join(node.left,black,node,smaller.Root,smaller_black)
+
+        self.Root = None
+        return smaller, larger
+
+    @classmethod
+    def join(cls,left,right):
+        """
+        Tree.join(left,right) -> Tree. Produces a tree of the Nodes of
+        left and right, whose keys must all be smaller in left than in
+        right, in time proportional to the height of the taller tree.
+        left and right are left empty.
+        """
+        if not (isinstance(left,cls) and isinstance(right,cls)):
+            raise TypeError("Can only join two " + cls.__name__ + "s")
+
+        tree = left._spawn()
+        if not (left.Root and right.Root):
+            tree.Root = left.Root or right.Root
+        else:
+            middle = right.get_min()
+            if not left.get_max().key < middle.key:
+                raise ValueError("Keys of the left tree must be smaller than those of the right tree")
+            key, value = middle.key, middle.value
+            right.delete(key)
+            tree._join(left.Root,left._black_height(left.Root),tree._new_node(key,value),
+                       right.Root,right._black_height(right.Root))
+
+        left.Root = None
+        right.Root = None
+        return tree
+
+    def _join_trees(self,left,node,right):
+        """
+        T._join_trees(left,node,right) -> RBTree. Produces the tree made of
+        the RBTrees left and right joined by node. right is left empty.
+        """
+        left._join(left.Root,left._black_height(left.Root),node,
+                   right.Root,right._black_height(right.Root))
+        right.Root = None
+        return left
+
+    def _use_join(self,other):
+        """
+        T._use_join(other) -> Boolean. Produces True if one of T and
+        other is so much smaller than the other that splitting and
+        joining beats merging their keys. See BSTree._set_operation.
+        """
+        sizes = sorted((self.get_element_count(),other.get_element_count()))
+        return sizes[0] * 8 < sizes[1]
+
     def insert(self,key,value,*args):
         """
         T.insert(key,value...) <==> T[key] = value. Inserts
@@ -347,31 +524,15 @@ class RBTree(BSTree):
             raise TypeError(str(key) + " is not a number")
         else:
             if not self.Root:
-                self.Root = RBNode(key,value)
+                self.Root = self._new_node(key,value)
                 self.Root.color = 'k'
-            elif len(args) == 0:
-                if not self.get_node(key,self.Root):
-                        self.insert(key,value,self.Root)
-
             else:
-                child = RBNode(key,value)
-                parent = args[0]
-                if child.key > parent.key:
-                    if not parent.right:
-                        parent.right = child
-                        child.parent = parent
-                        if parent.color == 'r':
-                            self._insert_case_one(child)
-                    else:
-                        self.insert(key,value,parent.right)
-                else:
-                    if not parent.left:
-                        parent.left = child
-                        child.parent = parent
-                        if parent.color == 'r':
-                            self._insert_case_one(child)
-                    else:
-                        self.insert(key,value,parent.left)
+                parent, found = self._find_parent(key,args[0] if args else self.Root)
+                if not found:
+                    child = self._new_node(key,value)
+                    self._attach(parent,child)
+                    if parent.color == 'r':
+                        self._insert_case_one(child)
 
     def insert_from(self,seq):
         """
@@ -413,15 +574,19 @@ class RBTree(BSTree):
         """
         T._delete_case_one(child,parent). Considers the case in which
         child is the new root. If so, we are done. If not, move on to
-        case two.
+        case two. Repeats for as long as case three hands back a
+        parent to start over from.
         """
-        if parent:
-            self._delete_case_two(child,parent)
+        while parent:
+            up = self._delete_case_two(child,parent)
+            if not up:
+                break
+            child, parent = up
 
     def _delete_case_two(self,child,parent):
         """
-        T._delete_case_two(child,parent). Considers the case in which
-        child's sibling is red. If so, reverse the colors of parent
+        T._delete_case_two(child,parent) -> (Node,Node). Considers
+        the case in which child's sibling is red. If so, reverse the colors of parent
         and sibling, and perform an appropriate tree rotation
         around the parent. Move on to case three.
         """
@@ -441,14 +606,15 @@ class RBTree(BSTree):
             else:
                 self._rotate_right(par_node)
 
-        self._delete_case_three(node,par_node)
+        return self._delete_case_three(node,par_node)
 
     def _delete_case_three(self,child,parent):
         """
-        T._delete_case_three(child,parent). Considers the case in which
-        parent, child's sibling, and the sibling's children are all
-        black. If so, recolor child's sibling red and start over
-        from case one from parent. If not, move on to case four.
+        T._delete_case_three(child,parent) -> (Node,Node). Considers
+        the case in which parent, child's sibling, and the sibling's children are all
+        black. If so, recolor child's sibling red and produce parent
+        and its own parent so case one starts over from there. If not,
+        move on to case four and produce None.
         """
         node = child
         par_node = parent
@@ -475,9 +641,10 @@ class RBTree(BSTree):
 
         if par_node.color == 'k' and sib_color == 'k' and sib_left_color == 'k' and sib_right_color == 'k':
             sib_node.color = 'r'
-            self._delete_case_one(par_node,par_node.parent if par_node.parent else None)
+            return (par_node,par_node.parent)
         else:
             self._delete_case_four(node,par_node)
+            return None
 
     def _delete_case_four(self,child,parent):
         """
@@ -607,50 +774,50 @@ class RBTree(BSTree):
 
     def _delete_leaf(self,node):
         """
-        T.__delete_leaf_parent(node). Deletes node from T, treating it
-        as a Node with only one child.
+        T._delete_leaf(node). Deletes node from T, treating it
+        as a leaf.
         """
         par_node = node.parent
+        self._update_sizes(par_node,-1)
         node_color = node.color
 
-        if par_node:
-            if par_node.left == node:
-                par_node.left = None
-                new_node = None
-            else:
-                par_node.right = None
-                new_node = None
+        if not par_node:
+            self.Root = None
+            return
 
-            del node
+        if par_node.left == node:
+            par_node.left = None
+        else:
+            par_node.right = None
 
-        new_parent = par_node
+        del node
 
         if node_color == 'k':
-            self._delete_case_one(new_node,new_parent)
+            self._delete_case_one(None,par_node)
 
     def _delete_leaf_parent(self,node):
         """
-        T.__delete_leaf_parent(node). Deletes node from T, treating it
+        T._delete_leaf_parent(node). Deletes node from T, treating it
         as a Node with only one child.
         """
         par_node = node.parent
+        self._update_sizes(par_node,-1)
         node_color = node.color
         if node.left:
             child_color = node.left.color
         else:
             child_color = node.right.color
 
-        if node.key == self.Root.key:
+        if node == self.Root:
             if node.right:
                 self.Root = node.right
-                self.Root.color = 'k'
                 node.right = None
-                new_node = node.right
             else:
                 self.Root = node.left
-                self.Root.color = 'k'
                 node.left = None
-                new_node= node.left
+            self.Root.parent = None
+            self.Root.color = 'k'
+            new_node = self.Root
 
         else:
             if par_node.right == node:
@@ -707,19 +874,18 @@ class RBTree(BSTree):
         """
         BSTree._delete_node(self,node)
 
-    def delete(self,key):
-        """T.delete(key) <==> del T[key]. Deletes the Node
+    def delete(self,key,*args):
+        """T.delete(key...) <==> del T[key]. Deletes the Node
         with key attribute key from T. Recolours T and
         performs tree rotations as necessary. Note, for
         more information regarding the cases to be considered
         for deletion, see: http://en.wikipedia.org/wiki/Red-black_tree
         """
-        node = self.get_node(key,self.Root)
+        node = self.get_node(key,args[0] if args else self.Root)
 
         if node:
             if not (node.left or node.right):
-                if node.parent:
-                    self._delete_leaf(node)
+                self._delete_leaf(node)
 
             elif not (node.left and node.right):
                 self._delete_leaf_parent(node)
@@ -729,11 +895,7 @@ class RBTree(BSTree):
 
     def delete_from(self,seq):
         """
-        T.delete_from(seq). For every keyin seq, deletes
+        T.delete_from(seq). For every key in seq, deletes
         the Node with that key attribute from T.
         """
-        if isinstance(seq,collections.Iterable):
-            for x in seq:
-                self.delete(x)
-        else:
-            raise TypeError(str(iter) + " is not iterable")
\ No newline at end of file
+        BSTree.delete_from(self,seq)
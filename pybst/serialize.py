@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# Author: Tyler Sanderson <tylerbtbam@gmail.com>
+#
+# This file is part of PyBST.
+#
+# PyBST is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyBST is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyBST.  If not, see <http://www.gnu.org/licenses/>.
+
+# Binary dump format, version 2. All integers are little-endian.
+#
+#     header:  'PYBST' | version (B) | class name length (B) | class name
+#              | options length (I) | options | element count (Q)
+#     block:   kind (c) | pair count (I) | keys | values length (I) | values
+#     end:     'E'
+#
+# The options are a pickled dict of the keyword arguments the tree was
+# created with, such as the key typecode of an array tree, the order of
+# a B-Tree or the splay policy of a Splay Tree.
+# Blocks hold at most BLOCK_SIZE pairs in increasing order of key.
+# Their keys are packed as 8 byte integers (kind 'q'), 8 byte floats
+# (kind 'd'), or, for other numbers, pickled as a list preceded by its
+# length (I) (kind 'p').
+# The values of a block are pickled as one list.
+
+import cPickle
+import itertools
+import struct
+import bstree
+import avltree
+import rbtree
+import splaytree
+import arraytree
+import btree
+
+MAGIC = 'PYBST'
+FORMAT_VERSION = 2
+
+# Number of pairs written per block
+BLOCK_SIZE = 4096
+
+_CLASSES = dict((cls.__name__,cls) for cls in
+                (bstree.BSTree,avltree.AVLTree,rbtree.RBTree,splaytree.SplayTree,
+                 arraytree.ArrayAVLTree,arraytree.ArrayRBTree,btree.BTree))
+
+_HEADER = struct.Struct('<B')
+_COUNT = struct.Struct('<Q')
+_BLOCK = struct.Struct('<cI')
+_LENGTH = struct.Struct('<I')
+
+def _write_string(file,string):
+    """_write_string(file,string). Writes string preceded by its length."""
+    file.write(_HEADER.pack(len(string)))
+    file.write(string)
+
+def _read(file,size):
+    """
+    _read(file,size) -> String. Reads exactly size bytes from file.
+    Raises ValueError if the file ends first.
+    """
+    data = file.read(size)
+    if len(data) != size:
+        raise ValueError("Tree dump is truncated")
+    return data
+
+def _read_string(file):
+    """_read_string(file) -> String. Reads a string preceded by its length."""
+    return _read(file,_HEADER.unpack(_read(file,_HEADER.size))[0])
+
+def can_dump(cls):
+    """
+    can_dump(cls) -> Boolean. Produces True if and only if dump can
+    write trees of class cls. Subclasses of the tree classes cannot
+    be dumped, since load would not know how to create them.
+    """
+    return _CLASSES.get(cls.__name__) is cls
+
+def _options(tree):
+    """
+    _options(tree) -> Dict. Produces the keyword arguments needed to
+    create an empty tree like tree.
+    """
+    if isinstance(tree,arraytree.ArrayAVLTree) or isinstance(tree,arraytree.ArrayRBTree):
+        return {'typecode': tree.arrays.typecode}
+    if isinstance(tree,btree.BTree):
+        return {'order': tree.order}
+    if isinstance(tree,splaytree.SplayTree):
+        return {'policy': tree.policy,'threshold': tree.threshold,'period': tree.period}
+    return {}
+
+def _write_block(file,keys,values):
+    """
+    _write_block(file,keys,values). Writes one block of pairs, packing
+    the keys as integers or floats if they all are.
+    """
+    count = len(keys)
+    kinds = set(map(type,keys))
+    if kinds == set([int]):
+        kind = 'q'
+    elif kinds == set([float]):
+        kind = 'd'
+    else:
+        kind = 'p'
+
+    file.write(_BLOCK.pack(kind,count))
+    if kind == 'p':
+        data = cPickle.dumps(keys,cPickle.HIGHEST_PROTOCOL)
+        file.write(_LENGTH.pack(len(data)))
+        file.write(data)
+    else:
+        file.write(struct.pack('<%d%s' % (count,kind),*keys))
+
+    data = cPickle.dumps(values,cPickle.HIGHEST_PROTOCOL)
+    file.write(_LENGTH.pack(len(data)))
+    file.write(data)
+
+def _read_pairs(file,count):
+    """
+    _read_pairs(file,count) -> Iterator. Produces the count pairs stored
+    in the blocks of file one at a time, reading one block at a time.
+    Raises ValueError if the keys are not in strictly increasing order.
+    """
+    last = None
+    while count > 0:
+        kind, size = _BLOCK.unpack(_read(file,_BLOCK.size))
+        if kind == 'p':
+            length = _LENGTH.unpack(_read(file,_LENGTH.size))[0]
+            keys = cPickle.loads(_read(file,length))
+        elif kind in ('q','d'):
+            keys = struct.unpack('<%d%s' % (size,kind),_read(file,8 * size))
+        else:
+            raise ValueError("Tree dump holds fewer elements than its header states")
+        length = _LENGTH.unpack(_read(file,_LENGTH.size))[0]
+        values = cPickle.loads(_read(file,length))
+
+        if size == 0 or size > count or len(keys) != size or len(values) != size:
+            raise ValueError("Tree dump has a corrupt block")
+        if last is not None and not last < keys[0]:
+            raise ValueError("Keys of tree dump are not in strictly increasing order")
+        for i in xrange(1,size):
+            if not keys[i - 1] < keys[i]:
+                raise ValueError("Keys of tree dump are not in strictly increasing order")
+
+        last = keys[-1]
+        count = count - size
+        for pair in itertools.izip(keys,values):
+            yield pair
+
+def dump(tree,file):
+    """
+    dump(tree,file). Writes the class, options, keys and values of tree
+    to the binary file in increasing order of key, one block at a time.
+    The shape of tree is not stored. Values are pickled.
+    """
+    cls = tree.__class__
+    if not can_dump(cls):
+        raise TypeError("Cannot dump a tree of class " + cls.__name__)
+
+    file.write(MAGIC)
+    file.write(_HEADER.pack(FORMAT_VERSION))
+    _write_string(file,cls.__name__)
+    data = cPickle.dumps(_options(tree),cPickle.HIGHEST_PROTOCOL)
+    file.write(_LENGTH.pack(len(data)))
+    file.write(data)
+    file.write(_COUNT.pack(tree.get_element_count()))
+
+    items = tree.items()
+    while True:
+        block = list(itertools.islice(items,BLOCK_SIZE))
+        if not block:
+            break
+        keys, values = zip(*block)
+        _write_block(file,list(keys),list(values))
+    file.write('E')
+
+def load(file):
+    """
+    load(file) -> Tree. Reads a tree written by dump from the binary
+    file and rebuilds it as a perfectly balanced tree of the class and
+    options it was dumped with, in linear time, one block at a time. Raises
+    ValueError if file does not hold a valid dump.
+    """
+    if _read(file,len(MAGIC)) != MAGIC:
+        raise ValueError("File does not hold a tree dump")
+    version = _HEADER.unpack(_read(file,_HEADER.size))[0]
+    if version != FORMAT_VERSION:
+        raise ValueError("Unsupported tree dump format version " + str(version))
+
+    name = _read_string(file)
+    if name not in _CLASSES:
+        raise ValueError("Unknown tree class " + name)
+    length = _LENGTH.unpack(_read(file,_LENGTH.size))[0]
+    options = cPickle.loads(_read(file,length))
+    count = _COUNT.unpack(_read(file,_COUNT.size))[0]
+
+    tree = _CLASSES[name](**options)
+    tree._load_sorted(count,_read_pairs(file,count))
+
+    if _read(file,1) != 'E':
+        raise ValueError("Tree dump holds more elements than its header states")
+    return tree
\ No newline at end of file
@@ -22,8 +22,13 @@ import bstree
 Node = bstree.Node
 BSTree = bstree.BSTree
 
+SPLAY_POLICIES = ('full','semi','depth','periodic')
+DEFAULT_PERIOD = 16
+
 class SplayNode(Node):
     """Represents a node of a Splay Tree"""
+    __slots__ = ()
+
     def __init__(self,key,value):
         """Initializes a BST Node to represent a Splay Node"""
         Node.__init__(self,key,value)
@@ -40,48 +45,83 @@ class SplayTree(BSTree):
     For more information regarding Splay Trees, see:
     http://en.wikipedia.org/wiki/Splay_Tree
 
+    The splay policy sets what get_node does with the Node it finds,
+    or the last Node visited if the key is not in the tree:
+
+    'full':     splays it to the root
+    'semi':     semi-splays it, moving it about halfway up its path
+                with at most one rotation per step
+    'depth':    splays it only if the search visited more than
+                threshold Nodes, by default twice the height of a
+                perfectly balanced tree of the same size
+    'periodic': splays it on every period-th call only
+
+    The other policies rotate less than 'full' once the keys being
+    looked up are near the root. insert and delete always splay.
+    peek looks a key up without changing the tree at all.
+
     Constructors:
 
     SplayTree() -> Creates a new empty Splay Tree
     SplayTree(seq) -> Creates a new Splay Tree from the elements in sequence [(k1,v1),(k2,v2),...,(kn,vn)]
+    SplayTree(...,policy=p) -> Splays lookups by policy p, 'full' by default
+    SplayTree(...,threshold=d) -> Sets the depth of the 'depth' policy
+    SplayTree(...,period=k) -> Sets the period of the 'periodic' policy, 16 by default
 
     For further explanation of some functions or their source code, see bstree.py.
     """
-    def __init__(self,*args):
-        """Initialzes tree the same as as BST"""
+    def __init__(self,*args,**kwargs):
+        """Sets the splay policy, then initializes the tree the same as a BST"""
+        policy = kwargs.pop('policy','full')
+        threshold = kwargs.pop('threshold',None)
+        period = kwargs.pop('period',DEFAULT_PERIOD)
+        if kwargs:
+            raise TypeError("Unexpected keyword arguments " + str(sorted(kwargs)))
+        if policy not in SPLAY_POLICIES:
+            raise ValueError("policy must be one of " + str(SPLAY_POLICIES) + ", not " + repr(policy))
+        if threshold is not None and threshold < 1:
+            raise ValueError("threshold must be at least 1, not " + str(threshold))
+        if period < 1:
+            raise ValueError("period must be at least 1, not " + str(period))
+
+        self.policy = policy
+        self.threshold = threshold
+        self.period = period
+        self._accesses = 0
         BSTree.__init__(self,*args)
 
-    def is_valid(self, *args):
+    @classmethod
+    def from_sorted(cls,seq,policy='full',threshold=None,period=DEFAULT_PERIOD):
         """
-        T.is_valid(...) -> Boolean. Produces True if and only if
-        T is a valid Splay Tree. Note a valid Splay Tree has the exact same properties
-        as a valid BST. Raises an exception otherwise.
+        Tree.from_sorted(seq,policy='full',...) -> Tree. Creates a new
+        perfectly balanced Splay Tree with the given splay policy from
+        the elements in sequence [(k1,v1),(k2,v2),...,(kn,vn)] in linear
+        time. If seq is not sorted by key it is sorted first.
         """
-        if len(args) == 0:
-            node = self.Root
-        else:
-            node = args[0]
-
-        if not node:
-            return True
-
-        if node.left:
-            if not node.left.parent == node:
-                raise Exception("Left child of node " + str(node.key) + " is adopted by another node!")
+        tree = cls(policy=policy,threshold=threshold,period=period)
+        tree._bulk_load(seq)
+        return tree
 
-        if node.right:
-            if not node.right.parent == node:
-                raise Exception("Right child of node " + str(node.key) + " is adopted by another node!")
-
-        if node.parent and node.parent.left == node:
-            if node.key > node.parent.key:
-                raise Exception("Node " + str(node.key) + " is to the left of " + str(node.parent.key) + " but is larger")
+    def _spawn(self):
+        """
+        T._spawn() -> Tree. Produces a new empty Splay Tree of the same
+        class and splay policy as T.
+        """
+        return self.__class__(policy=self.policy,threshold=self.threshold,period=self.period)
 
-        if node.parent and node.parent.right == node:
-            if node.key < node.parent.key:
-                raise Exception("Node " + str(node.key) + " is to the right of " + str(node.parent.key) + " but is smaller")
+    def _new_node(self,key,value):
+        """
+        T._new_node(key,value) -> SplayNode. Produces a new, unlinked Splay Node.
+        """
+        return SplayNode(key,value)
 
-        return (self.is_valid(node.left) and self.is_valid(node.right))
+    def is_valid(self, *args):
+        """
+        T.is_valid(...) -> Boolean. Produces True if and only if
+        T is a valid Splay Tree. Note a valid Splay Tree has the exact same properties
+        as a valid BST. Raises an exception listing every violation otherwise.
+        """
+        return BSTree.is_valid(self,*args)
 
     def preorder(self,*args):
         """
@@ -104,80 +144,112 @@ class SplayTree(BSTree):
         """
         return BSTree.postorder(self,*args)
 
-    def levelorder(self):
+    def levelorder(self,*args):
         """
         T.levelorder(...) -> Sequence. Produces a sequence of the Nodes
         in T, obtained in levelorder.
         """
         return BSTree.levelorder(self,*args)
 
-    def _get_node_without_splaying(self,key,*args):
+    def peek(self,key,*args):
         """
-        T.get_node(key,...) -> Node. Produces the Node in T with key
-        attribute key without rotating it to the root of T.
-        If there is no such Node, produces None.
+        T.peek(key,...) -> Node. Produces the Node in T with key
+        attribute key without changing T. If there is no such Node,
+        produces None.
         """
         return BSTree.get_node(self,key,*args)
 
     def get_node(self,key,*args):
         """
         T.get_node(key,...) -> Node. Produces the Node in T with key
-        attribute key and _rotates it to the root of T.
-        If there is no such Node, produces None.
-        """
-        if len(args) == 0:
-            start = self.Root
-        else:
-            start = args[0]
-        if not start:
-            return None
-        if key == start.key:
-            self._rotate_to_root(start)
-            return start
-        elif key > start.key:
-            return self.get_node(key,start.right)
-        else:
-            return self.get_node(key,start.left)
+        attribute key and splays it toward the root of T by the splay
+        policy of T. If there is no such Node, produces None, and the
+        last Node visited by the search is splayed instead. Full splays
+        of searches from the root are done top-down in the same pass;
+        otherwise what the search found is rotated up afterwards.
+        """
+        policy = self.policy
+        from_root = len(args) == 0 or args[0] is self.Root
+        if policy == 'periodic':
+            self._accesses = self._accesses + 1
+            if self._accesses < self.period:
+                return BSTree.get_node(self,key,*args)
+            self._accesses = 0
+
+        if from_root and policy in ('full','periodic'):
+            node = self._splay(key)
+            return node if node and node.key == key else None
+
+        node = args[0] if args else self.Root
+        last = None
+        depth = 0
+        while node:
+            last = node
+            depth = depth + 1
+            if key == node.key:
+                break
+            elif key > node.key:
+                node = node.right
+            else:
+                node = node.left
+
+        if last:
+            if policy == 'semi':
+                self._semi_splay(last)
+            elif policy != 'depth':
+                self._rotate_to_root(last)
+            elif depth > (self.threshold or 2 * self.Root.size.bit_length()):
+                self._rotate_to_root(last)
+        return node
 
     def insert(self,key,value,*args):
         """
-        T.insert(key,value...) <==> T[key] = value. Inserts
-        a new Node with key attribute key and value attribute
-        value into T and _rotates it to the root of T.
+        T.insert(key,value) <==> T[key] = value. Splays the Node
+        nearest to key to the root of T, then inserts a new Node with
+        key attribute key and value attribute value above it as the
+        new root. If key is already in T, its Node is just splayed.
         """
         if not isinstance(key,(int,long,float)):
             raise TypeError(str(key) + " is not a number")
-        else:
-            if not self.Root:
-                self.Root = Node(key,value)
-            elif len(args) == 0:
-                if not self._get_node_without_splaying(key, self.Root):
-                    self.insert(key,value,self.Root)
+
+        node = self._splay(key)
+        if node and node.key == key:
+            return
+
+        root = self._new_node(key,value)
+        if node:
+            if key < node.key:
+                root.left = node.left
+                node.left = None
+                root.right = node
             else:
-                child = Node(key,value)
-                parent = args[0]
-                if child.key > parent.key:
-                    if not parent.right:
-                        parent.right = child
-                        child.parent = parent
-                        self._rotate_to_root(child)
-                    else:
-                        self.insert(key,value,parent.right)
-                else:
-                    if not parent.left:
-                        parent.left = child
-                        child.parent = parent
-                        self._rotate_to_root(child)
-                    else:
-                        self.insert(key,value,parent.left)
+                root.right = node.right
+                node.right = None
+                root.left = node
+            for child in (root.left,root.right):
+                if child:
+                    child.parent = root
+            self._resize(node)
+            self._resize(root)
+        self.Root = root
 
     def insert_from(self,seq):
         """
         T.insert_from(seq). For every key, value pair in seq,
         inserts a new Node into T with key and value attributes
-        as given.
+        as given, splaying each. When seq has more pairs than T has
+        Nodes, T is rebuilt from both with from_sorted instead.
         """
-        BSTree.insert_from(self,seq)
+        if not isinstance(seq,collections.Iterable):
+            raise TypeError(str(seq) + " is not iterable")
+
+        pairs = list(seq)
+        if len(pairs) > self.get_element_count():
+            BSTree.insert_from(self,pairs)
+            return
+
+        for x in pairs:
+            self.insert(x[0],x[1])
 
     def get_max(self,*args):
         """
@@ -207,62 +279,122 @@ class SplayTree(BSTree):
         """
         return BSTree.get_height(self,*args)
 
-    def _rotate_left(self,pivot):
-        """
-        T.__rotate_left(pivot). Performs a left tree rotation in T
-        around the Node pivot.
+    def _splay(self,key):
         """
-        old_root = pivot
-        par_node = old_root.parent
-
-        new_root = old_root.right
-        temp = new_root.right
-        old_root.right = new_root.left
-
-        if (old_root.right):
-            old_root.right.parent = old_root
-        new_root.left = old_root
-        old_root.parent = new_root
-
-        if par_node is None:
-            self.Root = new_root
-            self.Root.parent = None
-        else:
-            if par_node.right and par_node.right.key == old_root.key:
-                par_node.right = new_root
-                new_root.parent = par_node
-            elif par_node.left and par_node.left.key == old_root.key:
-                par_node.left = new_root
-                new_root.parent = par_node
+        T._splay(key) -> Node. Splays the Node with key attribute key
+        to the root of T top-down, in one pass from the root, and
+        produces it. If there is no such Node, the last Node visited
+        by the search is splayed instead. Produces None if T is empty.
 
-    def _rotate_right(self,pivot):
+        On the way down, Nodes smaller than key are set aside in a
+        left tree and larger ones in a right tree, rotating at every
+        zig-zig step. Once the search ends, the two trees become the
+        children of the Node it ended at, and the sizes of the Nodes
+        set aside are recomputed from the bottom up.
         """
-        T.__rotate_right(pivot). Performs a right tree rotation in T
-        around the Node pivot.
-        """
-        old_root = pivot
-        par_node = old_root.parent
-
-        new_root = old_root.left
-        temp = new_root.left
-        old_root.left = new_root.right
-
-        if (old_root.left):
-            old_root.left.parent = old_root
-
-        new_root.right = old_root
-        old_root.parent = new_root
+        node = self.Root
+        if not node:
+            return None
 
-        if par_node is None:
-            self.Root = new_root
-            self.Root.parent = None
+        smaller = []
+        larger = []
+        while True:
+            if key < node.key:
+                child = node.left
+                if not child:
+                    break
+                if key < child.key:
+                    # Zig-zig: rotate right before linking
+                    node.left = child.right
+                    if child.right:
+                        child.right.parent = node
+                    child.right = node
+                    node.parent = child
+                    self._resize(node)
+                    node = child
+                    if not node.left:
+                        break
+                larger.append(node)
+                node = node.left
+            elif key > node.key:
+                child = node.right
+                if not child:
+                    break
+                if key > child.key:
+                    # Zig-zig: rotate left before linking
+                    node.right = child.left
+                    if child.left:
+                        child.left.parent = node
+                    child.left = node
+                    node.parent = child
+                    self._resize(node)
+                    node = child
+                    if not node.right:
+                        break
+                smaller.append(node)
+                node = node.right
+            else:
+                break
+
+        # Each Node set aside in the left tree hangs to the right of
+        # the one set aside before it, and the other way around for
+        # the right tree.
+        below = node.left
+        for parent in reversed(smaller):
+            parent.right = below
+            if below:
+                below.parent = parent
+            self._resize(parent)
+            below = parent
+        node.left = below
+        if below:
+            below.parent = node
+
+        below = node.right
+        for parent in reversed(larger):
+            parent.left = below
+            if below:
+                below.parent = parent
+            self._resize(parent)
+            below = parent
+        node.right = below
+        if below:
+            below.parent = node
+
+        node.parent = None
+        self._resize(node)
+        self.Root = node
+        return node
+
+    def _rotate_up(self,node):
+        """
+        T._rotate_up(node). Rotates node above its parent in T,
+        keeping the size attributes of both up to date.
+        """
+        parent = node.parent
+        grandparent = parent.parent
+        if parent.left is node:
+            parent.left = node.right
+            if node.right:
+                node.right.parent = parent
+            node.right = parent
+        else:
+            parent.right = node.left
+            if node.left:
+                node.left.parent = parent
+            node.left = parent
+        parent.parent = node
+
+        node.parent = grandparent
+        if grandparent is None:
+            self.Root = node
+        elif grandparent.left is parent:
+            grandparent.left = node
         else:
-            if par_node.right and par_node.right.key == old_root.key:
-                par_node.right = new_root
-                new_root.parent = par_node
-            elif par_node.left and par_node.left.key == old_root.key:
-                par_node.left = new_root
-                new_root.parent = par_node
+            grandparent.right = node
+
+        node.size = parent.size
+        self._resize(parent)
 
     def _rotate_to_root(self,node):
         """
@@ -271,149 +403,92 @@ class SplayTree(BSTree):
         """
         parent = node.parent
 
-        if parent:
+        while parent:
 
             grandparent = parent.parent
             if not grandparent:
-                if parent.left == node:
-                    self._rotate_right(parent)
-                else:
-                    self._rotate_left(parent)
-
-            elif grandparent.left == parent and parent.left == node:
-                self._rotate_right(grandparent)
-                self._rotate_right(parent)
-
-            elif grandparent.right == parent and parent.right == node:
-                self._rotate_left(grandparent)
-                self._rotate_left(parent)
-
-            elif grandparent.left == parent and parent.right == node:
-                self._rotate_left(parent)
-                self._rotate_right(grandparent)
-
-            elif grandparent.right == parent and parent.left == node:
-                self._rotate_right(parent)
-                self._rotate_left(grandparent)
-
-            self._rotate_to_root(node)
+                self._rotate_up(node)
 
-    def _delete_leaf(self,node):
-        """
-        T.__delete_leaf_parent(node). Deletes node from T, treating it
-        as a Node with only one child.
-        """
-        par_node = node.parent
+            elif (grandparent.left is parent) == (parent.left is node):
+                # Zig-zig
+                self._rotate_up(parent)
+                self._rotate_up(node)
 
-        if par_node:
-            if par_node.left == node:
-                par_node.left = None
             else:
-                par_node.right = None
-
-            del node
+                # Zig-zag
+                self._rotate_up(node)
+                self._rotate_up(node)
 
-        else:
-            self.Root = None
+            parent = node.parent
 
-    def _delete_leaf_parent(self,node):
+    def _semi_splay(self,node):
         """
-        T.__delete_leaf_parent(node). Deletes node from T, treating it
-        as a Node with only one child.
+        T._semi_splay(node). Semi-splays node toward the root of T. At
+        a zig-zig step only the parent of node is rotated, and the
+        splay carries on from the parent, so node moves about halfway
+        up its path while the path is still about halved in length.
         """
-        par_node = node.parent
-
-        if node.key == self.Root.key:
-            if node.right:
-                self.Root = node.right
-                node.right = None
-            else:
-                self.Root = node.left
-                node.left = None
-
-        else:
-            if par_node.right == node:
-                if node.right:
-                    par_node.right = node.right
-                    par_node.right.parent = par_node
-                    node.right = None
-                else:
-                    par_node.right = node.left
-                    par_node.right.parent = par_node
-                    node.left = None
-            else:
-
-                if node.right:
-                    par_node.left = node.right
-                    par_node.left.parent = par_node
-                    node.right = None
-                else:
-                    par_node.left = node.left
-                    par_node.left.parent = par_node
-                    node.left = None
-
-        del node
-
-    def _switch_nodes(self,node1,node2):
-        """
-        T.__switch_nodes(node1,node2). Switches positions
-        of node1 and node2 in T.
-        """
-        BSTree._switch_nodes(self,node1,node2)
-
-    def _delete_node(self,node):
-        """
-        T.__delete_node(node). Deletes node from T, treating it as
-        a Node with two children.
-        """
-        if self.get_height(node.left) > self.get_height(node.right):
-            to_switch = self.get_max(node.left)
-            self._switch_nodes(node,to_switch)
-
-            if not (to_switch.right or to_switch.left):
-                to_delete = self.get_max(node.left)
-                self._delete_leaf(to_delete)
-            else:
-                to_delete = self.get_max(node.left)
-                self._delete_leaf_parent(to_delete)
-        else:
-            to_switch = self.get_min(node.right)
-            self._switch_nodes(node,to_switch)
-
-            if not (to_switch.right or to_switch.left):
-                to_delete = self.get_min(node.right)
-                self._delete_leaf(to_delete)
-            else:
-                to_delete = self.get_min(node.right)
-                self._delete_leaf_parent(to_delete)
-
-    def delete(self,key):
-        """T.delete(key) <==> del T[key]. Deletes the Node
-        with key attribute key from T.
-        """
-        node = self._get_node_without_splaying(key,self.Root)
         parent = node.parent
 
-        if node:
-            if not (node.left or node.right):
-                self._delete_leaf(node)
+        while parent:
 
-            elif not (node.left and node.right):
-                self._delete_leaf_parent(node)
+            grandparent = parent.parent
+            if not grandparent:
+                self._rotate_up(node)
 
-            else:
-                self._delete_node(node)
+            elif (grandparent.left is parent) == (parent.left is node):
+                self._rotate_up(parent)
+                node = parent
 
-            if parent:
-                self._rotate_to_root(parent)
+            else:
+                self._rotate_up(node)
+                self._rotate_up(node)
+
+            parent = node.parent
+
+    def delete(self,key,*args):
+        """T.delete(key) <==> del T[key]. Splays the Node with key
+        attribute key to the root of T and deletes it, joining its
+        subtrees by splaying the largest key of the left one to its
+        top. If key is not in T, the last Node visited is splayed.
+        """
+        node = self._splay(key)
+        if not node or node.key != key:
+            return
+
+        left = node.left
+        right = node.right
+        node.left = None
+        node.right = None
+        if not left:
+            self.Root = right
+            if right:
+                right.parent = None
+            return
+
+        left.parent = None
+        self.Root = left
+        root = self._splay(key)
+        root.right = right
+        if right:
+            right.parent = root
+        self._resize(root)
 
     def delete_from(self,seq):
         """
-        T.delete_from(seq). For every keyin seq, deletes
-        the Node with that key attribute from T.
+        T.delete_from(seq). For every key in seq, deletes
+        the Node with that key attribute from T, splaying each.
+        When seq would delete most of T, the rest is rebuilt
+        with from_sorted instead.
         """
-        if isinstance(seq,collections.Iterable):
-            for x in seq:
-                self.delete(x)
-        else:
-            raise TypeError(str(iter) + " is not iterable")
\ No newline at end of file
+        if not isinstance(seq,collections.Iterable):
+            raise TypeError(str(seq) + " is not iterable")
+
+        keys = list(seq)
+        if self._deletes_most(keys):
+            doomed = set(keys)
+            self._bulk_load([pair for pair in self.items() if pair[0] not in doomed])
+            return
+
+        for key in keys:
+            self.delete(key)
\ No newline at end of file
@@ -0,0 +1,32 @@
+import unittest
+
+from pybst import arraytree
+
+class ArrayKeyTest(unittest.TestCase):
+
+    def check_rejected(self,tree,key):
+        arrays = tree.arrays
+        before = (list(arrays.left),list(arrays.keys),list(arrays.values),arrays.free)
+        self.assertRaises(ValueError,tree.insert,key,'x')
+        self.assertEqual((list(arrays.left),list(arrays.keys),list(arrays.values),arrays.free),before)
+        self.assertTrue(tree.is_valid())
+
+    def test_inexact_float_keys_are_rejected(self):
+        for cls in (arraytree.ArrayAVLTree,arraytree.ArrayRBTree):
+            tree = cls([(2**53,'a')])
+            self.check_rejected(tree,2**53 + 1)
+            self.check_rejected(tree,2**1100)
+            self.assertEqual(tree.get_node(2**53 + 1),None)
+            self.assertEqual(list(tree.keys()),[2**53])
+
+    def test_non_integer_keys_are_rejected_by_integer_arrays(self):
+        for cls in (arraytree.ArrayAVLTree,arraytree.ArrayRBTree):
+            tree = cls([(i,i) for i in range(10)],typecode='l')
+            tree.delete(3)
+            self.check_rejected(tree,2.5)
+            tree.insert(3,3)
+            self.assertEqual(list(tree.keys()),range(10))
+            self.assertTrue(tree.is_valid())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import random
+import unittest
+
+from pybst import avltree
+
+class CountingAVLTree(avltree.AVLTree):
+    """An AVLTree counting how many heights its updates recompute."""
+
+    def __init__(self,*args):
+        self.recomputed = 0
+        avltree.AVLTree.__init__(self,*args)
+
+    def _child_height(self,node):
+        self.recomputed = self.recomputed + 1
+        return avltree.AVLTree._child_height(self,node)
+
+class AVLRetraceTest(unittest.TestCase):
+
+    def test_random_inserts_and_deletes_stay_valid(self):
+        random.seed(0)
+        keys = range(2000)
+        random.shuffle(keys)
+        tree = avltree.AVLTree()
+        for i, key in enumerate(keys):
+            tree.insert(key,key)
+            if i % 97 == 0:
+                self.assertTrue(tree.is_valid())
+        random.shuffle(keys)
+        for i, key in enumerate(keys):
+            tree.delete(key)
+            if i % 97 == 0:
+                self.assertTrue(tree.is_valid())
+        self.assertEqual(tree.Root,None)
+
+    def test_sequential_inserts_stay_balanced(self):
+        tree = avltree.AVLTree([(i,i) for i in range(1023)])
+        self.assertTrue(tree.is_valid())
+        self.assertTrue(tree.Root.height <= 10)
+
+    def test_recomputed_heights_do_not_grow_with_size(self):
+        # Retracing stops once a height is unchanged, so the average
+        # number of heights recomputed per update is constant.
+        averages = []
+        for size in (1000,16000):
+            random.seed(size)
+            keys = random.sample(xrange(10 * size),size)
+            tree = CountingAVLTree()
+            for key in keys:
+                tree.insert(key,key)
+            for key in keys[:size // 2]:
+                tree.delete(key)
+            averages.append(tree.recomputed / (1.5 * size))
+        self.assertTrue(averages[1] < 1.2 * averages[0])
+        self.assertTrue(averages[1] < 5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import bisect
+import math
+import random
+import unittest
+
+from pybst import avltree, bstree, btree, rbtree, splaytree
+
+CLASSES = (bstree.BSTree,avltree.AVLTree,rbtree.RBTree,splaytree.SplayTree,btree.BTree)
+
+class DeleteFromTest(unittest.TestCase):
+
+    def test_deletes_present_keys(self):
+        for cls in CLASSES:
+            tree = cls([(i,i) for i in range(100)])
+            tree.delete_from(range(0,100,3) + [500,-1])
+            self.assertEqual(list(tree.keys()),[i for i in range(100) if i % 3])
+            self.assertTrue(tree.is_valid())
+
+    def test_deletes_most_keys(self):
+        for cls in CLASSES:
+            tree = cls([(i,i) for i in range(100)])
+            tree.delete_from(range(90))
+            self.assertEqual(list(tree.keys()),range(90,100))
+            self.assertTrue(tree.is_valid())
+
+    def test_absent_keys_do_not_rebuild(self):
+        for cls in CLASSES:
+            tree = cls([(i,i) for i in range(10)])
+            self.assertFalse(tree._deletes_most([100 + i for i in range(50)] + [3]))
+            self.assertFalse(tree._deletes_most([1] * 50))
+            self.assertTrue(tree._deletes_most(range(6)))
+
+def depth(node):
+    count = 0
+    while node.parent:
+        node = node.parent
+        count = count + 1
+    return count
+
+class FromSortedTest(unittest.TestCase):
+
+    def test_sorted_unsorted_and_duplicate_input(self):
+        pairs = [(i,str(i)) for i in range(50)]
+        shuffled = list(pairs)
+        random.Random(1).shuffle(shuffled)
+        duplicated = shuffled + [(i,'again') for i in range(0,50,5)]
+        for cls in CLASSES:
+            for seq in (pairs,shuffled,duplicated):
+                tree = cls.from_sorted(seq)
+                self.assertTrue(tree.is_valid())
+                # As with insert, the first pair with a key wins.
+                self.assertEqual(list(tree.items()),pairs)
+            self.assertEqual(list(cls.from_sorted([]).items()),[])
+            self.assertRaises(TypeError,cls.from_sorted,[('a',1)])
+
+    def test_avl_heights_are_minimal(self):
+        for count in (1,2,3,7,8,100,1000):
+            tree = avltree.AVLTree.from_sorted([(i,i) for i in range(count)])
+            self.assertTrue(tree.is_valid())
+            self.assertEqual(tree.Root.height,int(math.log(count,2) + 1e-9))
+            for node in tree.iter_inorder():
+                self.assertTrue(abs(node.balance) <= 1)
+
+    def test_rb_colors(self):
+        for count in (1,2,3,7,8,100,1000):
+            tree = rbtree.RBTree.from_sorted([(i,i) for i in range(count)])
+            self.assertTrue(tree.is_valid())
+            height = tree.get_height()
+            # Only the Nodes on the deepest level are red.
+            for node in tree.iter_inorder():
+                red = node is not tree.Root and depth(node) == height
+                self.assertEqual(node.color,'r' if red else 'k')
+
+class OrderStatisticTest(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(4)
+        self.keys = sorted(rng.sample(xrange(0,1000,2),120))
+
+    def test_rank_and_select(self):
+        for cls in CLASSES:
+            tree = cls([(key,-key) for key in self.keys])
+            for index, key in enumerate(self.keys):
+                self.assertEqual(tree.rank(key),index)
+                self.assertEqual(tree.rank(key + 1),index + 1)
+                node = tree.select(index)
+                self.assertEqual((node.key,node.value),(key,-key))
+            self.assertEqual(tree.rank(-5),0)
+            self.assertEqual(tree.rank(2000),len(self.keys))
+            self.assertRaises(IndexError,tree.select,len(self.keys))
+            self.assertRaises(IndexError,tree.select,-1)
+
+    def test_range_and_count_range(self):
+        rng = random.Random(5)
+        for cls in CLASSES:
+            tree = cls([(key,-key) for key in self.keys])
+            for i in range(30):
+                lo, hi = sorted(rng.randrange(-10,1010) for j in range(2))
+                expected = [key for key in self.keys if lo <= key < hi]
+                self.assertEqual([node.key for node in tree.range(lo,hi)],expected)
+                self.assertEqual([node.key for node in tree.range(lo,hi,reverse=True)],expected[::-1])
+                self.assertEqual(tree.count_range(lo,hi),len(expected))
+                self.assertEqual(tree.count_range(hi,lo),0)
+
+    def test_delete_range(self):
+        rng = random.Random(6)
+        for cls in CLASSES:
+            for i in range(10):
+                tree = cls([(key,-key) for key in self.keys])
+                lo, hi = sorted(rng.randrange(-10,1010) for j in range(2))
+                deleted = [key for key in self.keys if lo <= key < hi]
+                self.assertEqual(tree.delete_range(lo,hi),len(deleted))
+                self.assertTrue(tree.is_valid())
+                self.assertEqual(list(tree.keys()),[key for key in self.keys if key not in deleted])
+
+class NeighbourTest(unittest.TestCase):
+
+    def test_floor_ceiling_successor_predecessor(self):
+        keys = range(0,100,3)
+        for cls in CLASSES:
+            tree = cls([(key,key) for key in keys])
+            for probe in range(-2,102):
+                i = bisect.bisect_right(keys,probe)
+                floor = tree.floor(probe)
+                self.assertEqual(floor.key if floor else None,keys[i - 1] if i else None)
+                i = bisect.bisect_left(keys,probe)
+                ceiling = tree.ceiling(probe)
+                self.assertEqual(ceiling.key if ceiling else None,keys[i] if i < len(keys) else None)
+
+            for i, key in enumerate(keys):
+                node = tree.get_node(key)
+                successor = tree.successor(node)
+                self.assertEqual(successor.key if successor else None,keys[i + 1] if i + 1 < len(keys) else None)
+                node = tree.get_node(key)
+                predecessor = tree.predecessor(node)
+                self.assertEqual(predecessor.key if predecessor else None,keys[i - 1] if i else None)
+
+class FreezeTest(unittest.TestCase):
+
+    def test_freeze_matches_the_tree(self):
+        keys = range(0,60,4)
+        for cls in CLASSES:
+            tree = cls([(key,str(key)) for key in keys])
+            snapshot = tree.freeze()
+            self.assertEqual(list(snapshot.items()),list(tree.items()))
+            self.assertEqual(len(snapshot),len(keys))
+            self.assertEqual(snapshot.get(8),'8')
+            self.assertEqual(snapshot.get(9,'none'),'none')
+            self.assertEqual(snapshot.rank(9),3)
+            self.assertEqual(snapshot.count_range(4,20),4)
+            # The snapshot does not follow later changes to the tree.
+            tree.insert(9,'9')
+            tree.delete(8)
+            self.assertEqual(snapshot.get(8),'8')
+            self.assertEqual(snapshot.get(9),None)
+
+        snapshot = avltree.AVLTree([(key,key) for key in keys]).freeze(typecode='l')
+        self.assertEqual(list(snapshot.keys()),keys)
+
+if __name__ == '__main__':
+    unittest.main()
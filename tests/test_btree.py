@@ -0,0 +1,66 @@
+import bisect
+import random
+import unittest
+
+from pybst import btree
+
+class BTreeRandomTest(unittest.TestCase):
+
+    def check_against(self,tree,expected):
+        self.assertTrue(tree.is_valid())
+        self.assertEqual(tree.get_violations(),[])
+        keys = sorted(expected)
+        self.assertEqual(list(tree.items()),[(key,expected[key]) for key in keys])
+        self.assertEqual(tree.get_element_count(),len(keys))
+        for index, key in enumerate(keys):
+            self.assertEqual(tree.rank(key),index)
+            entry = tree.select(index)
+            self.assertEqual((entry.key,entry.value),(key,expected[key]))
+        for key in (-1,0.5,len(keys) * 3 + 0.5):
+            self.assertEqual(tree.rank(key),bisect.bisect_left(keys,key))
+        self.assertRaises(IndexError,tree.select,len(keys))
+
+    def test_random_inserts_and_deletes_match_a_dict(self):
+        rng = random.Random(21)
+        for order in (3,4,5,6):
+            tree = btree.BTree(order=order)
+            expected = {}
+            for step in xrange(600):
+                key = rng.randrange(200)
+                if rng.random() < 0.6:
+                    tree.insert(key,step)
+                    expected.setdefault(key,step)
+                elif key in expected:
+                    tree.delete(key)
+                    del expected[key]
+                if step % 50 == 0:
+                    self.check_against(tree,expected)
+            self.check_against(tree,expected)
+            for key in expected.keys():
+                tree.delete(key)
+            self.check_against(tree,{})
+
+class BTreeViolationTest(unittest.TestCase):
+
+    def test_every_violation_is_reported(self):
+        tree = btree.BTree.from_sorted([(i,i) for i in range(20)],order=3)
+        self.assertEqual(tree.get_violations(),[])
+        parent, leaf = None, tree.Root
+        while leaf.children:
+            parent, leaf = leaf, leaf.children[0]
+        leaf.size = leaf.size + 5
+        leaf.values.append(None)
+        self.assertEqual(tree.get_violations(),[
+            "Size of node with keys " + str(parent.keys) + " is " + str(parent.size) + " and should be " + str(parent.size + 5),
+            "Node with keys " + str(leaf.keys) + " has " + str(len(leaf.keys) + 1) + " values",
+            "Size of node with keys " + str(leaf.keys) + " is " + str(leaf.size) + " and should be " + str(leaf.size - 5)])
+        self.assertRaises(Exception,tree.is_valid)
+
+    def test_a_child_linked_to_an_ancestor_is_reported(self):
+        tree = btree.BTree.from_sorted([(i,i) for i in range(20)],order=3)
+        tree.Root.children[-1].children[-1] = tree.Root
+        violations = tree.get_violations()
+        self.assertTrue(any("is to the left of" in v or "is to the right of" in v for v in violations))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import random
+import threading
+import time
+import unittest
+
+from pybst import avltree, concurrenttree, persistent, splaytree
+
+WAIT = 5
+
+class VersionedTreeTest(unittest.TestCase):
+
+    def test_update_copies_mutable_tree(self):
+        tree = avltree.AVLTree([(1,'a')])
+        versions = concurrenttree.VersionedTree(tree)
+        old = versions.current()
+        self.assertEqual(versions.update(lambda tree: tree.insert(2,'b')),1)
+        self.assertEqual(list(old.keys()),[1])
+        self.assertEqual(list(versions.current().keys()),[1,2])
+
+    def test_update_path_copies_persistent_tree(self):
+        tree = persistent.PersistentAVLTree([(i,i) for i in range(100)])
+        versions = concurrenttree.VersionedTree(tree)
+        versions.update(lambda tree: tree.insert(200,200))
+        new = versions.current()
+        self.assertEqual(list(tree.keys()),range(100))
+        self.assertEqual(new.get_element_count(),101)
+        # Only the path to the new key is copied
+        self.assertTrue(new.get_node(0) is tree.get_node(0))
+
+    def test_concurrent_updates_lose_nothing(self):
+        versions = concurrenttree.VersionedTree(persistent.PersistentRBTree())
+        def writer(start):
+            for key in range(start,start + 50):
+                versions.update(lambda tree: tree.insert(key,key))
+        threads = [threading.Thread(target=writer,args=(i * 50,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(list(versions.current().keys()),range(200))
+        self.assertEqual(versions.version(),200)
+
+class RWLockTest(unittest.TestCase):
+
+    def start(self,target):
+        thread = threading.Thread(target=target)
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def wait_for(self,condition):
+        deadline = time.time() + WAIT
+        while not condition():
+            self.assertTrue(time.time() < deadline)
+            time.sleep(0.001)
+
+    def test_readers_overlap(self):
+        lock = concurrenttree.RWLock()
+        inside = []
+        both = threading.Event()
+        def reader():
+            lock.acquire_read()
+            try:
+                inside.append(1)
+                if len(inside) == 2:
+                    both.set()
+                # Only returns True if the other reader gets in meanwhile
+                both.wait(WAIT)
+            finally:
+                lock.release_read()
+        threads = [self.start(reader) for i in range(2)]
+        for thread in threads:
+            thread.join(WAIT)
+        self.assertTrue(both.is_set())
+
+    def test_writer_excludes_readers(self):
+        lock = concurrenttree.RWLock()
+        read = threading.Event()
+        def reader():
+            lock.acquire_read()
+            read.set()
+            lock.release_read()
+        lock.acquire_write()
+        thread = self.start(reader)
+        self.assertFalse(read.wait(0.1))
+        lock.release_write()
+        self.assertTrue(read.wait(WAIT))
+        thread.join(WAIT)
+
+    def test_writer_excludes_writers(self):
+        lock = concurrenttree.RWLock()
+        written = threading.Event()
+        def writer():
+            lock.acquire_write()
+            written.set()
+            lock.release_write()
+        lock.acquire_write()
+        thread = self.start(writer)
+        self.assertFalse(written.wait(0.1))
+        lock.release_write()
+        self.assertTrue(written.wait(WAIT))
+        thread.join(WAIT)
+
+    def test_waiting_writer_goes_before_new_readers(self):
+        lock = concurrenttree.RWLock()
+        order = []
+        def writer():
+            lock.acquire_write()
+            order.append('writer')
+            lock.release_write()
+        def reader():
+            lock.acquire_read()
+            order.append('reader')
+            lock.release_read()
+
+        lock.acquire_read()
+        threads = [self.start(writer)]
+        self.wait_for(lambda: lock._writers_waiting == 1)
+        threads.append(self.start(reader))
+        # The new reader would get in at once if it did not wait
+        time.sleep(0.1)
+        self.assertEqual(order,[])
+        lock.release_read()
+        for thread in threads:
+            thread.join(WAIT)
+        self.assertEqual(order,['writer','reader'])
+
+class ConcurrentTreeTest(unittest.TestCase):
+
+    def test_reads_and_writes(self):
+        tree = concurrenttree.ConcurrentTree(avltree.AVLTree())
+        tree.insert(1,'a')
+        self.assertEqual(tree.get(1),'a')
+        self.assertEqual(tree.get(2,'none'),'none')
+        self.assertTrue(tree.is_valid())
+
+    def test_threads_sharing_a_splay_tree(self):
+        tree = concurrenttree.ConcurrentTree(splaytree.SplayTree())
+        def worker(seed):
+            rng = random.Random(seed)
+            for i in range(300):
+                key = rng.randrange(100)
+                choice = rng.random()
+                if choice < 0.3:
+                    tree.insert(key,key)
+                elif choice < 0.4:
+                    tree.delete(key)
+                elif choice < 0.7:
+                    tree.get_node(key)
+                else:
+                    self.assertTrue(tree.get(key) in (None,key))
+        threads = [threading.Thread(target=worker,args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(tree.is_valid())
+        self.assertEqual(tree.keys(),sorted(set(tree.keys())))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from pybst import durable, rbtree, serialize
+
+class MyRBTree(rbtree.RBTree):
+    pass
+
+class DurableTreeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_recovers_checkpoint_and_log(self):
+        with durable.DurableTree(self.directory,checkpoint_every=10) as tree:
+            for i in range(25):
+                tree.insert(i,str(i))
+            tree.delete(3)
+        with durable.DurableTree(self.directory) as tree:
+            self.assertEqual(list(tree.tree.keys()),[i for i in range(25) if i != 3])
+            self.assertTrue(tree.tree.is_valid())
+
+    def test_failed_checkpoint_keeps_log(self):
+        tree = durable.DurableTree(self.directory,fsync='always')
+        tree.insert(1,'a')
+        files = sorted(os.listdir(self.directory))
+
+        dump = serialize.dump
+        def failing_dump(tree,file):
+            file.write('partial')
+            raise IOError("disk full")
+        serialize.dump = failing_dump
+        try:
+            self.assertRaises(IOError,tree.checkpoint)
+        finally:
+            serialize.dump = dump
+
+        self.assertEqual(sorted(os.listdir(self.directory)),files)
+        tree.insert(2,'b')
+        tree.checkpoint()
+        tree.insert(3,'c')
+        tree.close()
+        with durable.DurableTree(self.directory) as tree:
+            self.assertEqual(list(tree.tree.items()),[(1,'a'),(2,'b'),(3,'c')])
+
+    def test_unpicklable_change_is_not_applied(self):
+        with durable.DurableTree(self.directory,fsync='always') as tree:
+            tree.insert(1,'a')
+            self.assertRaises(TypeError,tree.insert,2,threading.Lock())
+            self.assertEqual(list(tree.tree.keys()),[1])
+            tree.insert(3,'c')
+        with durable.DurableTree(self.directory) as tree:
+            self.assertEqual(list(tree.tree.items()),[(1,'a'),(3,'c')])
+
+    def test_failed_change_is_taken_out_of_log(self):
+        with durable.DurableTree(self.directory,fsync='always') as tree:
+            tree.insert(1,'a')
+            self.assertRaises(TypeError,tree.insert_from,[(2,'b'),('x','c')])
+            self.assertEqual(list(tree.tree.keys()),[1])
+            tree.insert(4,'d')
+        with durable.DurableTree(self.directory) as tree:
+            self.assertEqual(list(tree.tree.items()),[(1,'a'),(4,'d')])
+
+    def test_rejects_tree_class_that_cannot_be_dumped(self):
+        self.assertRaises(TypeError,durable.DurableTree,self.directory,tree_class=MyRBTree)
+
+    def test_delete_range_produces_count(self):
+        with durable.DurableTree(self.directory) as tree:
+            tree.insert_from([(i,i) for i in range(10)])
+            self.assertEqual(tree.delete_range(2,5),3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import random
+import unittest
+
+from pybst import arraytree, avltree, rbtree
+
+CLASSES = (avltree.AVLTree,rbtree.RBTree,arraytree.ArrayAVLTree,arraytree.ArrayRBTree)
+
+def build(cls,keys):
+    if issubclass(cls,arraytree.ArrayTree):
+        return cls([(key,-key) for key in keys],typecode='l')
+    return cls([(key,-key) for key in keys])
+
+class SplitJoinTest(unittest.TestCase):
+
+    def test_split_partitions_keys_and_join_restores_the_tree(self):
+        rng = random.Random(11)
+        for cls in CLASSES:
+            keys = rng.sample(xrange(10000),300)
+            for _ in xrange(10):
+                tree = build(cls,keys)
+                pivot = rng.randrange(-10,10010)
+                smaller, larger = tree.split(pivot)
+                self.assertEqual(tree.Root,None)
+                self.assertTrue(smaller.is_valid())
+                self.assertTrue(larger.is_valid())
+                self.assertEqual(list(smaller.keys()),sorted(key for key in keys if key < pivot))
+                self.assertEqual(list(larger.keys()),sorted(key for key in keys if key >= pivot))
+                self.assertEqual(smaller.get_element_count() + larger.get_element_count(),len(keys))
+
+                joined = cls.join(smaller,larger)
+                self.assertTrue(joined.is_valid())
+                self.assertEqual(list(joined.items()),[(key,-key) for key in sorted(keys)])
+                self.assertEqual(smaller.Root,None)
+                self.assertEqual(larger.Root,None)
+
+    def test_join_trees_of_very_different_heights(self):
+        for cls in CLASSES:
+            for small, big in ((0,1000),(1,1000),(3,2000),(1000,0),(1000,2),(2000,5)):
+                left = build(cls,range(small))
+                right = build(cls,range(small,small + big))
+                joined = cls.join(left,right)
+                self.assertTrue(joined.is_valid())
+                self.assertEqual(list(joined.keys()),range(small + big))
+                self.assertEqual(joined.get_element_count(),small + big)
+
+    def test_join_rejects_overlapping_keys(self):
+        for cls in CLASSES:
+            self.assertRaises(ValueError,cls.join,build(cls,range(10)),build(cls,range(5,15)))
+
+class ArrayJoinTest(unittest.TestCase):
+
+    def test_join_with_and_without_shared_arrays(self):
+        for cls in (arraytree.ArrayAVLTree,arraytree.ArrayRBTree):
+            smaller, larger = build(cls,range(300)).split(120)
+            self.assertTrue(smaller.arrays is larger.arrays)
+            shared = smaller.arrays
+            joined = cls.join(smaller,larger)
+            self.assertTrue(joined.arrays is shared)
+            self.assertTrue(joined.is_valid())
+            self.assertEqual(list(joined.items()),[(key,-key) for key in range(300)])
+
+            left = build(cls,range(50))
+            right = build(cls,range(50,400))
+            self.assertFalse(left.arrays is right.arrays)
+            joined = cls.join(left,right)
+            self.assertTrue(joined.is_valid())
+            self.assertEqual(list(joined.items()),[(key,-key) for key in range(400)])
+            self.assertEqual(joined.arrays.typecode,'l')
+            self.assertEqual(left.Root,None)
+            self.assertEqual(right.Root,None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pybst import avltree, mapped
+
+class MappedTreeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory,'index')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self,tree):
+        with open(self.path,'wb') as file:
+            mapped.write(tree,file)
+
+    def test_round_trip(self):
+        self.write(avltree.AVLTree([(i,str(i)) for i in range(100)]))
+        with mapped.MappedTree(self.path) as index:
+            self.assertEqual(index.get_node(42).value,'42')
+            self.assertEqual(index.get_node(100),None)
+
+    def test_rejects_integer_key_inexact_as_float(self):
+        tree = avltree.AVLTree([(2 ** 53 + 1,'a'),(0.5,'b')])
+        with open(self.path,'wb') as file:
+            self.assertRaises(ValueError,mapped.write,tree,file)
+
+    def test_mixed_keys_exact_as_floats(self):
+        self.write(avltree.AVLTree([(2 ** 53,'a'),(0.5,'b')]))
+        with mapped.MappedTree(self.path) as index:
+            self.assertEqual(index.get_node(2 ** 53).value,'a')
+
+if __name__ == '__main__':
+    unittest.main()
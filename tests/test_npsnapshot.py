@@ -0,0 +1,45 @@
+import unittest
+
+import numpy as np
+
+from pybst import avltree, frozen, npsnapshot
+
+class NumPySnapshotTest(unittest.TestCase):
+
+    def test_tuple_values(self):
+        tree = avltree.AVLTree([(i,(i,-i)) for i in range(5)])
+        snap = npsnapshot.snapshot(tree)
+        self.assertEqual(snap.values.shape,(5,))
+        self.assertEqual(list(snap.values),[(i,-i) for i in range(5)])
+        self.assertEqual(list(snap.get_values([3,7])),[(3,-3),None])
+
+    def test_float_probes_against_integer_keys(self):
+        snap = npsnapshot.NumPySnapshot([(1,'a'),(2,'b'),(4,'c')],dtype='int64')
+        lookup = snap.get_many([2.5,2.0,0.5,4.5])
+        self.assertEqual(list(lookup.found),[False,True,False,False])
+        self.assertEqual(list(lookup.floor),[1,1,-1,2])
+        self.assertEqual(list(lookup.ceiling),[2,1,0,-1])
+
+    def test_integer_keys_are_stored_exactly(self):
+        tree = avltree.AVLTree([(2**53,'a'),(2**60,'b')])
+        snap = npsnapshot.snapshot(tree)
+        self.assertEqual(snap.keys.dtype,np.int64)
+        self.assertEqual(list(snap.get_many([2**53,2**53 + 1]).found),[True,False])
+
+        snap = npsnapshot.NumPySnapshot([(1,'a'),(2**70,'b')])
+        self.assertEqual(snap.keys.dtype,object)
+        self.assertEqual(list(snap.get_many([2**70,2**70 + 1]).found),[True,False])
+
+        self.assertEqual(npsnapshot.NumPySnapshot([(1,'a'),(2.5,'b')]).keys.dtype,np.float64)
+
+    def test_unordered_keys_are_named(self):
+        pairs = ((key,key) for key in [1,3,2])
+        with self.assertRaises(ValueError) as raised:
+            npsnapshot.NumPySnapshot(pairs)
+        self.assertEqual(str(raised.exception),"Key 2 follows 3, so keys are not in strictly increasing order")
+        with self.assertRaises(ValueError) as raised:
+            frozen.FrozenTree((key,key) for key in [1,3,3])
+        self.assertEqual(str(raised.exception),"Key 3 follows 3, so keys are not in strictly increasing order")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import random
+import unittest
+
+from pybst import avltree, parallel, rbtree
+
+class ParallelBuildTest(unittest.TestCase):
+
+    def test_matches_from_sorted(self):
+        random.seed(0)
+        pairs = [(random.randint(0,5000),i) for i in range(10000)]
+        for cls in (avltree.AVLTree,rbtree.RBTree):
+            tree = parallel.parallel_build(cls,pairs,processes=3)
+            expected = cls.from_sorted(pairs)
+            self.assertEqual(list(tree.items()),list(expected.items()))
+            self.assertTrue(tree.is_valid())
+
+    def test_non_numeric_keys_are_rejected(self):
+        pairs = [(i,i) for i in range(100)] + [('a',0)]
+        self.assertRaises(TypeError,parallel.parallel_build,avltree.AVLTree,pairs,processes=2)
+
+    def test_positions_in_range(self):
+        keys = [5,1,9,3,7]
+        self.assertEqual(list(parallel._positions_in_range(keys,None,3)),[1])
+        self.assertEqual(list(parallel._positions_in_range(keys,3,7)),[0,3])
+        self.assertEqual(list(parallel._positions_in_range(keys,7,None)),[2,4])
+
+    def test_splitters_do_not_touch_the_global_random_state(self):
+        random.seed(5)
+        expected = random.random()
+        random.seed(5)
+        parallel._choose_splitters(range(1000),4,random.Random())
+        self.assertEqual(random.random(),expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+import unittest
+
+from pybst import persistent
+
+class PersistentTreeTest(unittest.TestCase):
+
+    def test_versions_share_queries(self):
+        for cls in (persistent.PersistentAVLTree,persistent.PersistentRBTree):
+            old = cls([(i,str(i)) for i in range(100)])
+            new = old.insert(200,'200').delete(5)
+            self.assertEqual(old.get_node(5).value,'5')
+            self.assertEqual(new.get_node(5),None)
+            self.assertEqual(len(old),100)
+            self.assertEqual(len(new),100)
+            self.assertEqual(new.rank(200),99)
+            self.assertEqual(new.select(5).key,6)
+            self.assertEqual(new.floor(5).key,4)
+            self.assertEqual(new.ceiling(5).key,6)
+            self.assertEqual([node.key for node in new.range(3,8,reverse=True)],[7,6,4,3])
+            self.assertEqual(new.count_range(0,10),9)
+            self.assertTrue(old.is_valid())
+            self.assertTrue(new.is_valid())
+
+if __name__ == '__main__':
+    unittest.main()
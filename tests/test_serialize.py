@@ -0,0 +1,38 @@
+import StringIO
+import unittest
+
+from pybst import arraytree, avltree, btree, serialize, splaytree
+
+def round_trip(tree):
+    file = StringIO.StringIO()
+    serialize.dump(tree,file)
+    file.seek(0)
+    return serialize.load(file)
+
+class SerializeTest(unittest.TestCase):
+
+    def test_avltree(self):
+        tree = round_trip(avltree.AVLTree([(i,str(i)) for i in range(100)]))
+        self.assertTrue(isinstance(tree,avltree.AVLTree))
+        self.assertEqual(list(tree.items()),[(i,str(i)) for i in range(100)])
+        self.assertTrue(tree.is_valid())
+
+    def test_btree_keeps_order(self):
+        tree = round_trip(btree.BTree([(i,i) for i in range(1000)],order=5))
+        self.assertEqual(tree.order,5)
+        self.assertEqual(list(tree.keys()),range(1000))
+        self.assertTrue(tree.is_valid())
+
+    def test_splaytree_keeps_policy(self):
+        tree = splaytree.SplayTree([(i,i) for i in range(10)],policy='periodic',period=3)
+        tree = round_trip(tree)
+        self.assertEqual((tree.policy,tree.period),('periodic',3))
+        self.assertEqual(list(tree.keys()),range(10))
+
+    def test_array_tree_keeps_typecode(self):
+        tree = round_trip(arraytree.ArrayRBTree([(i,i) for i in range(10)],typecode='l'))
+        self.assertEqual(tree.arrays.typecode,'l')
+        self.assertEqual(list(tree.keys()),range(10))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import random
+import unittest
+
+from pybst import arraytree, avltree, bstree, btree, rbtree, splaytree
+
+CLASSES = (bstree.BSTree,avltree.AVLTree,rbtree.RBTree,splaytree.SplayTree,
+           btree.BTree,arraytree.ArrayAVLTree,arraytree.ArrayRBTree)
+
+def build(cls,pairs):
+    if issubclass(cls,arraytree.ArrayTree):
+        return cls(pairs,typecode='l')
+    return cls(pairs)
+
+def merge(key,value,other_value):
+    return (value,other_value)
+
+def expected(mine,theirs,name):
+    if name == 'union':
+        keys = set(mine) | set(theirs)
+    elif name == 'intersection':
+        keys = set(mine) & set(theirs)
+    elif name == 'difference':
+        keys = set(mine) - set(theirs)
+    else:
+        keys = set(mine) ^ set(theirs)
+
+    result = []
+    for key in sorted(keys):
+        if key in mine and key in theirs:
+            result.append((key,(mine[key],theirs[key])))
+        else:
+            result.append((key,mine[key] if key in mine else theirs[key]))
+    return result
+
+class SetOperationTest(unittest.TestCase):
+
+    def operands(self,rng,sizes):
+        mine = dict((key,'a%d' % key) for key in rng.sample(xrange(1000),sizes[0]))
+        theirs = dict((key,'b%d' % key) for key in rng.sample(xrange(1000),sizes[1]))
+        return mine, theirs
+
+    def call(self,tree,other,name,update):
+        if name in ('union','intersection'):
+            args = (other,merge)
+        else:
+            args = (other,)
+        if update:
+            getattr(tree,name + '_update')(*args)
+            return tree
+        return getattr(tree,name)(*args)
+
+    def test_operations_leave_operands_unchanged(self):
+        rng = random.Random(12)
+        for cls in CLASSES:
+            # Similar sizes and very different sizes in both orders
+            for sizes in ((150,150),(8,400),(400,8),(0,30),(30,0)):
+                mine, theirs = self.operands(rng,sizes)
+                for name in ('union','intersection','difference','symmetric_difference'):
+                    tree = build(cls,mine.items())
+                    other = build(cls,theirs.items())
+                    result = self.call(tree,other,name,False)
+                    self.assertTrue(result.is_valid())
+                    self.assertEqual(list(result.items()),expected(mine,theirs,name))
+                    self.assertEqual(list(tree.items()),sorted(mine.items()))
+                    self.assertEqual(list(other.items()),sorted(theirs.items()))
+
+    def test_update_operations_take_over_the_other_tree(self):
+        rng = random.Random(13)
+        for cls in CLASSES:
+            for sizes in ((150,150),(8,400),(400,8),(0,30),(30,0)):
+                mine, theirs = self.operands(rng,sizes)
+                for name in ('union','intersection','difference','symmetric_difference'):
+                    tree = build(cls,mine.items())
+                    other = build(cls,theirs.items())
+                    self.call(tree,other,name,True)
+                    self.assertTrue(tree.is_valid())
+                    self.assertEqual(list(tree.items()),expected(mine,theirs,name))
+                    self.assertEqual(other.Root,None)
+
+    def test_join_strategy_is_used_for_very_different_sizes(self):
+        for cls in (avltree.AVLTree,rbtree.RBTree):
+            small = cls([(i,i) for i in range(10)])
+            big = cls([(i,i) for i in range(1000)])
+            self.assertTrue(small._use_join(big))
+            self.assertTrue(big._use_join(small))
+            self.assertFalse(cls([(i,i) for i in range(500)])._use_join(big))
+        self.assertFalse(bstree.BSTree([(1,1)])._use_join(bstree.BSTree([(i,i) for i in range(1000)])))
+
+    def test_merge_callback_gets_values_in_operand_order(self):
+        for cls in (avltree.AVLTree,rbtree.RBTree,btree.BTree):
+            for sizes in ((5,1000),(1000,5),(300,300)):
+                tree = build(cls,[(i,'mine') for i in range(sizes[0])])
+                other = build(cls,[(i,'theirs') for i in range(sizes[1])])
+                calls = []
+                def record(key,value,other_value):
+                    calls.append((key,value,other_value))
+                    return value + '+' + other_value
+                tree.union_update(other,record)
+                common = min(sizes)
+                self.assertEqual(sorted(calls),[(i,'mine','theirs') for i in range(common)])
+                self.assertEqual(list(tree.values())[:common],['mine+theirs'] * common)
+
+    def test_operands_must_be_distinct_trees_of_one_class(self):
+        tree = avltree.AVLTree([(1,1)])
+        self.assertRaises(TypeError,tree.union,rbtree.RBTree([(2,2)]))
+        self.assertRaises(ValueError,tree.union_update,tree)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import random
+import unittest
+
+from pybst import splaytree
+
+def build(policy,**kwargs):
+    return splaytree.SplayTree.from_sorted([(i,str(i)) for i in range(1000)],policy=policy,**kwargs)
+
+class SplayPolicyTest(unittest.TestCase):
+
+    def test_lookups_keep_tree_valid(self):
+        random.seed(0)
+        for policy in splaytree.SPLAY_POLICIES:
+            tree = build(policy,period=3)
+            for i in range(500):
+                key = random.randint(-10,1010)
+                node = tree.get_node(key)
+                if 0 <= key < 1000:
+                    self.assertEqual(node.value,str(key))
+                else:
+                    self.assertEqual(node,None)
+            self.assertTrue(tree.is_valid())
+            self.assertEqual(list(tree.keys()),range(1000))
+
+    def test_full_splays_to_root(self):
+        tree = build('full')
+        tree.get_node(7)
+        self.assertEqual(tree.Root.key,7)
+
+    def test_full_splays_last_node_on_miss(self):
+        tree = build('full')
+        tree.get_node(7.5)
+        self.assertTrue(tree.Root.key in (7,8))
+
+    def test_semi_moves_node_up(self):
+        tree = build('semi')
+        before = self.depth(tree,7)
+        tree.get_node(7)
+        self.assertTrue(self.depth(tree,7) < before)
+
+    def test_depth_leaves_shallow_nodes(self):
+        tree = build('depth',threshold=100)
+        root = tree.Root.key
+        tree.get_node(7)
+        self.assertEqual(tree.Root.key,root)
+        tree = build('depth',threshold=2)
+        tree.get_node(7)
+        self.assertEqual(tree.Root.key,7)
+
+    def test_periodic_splays_every_period(self):
+        tree = build('periodic',period=3)
+        root = tree.Root.key
+        tree.get_node(7)
+        tree.get_node(8)
+        self.assertEqual(tree.Root.key,root)
+        tree.get_node(9)
+        self.assertEqual(tree.Root.key,9)
+
+    def test_peek_leaves_tree_unchanged(self):
+        tree = build('full')
+        shape = [node.key for node in tree.iter_preorder()]
+        self.assertEqual(tree.peek(7).value,'7')
+        self.assertEqual(tree.peek(7.5),None)
+        self.assertEqual([node.key for node in tree.iter_preorder()],shape)
+
+    def test_rejects_unknown_policy(self):
+        self.assertRaises(ValueError,splaytree.SplayTree,policy='sometimes')
+
+    def depth(self,tree,key):
+        depth = 0
+        node = tree.peek(key)
+        while node.parent:
+            node = node.parent
+            depth = depth + 1
+        return depth
+
+if __name__ == '__main__':
+    unittest.main()
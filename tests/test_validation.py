@@ -0,0 +1,106 @@
+import unittest
+
+from pybst import arraytree, avltree, bstree, rbtree
+
+def build(cls):
+    # 3 at the root, 1 and 5 below it and 0, 2, 4 and 6 as leaves.
+    # Red Black leaves are red and every other Node black.
+    return cls.from_sorted([(i,i) for i in range(7)])
+
+class ViolationTest(unittest.TestCase):
+
+    def check(self,tree,violations):
+        self.assertEqual(tree.get_violations(),violations)
+        self.assertRaises(Exception,tree.is_valid)
+
+    def test_valid_trees_have_no_violations(self):
+        for cls in (bstree.BSTree,avltree.AVLTree,rbtree.RBTree,
+                    arraytree.ArrayAVLTree,arraytree.ArrayRBTree):
+            tree = build(cls)
+            self.assertEqual(tree.get_violations(),[])
+            self.assertTrue(tree.is_valid())
+
+    def test_wrong_avl_heights(self):
+        tree = build(avltree.AVLTree)
+        tree.Root.left.height = 5
+        tree.Root.right.right.height = 1
+        self.check(tree,[
+            "Height of node 3 is 2 and should be 6",
+            "Tree is unbalanced at node 3",
+            "Height of node 1 is 5 and should be 1",
+            "Height of node 5 is 1 and should be 2",
+            "Height of node 6 is 1 and should be 0"])
+
+    def test_red_node_with_red_child(self):
+        tree = build(rbtree.RBTree)
+        tree.Root.right.color = 'r'
+        self.check(tree,[
+            "Node 5 is red and has a red child!",
+            "Path to a null child of node 4 has 1 black nodes and should have 2",
+            "Path to a null child of node 6 has 1 black nodes and should have 2"])
+
+    def test_red_root_and_unknown_color(self):
+        tree = build(rbtree.RBTree)
+        tree.Root.color = 'r'
+        tree.Root.right.right.color = 'x'
+        self.check(tree,[
+            "Root 3 is red!",
+            "Node 6 has unknown color x"])
+
+    def test_wrong_black_height(self):
+        tree = build(rbtree.RBTree)
+        tree.Root.left.left.color = 'k'
+        self.check(tree,[
+            "Path to a null child of node 2 has 2 black nodes and should have 3",
+            "Path to a null child of node 4 has 2 black nodes and should have 3",
+            "Path to a null child of node 6 has 2 black nodes and should have 3"])
+
+    def test_wrong_parent_links_and_sizes(self):
+        tree = build(bstree.BSTree)
+        tree.Root.left.right.parent = tree.Root
+        tree.Root.right.size = 9
+        self.check(tree,[
+            "Size of node 3 is 7 and should be 13",
+            "Right child of node 1 is adopted by another node!",
+            "Size of node 5 is 9 and should be 3"])
+
+    def test_keys_out_of_bounds_set_by_any_ancestor(self):
+        tree = build(bstree.BSTree)
+        tree.Root.left.right.key = 4
+        tree.Root.right.right.key = 2
+        self.check(tree,[
+            "Node 4 is to the left of 3 but is not smaller",
+            "Node 2 is to the right of 5 but is not larger"])
+
+    def test_child_linked_back_to_an_ancestor(self):
+        tree = build(avltree.AVLTree)
+        tree.Root.right.right.left = tree.Root
+        tree.Root.right.right.height = 2
+        self.check(tree,[
+            "Height of node 5 is 1 and should be 3",
+            "Tree is unbalanced at node 5",
+            "Left child of node 6 is adopted by another node!",
+            "Size of node 6 is 1 and should be 8",
+            "Height of node 6 is 2 and should be 3",
+            "Tree is unbalanced at node 6",
+            "Node 3 is to the right of 5 but is not larger"])
+
+    def test_corrupt_array_trees(self):
+        tree = build(arraytree.ArrayRBTree)
+        tree.arrays.parent[tree.Root.left.right.id] = tree.Root.id
+        tree.arrays.meta[tree.Root.right.id] = 1
+        self.check(tree,[
+            "Right child of node 1.0 is adopted by another node!",
+            "Node 5.0 is red and has a red child!",
+            "Path to a null child of node 4.0 has 1 black nodes and should have 2",
+            "Path to a null child of node 6.0 has 1 black nodes and should have 2"])
+
+        tree = build(arraytree.ArrayAVLTree)
+        tree.arrays.meta[tree.Root.left.left.id] = 4
+        self.check(tree,[
+            "Height of node 1.0 is 1 and should be 5",
+            "Tree is unbalanced at node 1.0",
+            "Height of node 0.0 is 4 and should be 0"])
+
+if __name__ == '__main__':
+    unittest.main()